@@ -1,6 +1,7 @@
 # utils/config.py
 import os
-from skyfield.api import load
+from functools import lru_cache
+from skyfield.api import Loader, load
 import math
 
 DEBUG = False
@@ -25,6 +26,27 @@ STEP_PER_SECOND = 1 / T_STEP  # 每秒的步数
 
 # SYSTEM PARAMETERS:
 
+# WEBSOCKET:
+DELTA_KEYFRAME_INTERVAL = 100  # 增量帧协议每隔多少帧发送一次完整关键帧（10 Hz 下约 10 秒）
+
+# PLAYBACK:
+SEEK_CHECKPOINT_PERIODS = 10  # 正向播放时每隔多少个 period 保存一次实体状态检查点（电量与任务指示），seek 从最近的检查点恢复
+PLAYBACK_STEPS_PER_SECOND = 10  # 1 倍速下每秒（墙钟）推进的仿真帧数
+PLAYBACK_RENDER_RATE = 10  # 默认推帧频率（Hz）
+PLAYBACK_MAX_STEPS_PER_FRAME = 200  # 每个渲染帧最多追赶的仿真帧数，超出部分丢弃（仿真变慢而不是无限积压）
+
+# PRECOMPUTE:
+PRECOMPUTE_WORKERS = os.cpu_count() or 1  # 预计算进程池大小
+PRECOMPUTE_MIN_SHARD = 16  # 每个分片最少卫星数，过小的星座不值得开进程池
+PRECOMPUTE_MEMORY_LIMIT = 512 * 1024 ** 2  # 预计算 / 回放每个时间窗口的内存上限（字节）
+CHEBYSHEV_SEGMENT_SECONDS = 1200  # Chebyshev 星历每段时长（秒）
+CHEBYSHEV_DEGREE = 12  # Chebyshev 星历每段多项式阶数
+ANALYTIC_SUN = False  # 用解析太阳模型替代 DE421（长时长扫参时更快，误差约 0.01°）
+ECLIPSE_SAMPLE_SECONDS = 60  # 地影求解的粗采样间隔（秒）
+PRECOMPUTE_LINKS = True  # 预计算整个时间范围的 ISL / SGL 拓扑并写入缓存，仿真时按 period 切片
+GS_INDEX_MIN_STATIONS = 32  # 地面站数不少于该值时用 KD 树剪枝星地可见性候选
+WALKER_FAST_PATH = False  # 生成式 Walker 星座用解析圆轨道 + J2 传播替代 SGP4（精度与速度的实测值见 walker.py）
+
 # ENERGY:
 BATTERY_MAX = 60 * 3600  # J (60Wh)
 B_MAX = 100
@@ -103,6 +125,29 @@ EXP_OUTPUT = os.path.join(OUTPUT_DIR, 'experiment')
 LOG_OUTPUT = os.path.join(OUTPUT_DIR, 'log')
 IMAGE_OUTPUT = os.path.join(OUTPUT_DIR, 'images')
 
-# 例如你的DE421文件
-BSP_FILE = os.path.join('de421.bsp')
-EPHEMERIS = load(BSP_FILE)
\ No newline at end of file
+# 例如你的DE421文件：固定在 backend 目录下，不随启动时的工作目录变化（缺失时由 skyfield 下载到该目录）
+BSP_DIR = os.path.abspath(os.path.join(BASE_DIR, '..'))
+BSP_FILE = os.path.join(BSP_DIR, 'de421.bsp')
+
+# 星历与时间尺度在进程内第一次使用时才加载（进程级单例），
+# 只处理项目 / 缓存管理请求的 worker 不必付出加载开销
+@lru_cache(maxsize=None)
+def get_ephemeris():
+    return Loader(BSP_DIR)(os.path.basename(BSP_FILE))
+
+@lru_cache(maxsize=None)
+def get_timescale():
+    return load.timescale()
+
+@lru_cache(maxsize=None)
+def get_body(name: str):
+    """
+    星历中的天体（'sun', 'earth', 'moon', ...），同一名称只构建一次。
+    """
+    return get_ephemeris()[name]
+
+def __getattr__(name: str):
+    # 兼容旧代码 `from app.config import EPHEMERIS`（导入时即加载）
+    if name == "EPHEMERIS":
+        return get_ephemeris()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
@@ -1,8 +1,8 @@
 import json
 import time
-import asyncio
 from typing import List, Optional
 from fastapi import WebSocket
+from app.config import PLAYBACK_MAX_STEPS_PER_FRAME, PLAYBACK_RENDER_RATE, PLAYBACK_STEPS_PER_SECOND
 from app.models.api_dict.pj import ProjectDict
 from app.core.simulation import Simulation
 from app.core.input_handler import InputHandler
@@ -11,9 +11,9 @@ from app.core.renderer import Renderer
 class Engine:
     """
     Tick-driven simulation engine:
-    - Drives Simulation forward at fixed timestep.
-    - Handles WebSocket inputs.
-    - Pushes frames to clients.
+    - Drives Simulation forward at speed * PLAYBACK_STEPS_PER_SECOND steps per wall-clock second.
+    - Pushes frames at render_rate Hz, advancing several steps per frame when needed.
+    - Handles WebSocket inputs as soon as they arrive.
     """
 
     def __init__(self):
@@ -23,6 +23,11 @@ class Engine:
         self.renderer = Renderer(self.sim)
         self.running = False
         self.playing = False
+        # 播放倍速与推帧频率（可由客户端命令修改）
+        self.speed = 1.0
+        self.render_rate = float(PLAYBACK_RENDER_RATE)
+        # 尚未推进的仿真帧数（小数部分留到下一帧）
+        self._step_debt = 0.0
 
     def init(self, project: ProjectDict):
         """
@@ -45,6 +50,9 @@ class Engine:
                         parsed = ProjectDict.model_validate(project_data)
                         self.period = parsed.experiment.time_slot
                         self.init(parsed)
+                        # 可选的帧协议：{"action": "init", "protocol": "binary" | "delta", ...}
+                        self.renderer.use_protocol(data.get("protocol"))
+                        await self.renderer.send_layout(self.client)
 
                 elif cmd == "play":
                     self.play()
@@ -52,19 +60,33 @@ class Engine:
                     self.pause()
                 elif cmd == "stop":
                     self.stop()
+                elif cmd == "ack":
+                    # 增量帧协议：客户端确认已应用的帧
+                    self.renderer.ack(data.get("seq"))
+                elif cmd == "keyframe":
+                    self.renderer.request_keyframe()
+                elif cmd == "speed":
+                    # {"action": "speed", "speed": 10} -> 10 倍速
+                    self.set_speed(float(data.get("speed", 1.0)))
+                elif cmd == "fps":
+                    self.set_render_rate(float(data.get("fps", PLAYBACK_RENDER_RATE)))
+                elif cmd == "seek":
+                    # {"action": "seek", "frame": n} 或 {"action": "seek", "time": "2025-01-01T00:10:00Z"}
+                    # time 按帧上显示的 "time" 字段解释（见 Simulation.seek_time）
+                    await self.seek(frame=data.get("frame"), when=data.get("time"))
 
-                # 可扩展更多命令：pause, play, jump_to_frame 等
+                # 可扩展更多命令
 
             except Exception as e:
                 print(f"[Engine] Failed to process input: {e}")
                 import traceback
                 traceback.print_exc()
 
-    def tick(self):
+    def tick(self, steps: int = 1):
         """
-        Advance simulation by one time step.
+        Advance simulation by the given number of time steps; skipped frames are not interpolated.
         """
-        self.sim.update()
+        self.sim.advance(steps)
 
     async def render(self):
         """
@@ -80,25 +102,56 @@ class Engine:
     async def run(self):
         """
         Main async event loop driving the simulation.
+        推帧时刻按单调时钟上的固定间隔排定（不随单帧耗时漂移），落后超过一帧时跳过错过的时刻；
+        两次推帧之间应推进的仿真帧数按墙钟时间累计，负载高时一帧内推进多步；
+        等待期间收到客户端命令立即处理。
         """
         self.running = True
-        # 期望的循环间隔（秒），用于控制外层频率
-        target_interval = 0.1
+        last = deadline = time.monotonic()
         while self.running:
-            start = time.time()
             await self.process_input()
-            try:
-                if self.playing:
-                    self.tick()
-                    await self.render()
-            except Exception as e:
-                import traceback
-                print(f"[Update failed: {e}")
-                traceback.print_exc()
-            elapsed = time.time() - start
-            # 以 target_interval 为目标间隔，sleep 剩余时间（至少 0）
-            sleep_time = max(target_interval - elapsed, 0.001)
-            await asyncio.sleep(sleep_time)
+            now = time.monotonic()
+            if now >= deadline:
+                try:
+                    if self.playing:
+                        self._step_debt += (now - last) * self.speed * PLAYBACK_STEPS_PER_SECOND
+                        self._step_debt = min(self._step_debt, float(PLAYBACK_MAX_STEPS_PER_FRAME))
+                        steps = int(self._step_debt)
+                        self._step_debt -= steps
+                        if steps:
+                            self.tick(steps)
+                            await self.render()
+                except Exception as e:
+                    import traceback
+                    print(f"[Update failed: {e}")
+                    traceback.print_exc()
+                last = now
+                deadline += 1.0 / self.render_rate
+                if deadline <= now:
+                    deadline = now + 1.0 / self.render_rate
+            await self.input.wait(deadline - time.monotonic())
+
+    def set_speed(self, speed: float):
+        """
+        Playback speed as a multiple of PLAYBACK_STEPS_PER_SECOND (e.g. 10 -> 10x).
+        """
+        self.speed = max(speed, 0.0)
+
+    def set_render_rate(self, hz: float):
+        self.render_rate = min(max(hz, 1.0), 120.0)
+
+    async def seek(self, frame: Optional[int] = None, when: Optional[str] = None):
+        """
+        Jump to a frame or simulation time and push it immediately (also while paused).
+        """
+        if when is not None:
+            self.sim.seek_time(when)
+        elif frame is not None:
+            self.sim.seek(frame)
+        else:
+            return
+        self.renderer.request_keyframe()
+        await self.render()
 
     def stop(self):
         """
@@ -113,6 +166,7 @@ class Engine:
         """
         print("[Engine] playing simulation.")
         self.playing = True
+        self._step_debt = 0.0
         
     def pause(self):
         """
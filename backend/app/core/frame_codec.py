@@ -0,0 +1,351 @@
+import json
+import struct
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+import numpy as np
+from app.config import DELTA_KEYFRAME_INTERVAL
+from app.entities.functions.columnar import full_store, series_at
+from app.entities.functions.topology import LINK_TYPES
+
+if TYPE_CHECKING:
+    from app.core.simulation import Simulation
+
+"""
+仿真 websocket 的二进制帧（客户端在 init 消息中以 "protocol": "binary" 协商）：
+- init 之后先发送一条 JSON 文本消息 FrameEncoder.layout()：各类实体的 id 与静态属性、以及下面的段布局
+- 之后每帧一条 send_bytes 消息：定长头 + 按固定顺序排列的并列数组段，全部小端序
+    头部 HEADER：magic "SCPF"、version、flags、currentFrame、slotCounter、periodCounter、
+                 MaxSlotNumbers、MaxPeriod、time（unix 秒，float64）、卫星 / 地面站 / ROI / 链路数
+    每段为一个连续数组（float32 / uint32 / uint8），uint8 段补齐到 4 字节，
+    因此客户端可以在原 ArrayBuffer 上直接构造 Float32Array 等视图，无需逐字段解析
+- 链路的端点是节点下标（卫星 0..N-1，地面站 N..N+G-1），端点位置由客户端取对应节点的 pos
+
+增量帧（"protocol": "delta"，JSON 文本）：
+- init 之后先发送一次场景描述 DeltaEncoder.layout()（type "scene"）：实体 id / 尺寸、
+  地面站经纬度与 ROI 角点 / 中心经纬度等不随时间变化的字段，以及字段形状与量化精度
+- 之后每帧一条消息，fields 只含相对基准帧 base 发生变化的字段（键同 "段名.字段"）：
+  值均为以 10^-precision 为单位的整数（整型字段精度为 0）；实体数变化时为整个字段展平的绝对值，
+  否则为相对基准的差值 {"d": 展平差值}，只有少数实体变化时为 {"idx": 实体下标, "d": 这些实体的展平差值}
+- 客户端以 {"action": "ack", "seq": n} 确认已应用的帧，之后的帧以最近确认的帧为基准；
+  客户端需保留已确认帧的完整状态，按 base 取状态再覆盖 fields 得到当前帧
+- 每 DELTA_KEYFRAME_INTERVAL 帧（或客户端发送 {"action": "keyframe"} 后）发送一次完整关键帧（type "key"），
+  websocket 按序可靠送达，关键帧同时作为新的基准
+- 浮点字段按 PRECISION 量化后再比较与发送，低于精度的抖动不会触发更新
+"""
+
+MAGIC = b"SCPF"
+VERSION = 1
+HEADER = struct.Struct("<4sHHIIIIIdIIII")
+
+# 卫星指示位（flags 段）
+SAT_FLAGS = ("onROI", "onSGL", "onProc", "onISL", "onSun")
+GS_FLAGS = ("onUpload", "onDownload")
+
+# 段布局：(段名, dtype, 每个实体的形状)；实体数由头部给出
+SECTIONS = {
+    "sun": [("xyz", "float32", (3,))],
+    "earth": [("xyz", "float32", (3,)), ("rotation", "float32", ())],
+    "satellites": [
+        ("pos", "float32", (3,)),
+        ("loc", "float32", (2,)),
+        ("velocityVector", "float32", (3,)),
+        ("solarVector", "float32", (3,)),
+        ("imgCornersPos", "float32", (4, 3)),
+        ("imgCornersLoc", "float32", (4, 2)),
+        ("batteryPercent", "float32", ()),
+        ("flags", "uint8", ()),
+    ],
+    "stations": [("pos", "float32", (3,)), ("loc", "float32", (2,)), ("flags", "uint8", ())],
+    "rois": [
+        ("cornersPos", "float32", (4, 3)),
+        ("cornersLoc", "float32", (4, 2)),
+        ("centrePos", "float32", (3,)),
+        ("centreLoc", "float32", (2,)),
+    ],
+    "links": [
+        ("src", "uint32", ()),
+        ("dst", "uint32", ()),
+        ("distance", "float32", ()),
+        ("snr", "float32", ()),
+        ("rate", "float32", ()),
+        ("type", "uint8", ()),
+    ],
+}
+
+# 增量帧的量化精度（保留小数位）：位置 / 距离为米（1 m），经纬度为度（约 1 m），方向向量无量纲
+PRECISION = {
+    "xyz": 0, "pos": 0, "imgCornersPos": 0, "cornersPos": 0, "centrePos": 0, "distance": 0,
+    "loc": 5, "imgCornersLoc": 5, "velocityVector": 5, "solarVector": 5, "rotation": 5,
+    "batteryPercent": 2, "snr": 2, "rate": 0,
+}
+# 只在场景描述中发送一次的字段
+STATIC_FIELDS = ("stations.loc", "rois.cornersLoc", "rois.centreLoc")
+
+def _flags(entities: List[Any], attrs: List[str]) -> np.ndarray:
+    bits = np.zeros(len(entities), dtype=np.uint8)
+    for k, attr in enumerate(attrs):
+        bits |= np.fromiter((bool(getattr(e, attr)) for e in entities), dtype=np.uint8, count=len(entities)) << k
+    return bits
+
+def _chunk(arr: Any, dtype: str) -> bytes:
+    data = np.ascontiguousarray(arr, dtype=dtype).tobytes()
+    return data + b"\0" * (-len(data) % 4)
+
+class FrameEncoder:
+    """
+    把 Simulation 的当前帧整理成并列数组并打包为二进制消息。地面站 / ROI 的经纬度不随时间变化，只整理一次。
+    """
+    def __init__(self, sim: "Simulation"):
+        self.sim = sim
+        self._static: Optional[Dict[str, np.ndarray]] = None
+        self._stores: Dict[str, Any] = {}
+
+    def layout(self) -> Dict[str, Any]:
+        """
+        二进制协议的一次性描述消息（JSON）：实体 id / 静态属性与段布局。
+        """
+        sim = self.sim
+        return {
+            "type": "layout",
+            "version": VERSION,
+            "header": ["magic", "version", "flags", "currentFrame", "slotCounter", "periodCounter",
+                       "MaxSlotNumbers", "MaxPeriod", "time", "satellites", "stations", "rois", "links"],
+            "sections": {name: [[field, dtype, list(shape)] for field, dtype, shape in fields] for name, fields in SECTIONS.items()},
+            "satFlags": list(SAT_FLAGS),
+            "gsFlags": list(GS_FLAGS),
+            "linkTypes": list(LINK_TYPES),
+            "satellites": [{"id": s.id, "plane": s.plane, "order": s.order, "dimensions": list(s.dimensions)} for s in sim.sat],
+            "stations": [g.id for g in sim.gs],
+            "rois": [r.id for r in sim.roi],
+        }
+
+    def _prepare(self) -> Dict[str, np.ndarray]:
+        if self._static is None:
+            gs_datas, roi_datas = self.sim._gs_datas, self.sim._roi_datas
+            gs_loc = np.full((len(gs_datas), 2), np.nan)
+            for i, g in enumerate(gs_datas):
+                if np.size(g['latlon']) >= 2:
+                    gs_loc[i] = np.asarray(g['latlon'], dtype=float).reshape(-1)[:2]
+            self._stores = {"gs": full_store(gs_datas), "roi": full_store(roi_datas)}
+            self._static = {
+                "stations.loc": gs_loc,
+                "rois.cornersLoc": np.array([np.asarray(r['target_corners_latlon'], dtype=float) for r in roi_datas]).reshape(-1, 4, 2),
+                "rois.centreLoc": np.array([np.asarray(r['center_latlon'], dtype=float) for r in roi_datas]).reshape(-1, 2),
+            }
+        return self._static
+
+    def _series(self, kind: str, records: List[Any], key: str, shape: tuple) -> np.ndarray:
+        if not records:
+            return np.zeros((0, *shape))
+        return series_at(records, key, self.sim.period_counter, self._stores[kind])
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        """
+        当前帧的全部并列数组，键为 "段名.字段"，顺序与 SECTIONS 一致（二进制帧与增量帧共用）。
+        """
+        sim = self.sim
+        static = self._prepare()
+        sats = sim.satellite_arrays()
+        table = sim.net.link_table() if sim.net else None
+        gs_datas, roi_datas = sim._gs_datas, sim._roi_datas
+        arrays = {
+            "sun.xyz": np.array([[sim.sun.pos.x, sim.sun.pos.y, sim.sun.pos.z]]),
+            "earth.xyz": np.array([[sim.eth.pos.x, sim.eth.pos.y, sim.eth.pos.z]]),
+            "earth.rotation": np.array([sim.eth.rotation], dtype=float),
+            "satellites.pos": sats["space_xyz"],
+            "satellites.loc": sats["subpoint_latlon"],
+            "satellites.velocityVector": sats["velocity_vector"],
+            "satellites.solarVector": sats["solar_vector"],
+            "satellites.imgCornersPos": sats["footprint_corners_xyz"],
+            "satellites.imgCornersLoc": sats["footprint_corners_latlon"],
+            "satellites.batteryPercent": np.array([s.battery_percent for s in sim.sat], dtype=float),
+            "satellites.flags": _flags(sim.sat, ["is_observing", "is_communicating_sgl", "is_processing", "is_communicating_isl", "is_charging"]),
+            "stations.pos": self._series("gs", gs_datas, 'xyz', (3,)),
+            "stations.loc": static["stations.loc"],
+            "stations.flags": _flags(sim.gs, ["on_upload", "on_download"]),
+            "rois.cornersPos": self._series("roi", roi_datas, 'target_corners_xyz', (4, 3)),
+            "rois.cornersLoc": static["rois.cornersLoc"],
+            "rois.centrePos": self._series("roi", roi_datas, 'center_xyz', (3,)),
+            "rois.centreLoc": static["rois.centreLoc"],
+        }
+        for field, _, _ in SECTIONS["links"]:
+            arrays[f"links.{field}"] = getattr(table, field) if table is not None else np.zeros(0)
+        return arrays
+
+    def encode(self) -> bytes:
+        """
+        当前帧打包为二进制消息：每个段一次 tobytes()。
+        """
+        sim = self.sim
+        arrays = self.arrays()
+        chunks = [
+            HEADER.pack(
+                MAGIC, VERSION, 0,
+                sim.frame_counter, sim.slot_counter, sim.period_counter, sim.max_slot_number, sim.max_period_numbers,
+                sim.time_recorder.timestamp(),
+                len(sim.sat), len(sim.gs), len(sim.roi), len(arrays["links.src"]),
+            ),
+        ]
+        for name, fields in SECTIONS.items():
+            chunks += [_chunk(arrays[f"{name}.{field}"], dtype) for field, dtype, _ in fields]
+        return b"".join(chunks)
+
+def _quantize(name: str, arr: np.ndarray) -> np.ndarray:
+    """
+    字段 -> 以 10^-PRECISION 为单位的整数值（浮点字段存为 float 以容纳 NaN，整型字段转为 int64 以便求差）。
+    """
+    decimals = PRECISION.get(name.split(".", 1)[1])
+    if decimals is None:
+        return np.asarray(arr).astype(np.int64)
+    return np.round(np.asarray(arr, dtype=float) * 10.0 ** decimals)
+
+def _jsonable(arr: np.ndarray) -> List[Any]:
+    """
+    展平为列表，NaN 转为 null（JSON.parse 不接受 NaN）。
+    """
+    flat = np.asarray(arr).ravel()
+    if flat.dtype.kind == "f" and np.isnan(flat).any():
+        return np.where(np.isnan(flat), None, flat).tolist()
+    return flat.tolist()
+
+def _integers(arr: np.ndarray) -> List[Any]:
+    flat = np.asarray(arr).ravel()
+    if flat.dtype.kind == "f":
+        if np.isnan(flat).any():
+            return np.where(np.isnan(flat), None, flat.astype(object)).tolist()
+        return flat.astype(np.int64).tolist()
+    return flat.tolist()
+
+def _diff(old: np.ndarray, new: np.ndarray) -> Any:
+    """
+    字段相对基准的变化：无变化返回 None；实体数变化或涉及 NaN 时发送整个字段的绝对值；
+    否则发送差值 {"d": ...}，少于一半实体变化时只发送这些实体 {"idx": ..., "d": ...}。
+    """
+    if old.shape != new.shape:
+        return _integers(new)
+    if len(new) == 0:
+        return None
+    same = old == new
+    if new.dtype.kind == "f":
+        same |= np.isnan(old) & np.isnan(new)
+    idx = np.flatnonzero(~same.reshape(len(new), -1).all(axis=1))
+    if len(idx) == 0:
+        return None
+    if new.dtype.kind == "f" and (np.isnan(old[idx]).any() or np.isnan(new[idx]).any()):
+        return _integers(new)
+    if 2 * len(idx) >= len(new):
+        return {"d": _integers(new - old)}
+    return {"idx": idx.tolist(), "d": _integers(new[idx] - old[idx])}
+
+class DeltaEncoder(FrameEncoder):
+    """
+    增量帧协议：每帧只发送相对客户端最近确认帧变化的字段，定期发送关键帧。
+    """
+    def __init__(self, sim: "Simulation", keyframe_interval: int = DELTA_KEYFRAME_INTERVAL):
+        super().__init__(sim)
+        self.keyframe_interval = keyframe_interval
+        self._seq = 0
+        self._key_seq = 0
+        self._force_key = True
+        # 基准帧（最近确认的帧或最近的关键帧）及其量化后的状态
+        self._base: Optional[int] = None
+        self._base_state: Dict[str, np.ndarray] = {}
+        # 已发送、尚未确认的帧：seq -> 量化后的状态
+        self._sent: Dict[int, Dict[str, np.ndarray]] = {}
+
+    def layout(self) -> Dict[str, Any]:
+        """
+        场景描述：实体 id / 静态属性、各字段形状与量化精度，init 之后发送一次。
+        """
+        scene = super().layout()
+        static = self._prepare()
+        scene.update({
+            "type": "scene",
+            "keyframeInterval": self.keyframe_interval,
+            "precision": PRECISION,
+            "static": {name: _jsonable(static[name]) for name in STATIC_FIELDS},
+        })
+        return scene
+
+    def ack(self, seq: int) -> None:
+        """
+        客户端确认已应用第 seq 帧，之后的增量以它为基准。
+        """
+        state = self._sent.get(seq)
+        if state is None or (self._base is not None and seq <= self._base):
+            return
+        self._base, self._base_state = seq, state
+        self._sent = {s: v for s, v in self._sent.items() if s > seq}
+
+    def request_keyframe(self) -> None:
+        self._force_key = True
+
+    def state(self) -> Dict[str, np.ndarray]:
+        return {name: _quantize(name, arr) for name, arr in self.arrays().items() if name not in STATIC_FIELDS}
+
+    def encode(self) -> str:
+        sim = self.sim
+        state = self.state()
+        self._seq += 1
+        keyframe = self._force_key or self._seq - self._key_seq >= self.keyframe_interval
+        message: Dict[str, Any] = {
+            "type": "key" if keyframe else "delta",
+            "seq": self._seq,
+            "base": None if keyframe else self._base,
+            "time": sim.time_recorder.isoformat(),
+            "currentFrame": sim.frame_counter,
+            "slotCounter": sim.slot_counter,
+            "MaxSlotNumbers": sim.max_slot_number,
+            "periodCounter": sim.period_counter,
+            "MaxPeriod": sim.max_period_numbers,
+        }
+        if keyframe:
+            message["fields"] = {name: _integers(arr) for name, arr in state.items()}
+            self._key_seq, self._force_key = self._seq, False
+            self._base, self._base_state, self._sent = self._seq, state, {}
+        else:
+            fields = {}
+            for name, arr in state.items():
+                patch = _diff(self._base_state[name], arr)
+                if patch is not None:
+                    fields[name] = patch
+            message["fields"] = fields
+            self._sent[self._seq] = state
+        return json.dumps(message)
+
+def decode_frame(data: bytes, layout: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    FrameEncoder.encode 的逆过程（调试与对照用）：头部字段 + {段名: {字段: 数组}}。
+    """
+    values = HEADER.unpack_from(data, 0)
+    header = dict(zip(layout["header"], values))
+    counts = {"sun": 1, "earth": 1, "satellites": header["satellites"], "stations": header["stations"],
+              "rois": header["rois"], "links": header["links"]}
+    offset = HEADER.size
+    frame: Dict[str, Any] = {"header": header}
+    for name, fields in layout["sections"].items():
+        frame[name] = {}
+        for field, dtype, shape in fields:
+            count = counts[name] * int(np.prod(shape))
+            arr = np.frombuffer(data, dtype=dtype, count=count, offset=offset)
+            frame[name][field] = arr.reshape((counts[name], *shape))
+            offset += arr.nbytes + (-arr.nbytes % 4)
+    return frame
+
+def apply_delta(base: Dict[str, np.ndarray], message: Dict[str, Any], shapes: Dict[str, List[int]]) -> Dict[str, np.ndarray]:
+    """
+    客户端侧的增量应用（调试与对照用）：基准帧状态 + 一条增量 / 关键帧消息 -> 当前帧状态（量化单位）。
+    :param shapes: 字段 -> 每个实体的形状（即 layout 中 sections 的 shape）
+    """
+    state = {} if message["type"] == "key" else dict(base)
+    for name, patch in message["fields"].items():
+        shape = shapes[name]
+        if not isinstance(patch, dict):
+            state[name] = np.array(patch, dtype=float).reshape((-1, *shape))
+            continue
+        arr = np.array(state[name], dtype=float)
+        if "idx" in patch:
+            arr[patch["idx"]] += np.array(patch["d"], dtype=float).reshape((len(patch["idx"]), *shape))
+        else:
+            arr += np.array(patch["d"], dtype=float).reshape(arr.shape)
+        state[name] = arr
+    return state
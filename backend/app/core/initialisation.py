@@ -1,7 +1,15 @@
 # 根据period_length和dt_max计算时间步数和时间点列表
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, List
-from app.entities.functions.prepare import preparation_of_earth, preparation_of_roi, preparation_of_satellite, preparation_of_station, preparation_of_sun
+from typing import Any, Dict, List, Optional
+import numpy as np
+from app.config import PRECOMPUTE_LINKS, PRECOMPUTE_MEMORY_LIMIT
+from app.entities.functions.chebyshev import ChebyshevEphemeris
+from app.entities.functions.columnar import WindowCursor
+from app.entities.functions.footprint import footprint_corners_latlon, ground_points_xyz, itrs_to_gcrs_rotation
+from app.entities.functions.prepare import links_cache_path, preparation_of_earth, preparation_of_ephemeris, preparation_of_roi, preparation_of_satellite, preparation_of_station, preparation_of_sun
+from app.entities.functions.propagation import geodetic_latlon
+from app.entities.functions.solar import EclipseIntervals, solve_eclipses
+from app.entities.satellite_entity import SatelliteEntity
 from app.models.api_dict.pj import ProjectDict
 from app.services.cache_service import to_times
 from app.services.network_service import Network
@@ -79,6 +87,12 @@ def build_static_objects(input: ProjectDict, period: timedelta, max_period_numbe
             datetimes=datetime_list
         )
         
+        ephemeris = preparation_of_ephemeris(
+            input=input,
+            datetimes=datetime_list
+        )
+        eclipses = solve_eclipses(ephemeris) if ephemeris else None
+        
         return {
             "sat": sat,
             "sat_datas": sat_datas,
@@ -90,6 +104,8 @@ def build_static_objects(input: ProjectDict, period: timedelta, max_period_numbe
             "eth_data": eth_data,
             "sun": sun,
             "sun_data": sun_data,
+            "ephemeris": ephemeris,
+            "eclipses": eclipses,
         }
         
     except Exception as e:
@@ -97,11 +113,70 @@ def build_static_objects(input: ProjectDict, period: timedelta, max_period_numbe
             print(f"[Build failed: {e}")
             traceback.print_exc()
 
-def init_network(input: ProjectDict, sat_datas: List[Dict[str, Any]], gs_datas: List[Dict[str, Any]]) -> None:
+def init_network(
+    input: ProjectDict,
+    sat_datas: List[Dict[str, Any]],
+    gs_datas: List[Dict[str, Any]],
+    datetime_list: Optional[List[datetime]] = None,
+) -> Network:
     co_info = input.constellation
     net = Network(
         num_planes=co_info.number_of_planes,
         sat_datas=sat_datas,
         gs_datas=gs_datas
     )
-    return net
\ No newline at end of file
+    if PRECOMPUTE_LINKS and sat_datas and datetime_list:
+        net.precompute_links(links_cache_path(input, datetime_list, net.elev_threshold_deg))
+    return net
+
+def build_window_cursor(*datas: Any) -> WindowCursor:
+    """
+    为仿真 / 环境使用的全部缓存记录建立时间窗口游标，窗口大小由 PRECOMPUTE_MEMORY_LIMIT 决定。
+    :param datas: 记录列表或单条记录（earth / sun）
+    """
+    records = []
+    for d in datas:
+        records.extend(d if isinstance(d, list) else [d])
+    return WindowCursor(records, PRECOMPUTE_MEMORY_LIMIT)
+
+def slot_update_satellites(
+    sats: List[SatelliteEntity],
+    ephemeris: Optional[ChebyshevEphemeris],
+    seconds: float,
+    eclipses: Optional[EclipseIntervals] = None,
+) -> Optional[Dict[str, np.ndarray]]:
+    """
+    slot 级别更新：用 Chebyshev 星历在 t0 + seconds 时刻批量插值所有卫星的
+    位置、星下点、速度方向与足迹角点（足迹方向角沿用 period 级别的值），
+    并按地影区间查询光照（充电）状态。
+    sats、ephemeris 与 eclipses 均按 input.satellites 的顺序构建。
+    :return: 插值结果（字段名与卫星缓存相同的并列数组），供二进制帧直接打包；无星历时为 None
+    """
+    if ephemeris is None or not sats:
+        return None
+    rotation = itrs_to_gcrs_rotation(ephemeris.times_at(seconds))
+    pos = ephemeris.position(seconds)
+    velocity = ephemeris.velocity(seconds)
+    velocity = velocity / np.linalg.norm(velocity, axis=-1, keepdims=True)
+    lat, lon = geodetic_latlon(pos[:, None, :], rotation)  # (N, 1)
+
+    azimuth = np.array([s.v for s in sats], dtype=float)
+    half_l = np.array([s.time_series["swath_length"] for s in sats], dtype=float) / 2
+    half_w = np.array([s.time_series["swath_width"] for s in sats], dtype=float) / 2
+    cor_latlon = footprint_corners_latlon(lat, lon, azimuth[:, None], half_l[:, None], half_w[:, None])  # (N, 1, 4, 2)
+    cor_xyz = ground_points_xyz(cor_latlon, rotation)
+
+    sunlit = eclipses.sunlit_at(seconds) if eclipses else None
+
+    for i, s in enumerate(sats):
+        s.move_to(pos[i], (lat[i, 0], lon[i, 0]), velocity[i], cor_xyz[i, 0], cor_latlon[i, 0])
+        if sunlit is not None:
+            s.is_charging = bool(sunlit[i])
+
+    return {
+        "space_xyz": pos,
+        "subpoint_latlon": np.stack([lat[:, 0], lon[:, 0]], axis=-1),
+        "velocity_vector": velocity,
+        "footprint_corners_xyz": cor_xyz[:, 0],
+        "footprint_corners_latlon": cor_latlon[:, 0],
+    }
@@ -9,10 +9,25 @@ class InputHandler:
 
     def __init__(self):
         self._queue: asyncio.Queue[str] = asyncio.Queue()
+        self._arrived = asyncio.Event()
 
     async def push(self, msg: str):
         """Called by the WS handler to enqueue a raw message."""
         await self._queue.put(msg)
+        self._arrived.set()
+
+    async def wait(self, timeout: float) -> bool:
+        """
+        Block until a message is queued or the timeout expires; True if messages are pending.
+        """
+        self._arrived.clear()
+        if not self._queue.empty():
+            return True
+        try:
+            await asyncio.wait_for(self._arrived.wait(), timeout=max(timeout, 0.0))
+        except asyncio.TimeoutError:
+            return False
+        return True
 
     async def poll(self) -> List[str]:
         """
@@ -1,11 +1,37 @@
 import json
 from typing import Optional
 from fastapi import WebSocket
+from app.core.frame_codec import DeltaEncoder, FrameEncoder
 from app.core.simulation import Simulation
 
 class Renderer:
     def __init__(self, sim: Simulation):
         self.sim = sim
+        # 帧协议（客户端在 init 时协商）："binary" / "delta"，None 表示完整的 JSON 文本帧
+        self.encoder: Optional[FrameEncoder] = None
+
+    def use_protocol(self, protocol: Optional[str]) -> None:
+        if protocol == "binary":
+            self.encoder = FrameEncoder(self.sim)
+        elif protocol == "delta":
+            self.encoder = DeltaEncoder(self.sim)
+        else:
+            self.encoder = None
+
+    def ack(self, seq: Optional[int]) -> None:
+        if isinstance(self.encoder, DeltaEncoder) and seq is not None:
+            self.encoder.ack(int(seq))
+
+    def request_keyframe(self) -> None:
+        if isinstance(self.encoder, DeltaEncoder):
+            self.encoder.request_keyframe()
+
+    async def send_layout(self, client: Optional[WebSocket]) -> None:
+        """
+        二进制 / 增量协议下，init 之后先发送一次帧布局或场景描述（JSON 文本）。
+        """
+        if client and self.encoder:
+            await client.send_text(json.dumps(self.encoder.layout()))
 
     async def draw(self, client: Optional[WebSocket]) -> bool:
         if not client:
@@ -13,7 +39,14 @@ class Renderer:
             return False
 
         try:
-            payload = json.dumps(self.sim.serialize(), default=str)
+            if self.encoder:
+                frame = self.encoder.encode()
+                if isinstance(frame, bytes):
+                    await client.send_bytes(frame)
+                else:
+                    await client.send_text(frame)
+                return True
+            payload = self.sim.to_payload()
             # debug log: 每次发送前打印时间或 slotCounter
             # print(f"[Renderer] sending payload time={self.sim.time_recorder} slot={self.sim.slot_counter} period={self.sim.period_counter}")
             await client.send_text(payload)
@@ -23,4 +56,3 @@ class Renderer:
             print(f"[Renderer] Send failed: {e}")
             traceback.print_exc()
             return False
-
@@ -1,17 +1,23 @@
 import json
-from skyfield.api import load
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta, timezone
+import numpy as np
+from app.config import PRECOMPUTE_LINKS, SEEK_CHECKPOINT_PERIODS
 from app.entities.earth_entity import EarthEntity
 from app.entities.roi_entity import ROIEntity
 from app.entities.sun_entity import SunEntity
 from app.services.network_service import Network
-from app.entities.functions.prepare import preparation_of_earth, preparation_of_roi, preparation_of_satellite, preparation_of_station, preparation_of_sun, to_times
+from app.core.initialisation import build_window_cursor, slot_update_satellites
+from app.entities.functions.columnar import ColumnarStore, WindowCursor, full_store, series_at
+from app.entities.functions.solar import EclipseIntervals, solve_eclipses
+from app.entities.functions.chebyshev import ChebyshevEphemeris
+from app.entities.functions.prepare import links_cache_path, preparation_of_earth, preparation_of_ephemeris, preparation_of_roi, preparation_of_satellite, preparation_of_station, preparation_of_sun, to_times
 from app.entities.satellite_entity import SatelliteEntity
 from app.entities.station_entity import StationEntity
 from app.models.api_dict.pj import ProjectDict
 
-TS = load.timescale()
+# 每帧随卫星运动变化的字段（slot 更新时由星历插值覆盖 solar_vector 以外的字段）
+SAT_FRAME_FIELDS = ("space_xyz", "subpoint_latlon", "velocity_vector", "solar_vector", "footprint_corners_xyz", "footprint_corners_latlon")
 
 class Simulation:
     """
@@ -42,6 +48,16 @@ class Simulation:
         self.roi: List[ROIEntity] = []
         self.earth: EarthEntity = None
         self.sun: SunEntity = None
+        self.ephemeris: ChebyshevEphemeris = None
+        self.eclipses: EclipseIntervals = None
+        self.windows: WindowCursor = None
+        # 正向播放时保存的实体状态检查点：period -> 进入该 period 时各卫星的 checkpoint()
+        self.checkpoints: Dict[int, List[tuple]] = {}
+        # 当前 slot 的卫星插值结果（period 边界处为 None，直接取缓存序列）
+        self._slot_arrays: Optional[Dict[str, np.ndarray]] = None
+        self._sat_store: Optional[ColumnarStore] = None
+        # 链路列表及其 JSON 编码（Network.serialize 在同一 period、同一 slot 内返回同一个列表）
+        self._links_json: Optional[tuple] = None
         
         self._roi_datas: List[dict] = []
         self._gs_datas: List[dict] = []
@@ -56,6 +72,7 @@ class Simulation:
         self._load_input_metadata(input)
         self._build_static_objects(input)
         self._init_network(input)
+        self.checkpoints = {0: [s.checkpoint() for s in self.sat]}
         
     def reset(self) -> None:
         """
@@ -65,46 +82,103 @@ class Simulation:
         self.period_counter = 0
         self.slot_counter = 0
         self.frame_counter = 0
-        
-        # for s in self.sat:
-        #     s.reset()
-            
-        # for g in self.gs:
-        #     g.reset()
-            
-        # for r in self.roi:
-        #     r.reset()
-            
-        # if self.eth and self.sun:
-        #     self.eth.reset()
-        #     self.sun.reset()
+        self._slot_arrays = None
+
+        # 卫星的电量与指示状态恢复到初始检查点，其余实体状态在下一次 period_update 时由时间序列重建
+        if 0 in self.checkpoints:
+            self._restore_checkpoint(0)
+
+    @property
+    def last_frame(self) -> int:
+        """
+        update 能推进到的最后一帧（帧 k 对应 period (k-1) // max_slot_number、slot (k-1) % max_slot_number）。
+        """
+        return max(self.max_period_numbers - 1, 1) * self.max_slot_number
+
+    def seek(self, frame: int) -> None:
+        """
+        直接跳到第 frame 帧（前进或后退）：从不晚于目标 period 的最近检查点恢复有状态部分，
+        只对目标 period 执行一次 period_update，再插值到目标 slot。
+        period_update 的结果只取决于 period（位置来自缓存序列、拓扑按 period 切片），
+        中间的 period 无需逐个重放，冷启动向前 seek 的代价与距离无关。
+        之后的 update 从该帧继续推进。
+        """
+        frame = min(max(int(frame), 1), self.last_frame)
+        period, slot = divmod(frame - 1, self.max_slot_number)
+        self._restore_checkpoint(max(p for p in self.checkpoints if p <= period))
+        self.slot_counter = 0
+        self.period_counter = period
+        self.period_update()
+
+        self.slot_counter = slot
+        self.frame_counter = frame
+        # 与 update 中的时间推进保持一致
+        period_start = self.t_start if period == 0 else self.datetime_list[period + 1]
+        self.time_recorder = period_start + slot * self.slot
+        if slot:
+            self.slot_update()
+
+    def seek_time(self, when: datetime | str) -> None:
+        """
+        跳到显示时间（帧的 "time" 字段）不晚于 when 的最后一帧，超出时间范围时取首 / 末帧。
+        客户端应发送帧上显示的时间：发送某帧自己的 "time" 会回到该帧。
+        显示时间与 advance 一致：period 0 为 t_start + slot * self.slot，
+        period p > 0 为 datetime_list[p + 1] + slot * self.slot（比 period 起点晚一个 period），
+        两段之间没有帧的时间取 period 0 的最后一帧。
+        """
+        elapsed = (self._normalize_time(when) - self.t_start).total_seconds()
+        period_seconds, slot_seconds = self.period.total_seconds(), self.slot.total_seconds()
+        period = int(elapsed // period_seconds) - 1 if elapsed >= 2 * period_seconds else 0
+        period_start = (period + 1) * period_seconds if period > 0 else 0.0
+        slot = int((elapsed - period_start) // slot_seconds) if elapsed > 0 else 0
+        self.seek(period * self.max_slot_number + min(slot, self.max_slot_number - 1) + 1)
+
+    def _save_checkpoint(self) -> None:
+        if self.period_counter % SEEK_CHECKPOINT_PERIODS == 0:
+            self.checkpoints[self.period_counter] = [s.checkpoint() for s in self.sat]
+
+    def _restore_checkpoint(self, period: int) -> None:
+        for s, state in zip(self.sat, self.checkpoints[period]):
+            s.restore(state)
 
     def update(self):
+        self.advance(1)
+
+    def advance(self, steps: int = 1) -> None:
+        """
+        推进 steps 帧，结果与连续调用 steps 次 update 相同。
+        中间帧不会被渲染，因此只推进计数器与时间，跨越 period 边界时才执行 period_update
+        （检查点与有状态部分保持正确），slot 插值只对最后一帧做一次。
+        """
         try:
-            # 已到末尾则不推进
-            within_bounds = self.period_counter < self.max_period_numbers - 1
-            if not within_bounds:
-                return
-            
-            # 当前时间
-            current_slot_time = self.time_recorder
-            
-            if self.frame_counter == 0:
-                self.period_update()
-                
-            else:
-                if self.slot_counter >= self.max_slot_number - 1:
+            interpolate = False
+            for _ in range(steps):
+                # 已到末尾（last_frame）则不推进
+                within_bounds = self.frame_counter < self.last_frame
+                if not within_bounds:
+                    break
+
+                if self.frame_counter == 0:
+                    self.period_update()
+                    interpolate = False
+
+                elif self.slot_counter >= self.max_slot_number - 1:
                     self.slot_counter = 0
                     self.period_counter += 1
                     self.time_recorder = self.datetime_list[self.period_counter + 1]
                     # period 级别更新（例如慢频率的 entity）
                     self.period_update()
+                    interpolate = False
 
                 else:
                     self.time_recorder = self.time_recorder + self.slot
                     self.slot_counter += 1
-                    
-            self.frame_counter += 1
+                    interpolate = True
+
+                self.frame_counter += 1
+
+            if interpolate:
+                self.slot_update()
 
         except Exception as e:
             import traceback
@@ -116,6 +190,11 @@ class Simulation:
         Update all entities to the specified period time.
         """
         try:
+            self._save_checkpoint()
+            self._slot_arrays = None
+            if self.windows:
+                self.windows.advance_to(self.period_counter)
+                
             for s in self.sat:
                 s.tick(self.period_counter, self.slot_counter)
                 
@@ -136,6 +215,24 @@ class Simulation:
                 print(f"[Period update failed: {e}")
                 traceback.print_exc()
 
+    def slot_update(self):
+        """
+        slot 级别更新：卫星在 period 之间沿 Chebyshev 星历平滑运动。
+        """
+        seconds = (self.period_counter * self.period + self.slot_counter * self.slot).total_seconds()
+        self._slot_arrays = slot_update_satellites(self.sat, self.ephemeris, seconds, self.eclipses)
+
+    def satellite_arrays(self) -> Dict[str, np.ndarray]:
+        """
+        当前帧所有卫星的空间状态（并列数组，字段名与卫星缓存相同），供二进制帧直接打包。
+        """
+        if not self._sat_datas:
+            return {key: np.zeros(0) for key in SAT_FRAME_FIELDS}
+        arrays = {key: series_at(self._sat_datas, key, self.period_counter, self._sat_store) for key in SAT_FRAME_FIELDS}
+        if self._slot_arrays:
+            arrays.update(self._slot_arrays)
+        return arrays
+
     def serialize(self) -> Dict[str, Any]:
         """
         Return the current simulation state as a serializable dictionary.
@@ -152,11 +249,43 @@ class Simulation:
             "stations": [g.serialize() for g in self.gs],
             "satellites": [s.serialize() for s in self.sat],
             "rois": [r.serialize() for r in self.roi],
-            "links": self.net.serialize(),
+            "links": self.net.serialize(*self._link_positions()),
         }
+
+    def _link_positions(self) -> tuple:
+        """
+        链路端点使用的卫星位置及其缓存键：slot 插值后的位置，period 边界处为 (None, None)（取缓存序列）。
+        """
+        if not self._slot_arrays:
+            return None, None
+        return (self._slot_arrays["space_xyz"], self._slot_arrays["subpoint_latlon"]), self.slot_counter
         
     def to_payload(self) -> str:
-        return json.dumps(self.serialize(), default=str)
+        """
+        与 json.dumps(self.serialize()) 相同的 JSON 文本，由各实体缓存的 JSON 片段拼接：
+        未变化的实体（以及同一 slot 内的链路）不再重新构建快照与编码。
+        """
+        links = self.net.serialize(*self._link_positions())
+        if self._links_json is None or self._links_json[0] is not links:
+            self._links_json = (links, json.dumps(links))
+        header = json.dumps({
+            "time": self.time_recorder.isoformat(),
+            "currentFrame": self.frame_counter,
+            "slotCounter": self.slot_counter,
+            "MaxSlotNumbers": self.max_slot_number,
+            "periodCounter": self.period_counter,
+            "MaxPeriod": self.max_period_numbers,
+        })
+        return "".join([
+            header[:-1],
+            ', "sun": ', self.sun.to_json(),
+            ', "earth": ', self.eth.to_json(),
+            ', "stations": [', ", ".join(g.to_json() for g in self.gs),
+            '], "satellites": [', ", ".join(s.to_json() for s in self.sat),
+            '], "rois": [', ", ".join(r.to_json() for r in self.roi),
+            '], "links": ', self._links_json[1],
+            "}",
+        ])
 
     # Helper methods for time normalization and metadata loading
 
@@ -224,12 +353,20 @@ class Simulation:
                 times=times,
                 datetimes=self.datetime_list
             )
+            
+            self.ephemeris = preparation_of_ephemeris(
+                input=input,
+                datetimes=self.datetime_list
+            )
+            self.eclipses = solve_eclipses(self.ephemeris) if self.ephemeris else None
 
             self._sat_datas = sat_datas
+            self._sat_store = full_store(sat_datas)
             self._gs_datas = gs_datas
             self._roi_datas = roi_datas
             self._eth_datas = eth_data
             self._sun_datas = sun_data
+            self.windows = build_window_cursor(sat_datas, gs_datas, roi_datas, eth_data, sun_data)
             
         except Exception as e:
                 import traceback
@@ -243,5 +380,7 @@ class Simulation:
             sat_datas=self._sat_datas,
             gs_datas=self._gs_datas
         )
+        if PRECOMPUTE_LINKS and self._sat_datas:
+            self.net.precompute_links(links_cache_path(input, self.datetime_list, self.net.elev_threshold_deg))
 
 
@@ -0,0 +1,203 @@
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+import shapely
+from app.config import R_EARTH
+from app.entities.functions.columnar import exists_columns, load_arrays, save_arrays
+
+"""
+接触窗口（access window）：
+- 逐时刻的可见观测 (卫星, 目标, 时刻下标, 指标, 速率) 按 (对, 时刻) 排序后，连续时刻合并成一个窗口，
+  窗口记录起止时刻、指标峰值（地面站为仰角，ROI 为覆盖率）与平均速率
+- 窗口边界取可见的首末采样时刻，精度为一个采样步长
+- AccessWindows 按卫星、按目标各建一份区间索引（组内按起始时刻排序 + 结束时刻前缀最大值），
+  "下一次接触" / "某时刻谁在覆盖" 都是组内二分查找
+"""
+
+WINDOW_FIELDS = ("sat", "target", "start", "end", "peak", "rate")
+
+def extract_windows(
+    pair: np.ndarray,
+    step: np.ndarray,
+    metric: np.ndarray,
+    rate: np.ndarray,
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    把逐时刻观测合并成窗口。
+    :param pair: (M,) 对编号；step: (M,) 时刻下标；metric / rate: (M,) 指标与速率
+    :return: (pair, first_step, last_step, peak_metric, mean_rate)，每个窗口一项
+    """
+    if len(pair) == 0:
+        empty = np.zeros(0)
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), empty, empty
+    order = np.lexsort((step, pair))
+    pair, step, metric, rate = pair[order], step[order], metric[order], rate[order]
+    head = np.ones(len(pair), dtype=bool)
+    head[1:] = (pair[1:] != pair[:-1]) | (step[1:] != step[:-1] + 1)
+    starts = np.nonzero(head)[0]
+    ends = np.append(starts[1:], len(pair)) - 1
+    counts = ends - starts + 1
+    return (
+        pair[starts],
+        step[starts],
+        step[ends],
+        np.maximum.reduceat(metric, starts),
+        np.add.reduceat(rate, starts) / counts,
+    )
+
+def station_elevation(sat_xyz: np.ndarray, gs_xyz: np.ndarray) -> np.ndarray:
+    """
+    地面站看卫星的地心仰角（度），与 is_on_station 的定义一致；两者同形 (..., 3)。
+    """
+    vec = sat_xyz - gs_xyz
+    sin_el = np.sum(vec * gs_xyz, axis=-1) / (np.linalg.norm(vec, axis=-1) * np.linalg.norm(gs_xyz, axis=-1))
+    return np.degrees(np.arcsin(np.clip(sin_el, -1.0, 1.0)))
+
+def _local_xy(latlon: np.ndarray, center: np.ndarray) -> np.ndarray:
+    """
+    经纬度 -> 以 center 为原点的局部平面坐标（米），与 utils.polygon.latlon_to_xy 相同的等距近似。
+    """
+    dlat = np.radians(latlon[..., 0] - center[..., 0])
+    dlon = np.radians((latlon[..., 1] - center[..., 1] + 180.0) % 360.0 - 180.0)
+    return np.stack([R_EARTH * dlat, R_EARTH * dlon * np.cos(np.radians(center[..., 0]))], axis=-1)
+
+def roi_coverage(
+    sub_latlon: np.ndarray,
+    footprints: np.ndarray,
+    footprint_radius: np.ndarray,
+    roi_center: np.ndarray,
+    roi_corners: np.ndarray,
+    roi_radius: np.ndarray,
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    一个时刻所有卫星足迹对所有 ROI 的覆盖率（与 calculate_coverage 相同：重叠面积 / ROI 面积）。
+    先用星下点到 ROI 中心的距离剪枝，只对可能相交的对做多边形求交。
+    :param sub_latlon: (N, 2) 星下点；footprints: (N, 4, 2) 足迹角点；footprint_radius: (N,) 足迹外接圆半径（米）
+    :param roi_center: (R, 2)；roi_corners: (R, 4, 2)；roi_radius: (R,) ROI 外接圆半径（米）
+    :return: (sat, roi, coverage)，只含覆盖率 > 0 的对
+    """
+    offset = _local_xy(sub_latlon[:, None, :], roi_center[None, :, :])
+    near = np.hypot(offset[..., 0], offset[..., 1]) < footprint_radius[:, None] + roi_radius[None, :]
+    sat, roi = np.nonzero(near)
+    if len(sat) == 0:
+        return sat, roi, np.zeros(0)
+    center = roi_center[roi][:, None, :]
+    image = shapely.polygons(_local_xy(footprints[sat], center))
+    target = shapely.polygons(_local_xy(roi_corners[roi], center))
+    area = shapely.area(target)
+    valid = shapely.is_valid(image) & shapely.is_valid(target) & (area > 0)
+    coverage = np.zeros(len(sat))
+    coverage[valid] = shapely.area(shapely.intersection(image[valid], target[valid])) / area[valid]
+    hit = coverage > 0
+    return sat[hit], roi[hit], coverage[hit]
+
+class IntervalGroups:
+    """
+    按组（卫星或目标）划分的区间索引：组内按起始时刻排序，并保存结束时刻的前缀最大值 reach。
+    reach 单调不减，"结束时刻 >= t 的第一个窗口" 即 reach 上的一次二分查找。
+    """
+    def __init__(self, key: np.ndarray, start: np.ndarray, end: np.ndarray, groups: int):
+        self.order = np.lexsort((start, key))
+        self.indptr = np.concatenate([[0], np.cumsum(np.bincount(key, minlength=groups))]).astype(np.int64)
+        self.start = start[self.order]
+        self.end = end[self.order]
+        self.reach = self.end.copy()
+        for lo, hi in zip(self.indptr[:-1], self.indptr[1:]):
+            if hi > lo:
+                self.reach[lo:hi] = np.maximum.accumulate(self.end[lo:hi])
+
+    def members(self, g: int) -> np.ndarray:
+        return self.order[self.indptr[g]:self.indptr[g + 1]]
+
+    def active(self, g: int, t: float) -> np.ndarray:
+        """
+        组 g 中覆盖时刻 t（start <= t <= end）的窗口下标。
+        """
+        lo, hi = self.indptr[g], self.indptr[g + 1]
+        i0 = lo + np.searchsorted(self.reach[lo:hi], t, side="left")
+        i1 = lo + np.searchsorted(self.start[lo:hi], t, side="right")
+        idx = np.arange(i0, max(i0, i1))
+        return self.order[idx[self.end[idx] >= t]]
+
+    def next(self, g: int, t: float) -> Optional[int]:
+        """
+        组 g 中起始最早、且在 t 时尚未结束的窗口（正在进行的窗口优先于之后的窗口）。
+        """
+        lo, hi = self.indptr[g], self.indptr[g + 1]
+        i = lo + np.searchsorted(self.reach[lo:hi], t, side="left")
+        return int(self.order[i]) if i < hi else None
+
+class AccessWindows:
+    """
+    一类接触窗口（卫星-地面站或卫星-ROI）的并列数组与区间索引。
+    start / end 为距时间轴起点的秒数；sat / target 为 sat_datas 与 gs_datas（或 roi_datas）中的下标。
+    """
+    def __init__(self, arrays: Dict[str, np.ndarray], num_sats: int, num_targets: int):
+        self.arrays = {name: np.asarray(arrays[name]) for name in WINDOW_FIELDS}
+        self.num_sats = num_sats
+        self.num_targets = num_targets
+        a = self.arrays
+        self.by_sat = IntervalGroups(a["sat"], a["start"], a["end"], num_sats)
+        self.by_target = IntervalGroups(a["target"], a["start"], a["end"], num_targets)
+
+    @classmethod
+    def from_observations(
+        cls,
+        sat: np.ndarray,
+        target: np.ndarray,
+        step: np.ndarray,
+        metric: np.ndarray,
+        rate: np.ndarray,
+        step_seconds: float,
+        num_sats: int,
+        num_targets: int,
+        ) -> "AccessWindows":
+        pair, first, last, peak, mean_rate = extract_windows(
+            np.asarray(sat, dtype=np.int64) * max(num_targets, 1) + np.asarray(target, dtype=np.int64),
+            np.asarray(step, dtype=np.int64),
+            np.asarray(metric, dtype=float),
+            np.asarray(rate, dtype=float),
+        )
+        return cls({
+            "sat": pair // max(num_targets, 1),
+            "target": pair % max(num_targets, 1),
+            "start": first * step_seconds,
+            "end": last * step_seconds,
+            "peak": peak,
+            "rate": mean_rate,
+        }, num_sats, num_targets)
+
+    def __len__(self) -> int:
+        return len(self.arrays["sat"])
+
+    def window(self, i: int) -> Dict[str, Any]:
+        return {name: self.arrays[name][i].item() for name in WINDOW_FIELDS}
+
+    def of_satellite(self, sat: int) -> List[int]:
+        return self.by_sat.members(sat).tolist()
+
+    def of_target(self, target: int) -> List[int]:
+        return self.by_target.members(target).tolist()
+
+    def next_contact(self, sat: int, t: float) -> Optional[int]:
+        """
+        卫星 sat 在 t 时正在进行或之后最早开始的窗口。
+        """
+        return self.by_sat.next(sat, t)
+
+    def covering(self, target: int, t: float) -> List[int]:
+        """
+        t 时与目标处于接触中的窗口（例如 "谁在覆盖 ROI R"）。
+        """
+        return self.by_target.active(target, t).tolist()
+
+    def save(self, path: str) -> None:
+        save_arrays(path, self.arrays, {"num_sats": self.num_sats, "num_targets": self.num_targets})
+
+    @classmethod
+    def load(cls, path: str) -> "AccessWindows":
+        arrays, manifest = load_arrays(path)
+        return cls(arrays, manifest["num_sats"], manifest["num_targets"])
+
+    @staticmethod
+    def exists(path: str) -> bool:
+        return exists_columns(path)
@@ -0,0 +1,370 @@
+import json
+import mmap
+import os
+import shutil
+import tempfile
+from collections.abc import Mapping
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+
+"""
+列式缓存格式：每个缓存产物是一个目录
+- manifest.json: 字段 dtype / 形状、记录的标量字段（id, order, ...）
+- time.bin: 共享时间轴 (T,)
+- {field}.bin: 每个字段一个连续数组
+    - 时间序列字段按时间优先存放 (T, N, ...)，单个时刻所有记录的数据连续
+    - 静态字段 (N, ...)
+读取时使用 np.memmap(mode="r")，字段按需打开，多个会话 / RL worker 共享操作系统页缓存。
+时间优先的布局使得延长时间范围只需在每个文件末尾追加字节（append_columns），
+截取较短范围只需 memmap 文件的前缀（ColumnarStore(path, steps=...)）。
+"""
+
+MANIFEST = "manifest.json"
+FORMAT_VERSION = 1
+
+def _field_file(path: str, name: str) -> str:
+    return os.path.join(path, f"{name}.bin")
+
+def _to_builtin(value: Any) -> Any:
+    return value.item() if isinstance(value, np.generic) else value
+
+def exists_columns(path: str) -> bool:
+    return os.path.exists(os.path.join(path, MANIFEST))
+
+def save_columns(
+    path: str,
+    records: List[Dict[str, Any]],
+    static_fields: Iterable[str] = (),
+    time: Optional[np.ndarray] = None,
+) -> None:
+    """
+    将若干条记录（dict，数组字段形状一致）写为列式目录。
+    :param records: 每条记录的 "time" 为共享时间轴；其余 ndarray 字段默认视为 (T, ...) 时间序列
+    :param static_fields: 不随时间变化的数组字段，按 (N, ...) 存放
+    :param time: 显式给出时间轴（records 为空时仍能记录覆盖范围），默认取 records[0]["time"]
+    """
+    static_fields = set(static_fields)
+    tmp = _make_tmp(path)
+
+    first = records[0] if records else {}
+    if time is None:
+        time = first.get("time", np.array([], dtype="datetime64[ns]"))
+    time = np.asarray(time, dtype="datetime64[ns]")
+    time.tofile(_field_file(tmp, "time"))
+
+    manifest: Dict[str, Any] = {
+        "version": FORMAT_VERSION,
+        "count": len(records),
+        "steps": len(time),
+        "series": {},
+        "static": {},
+        "records": [],
+    }
+    for key, value in first.items():
+        if key == "time" or not isinstance(value, np.ndarray):
+            continue
+        kind = "static" if key in static_fields else "series"
+        axis = 0 if kind == "static" else 1
+        column = np.ascontiguousarray(np.stack([np.asarray(r[key]) for r in records], axis=axis))
+        column.tofile(_field_file(tmp, key))
+        manifest[kind][key] = {"dtype": column.dtype.str, "shape": list(np.asarray(value).shape[axis:])}
+
+    for r in records:
+        manifest["records"].append({
+            key: _to_builtin(value)
+            for key, value in r.items()
+            if key != "time" and not isinstance(value, np.ndarray)
+        })
+
+    with open(os.path.join(tmp, MANIFEST), "w") as f:
+        json.dump(manifest, f)
+    _publish(tmp, path)
+
+def _make_tmp(path: str) -> str:
+    """
+    与目标同目录的唯一临时目录（同一文件系统，发布时 rename 是原子的）。
+    """
+    parent = os.path.dirname(path) or "."
+    os.makedirs(parent, exist_ok=True)
+    return tempfile.mkdtemp(dir=parent, prefix=os.path.basename(path) + ".tmp.")
+
+def _publish(tmp: str, path: str, replace: bool = False) -> None:
+    """
+    以一次 rename 把写好的临时目录发布为 path，读者只会看到完整的目录。
+    目标已存在时说明其他进程已发布同一产物：保留对方的，丢弃本次结果。
+    :param replace: 已有产物过期（如覆盖范围不足）时先把它移开再发布；
+        已打开的 memmap 不受影响，移开的目录在发布后删除
+    """
+    old = None
+    if os.path.isdir(path) and (replace or not exists_columns(path)):
+        # 过期产物，或旧版本非原子写入中断留下的残缺目录
+        old = tmp + ".old"
+        try:
+            os.rename(path, old)
+        except OSError:
+            old = None
+    try:
+        os.rename(tmp, path)
+    except OSError:
+        shutil.rmtree(tmp, ignore_errors=True)
+    if old is not None:
+        shutil.rmtree(old, ignore_errors=True)
+
+def _write_manifest(path: str, manifest: Dict[str, Any]) -> None:
+    fd, tmp = tempfile.mkstemp(dir=path, prefix=MANIFEST + ".tmp.")
+    with os.fdopen(fd, "w") as f:
+        json.dump(manifest, f)
+    os.replace(tmp, os.path.join(path, MANIFEST))
+
+def append_columns(path: str, time: np.ndarray, records: List[Dict[str, Any]], overlap: int = 0) -> int:
+    """
+    在已有列式目录的时间轴末尾原地追加时间序列（静态字段与标量不变）。
+    :param time: 新数据的时间轴，从第 steps - overlap 步开始
+    :param records: 与已有目录的记录一一对应
+    :param overlap: 新数据开头与已有数据重叠的步数，这几步会被覆盖
+        （用于修正末端依赖下一时刻的差分量，如方向角、速度）
+    :return: 追加后的总步数
+    """
+    store = ColumnarStore(path)
+    start = store.steps - overlap
+    if len(records) != store.count:
+        raise ValueError(f"Expected {store.count} records to append, got {len(records)}")
+
+    columns = {"time": np.asarray(time, dtype="datetime64[ns]")}
+    if records:
+        for key in store.manifest["series"]:
+            columns[key] = np.stack([np.asarray(r[key]) for r in records], axis=1)
+
+    for key, column in columns.items():
+        column = np.ascontiguousarray(column, dtype=store.dtype_of(key))
+        row_bytes = column.nbytes // len(column) if len(column) else 0
+        with open(_field_file(path, key), "r+b") as f:
+            f.seek(start * row_bytes)
+            f.write(column.tobytes())
+
+    # manifest 最后更新：并发读者要么看到旧范围，要么看到完整的新范围
+    manifest = dict(store.manifest)
+    manifest["steps"] = start + len(columns["time"])
+    _write_manifest(path, manifest)
+    return manifest["steps"]
+
+class ColumnarStore:
+    """
+    列式缓存目录的只读视图，字段在第一次访问时才 memmap 打开。
+    :param steps: 只暴露前 steps 个时刻（零拷贝前缀），默认整个时间范围
+    """
+    def __init__(self, path: str, steps: Optional[int] = None):
+        self.path = path
+        with open(os.path.join(path, MANIFEST)) as f:
+            self.manifest: Dict[str, Any] = json.load(f)
+        self.count: int = self.manifest["count"]
+        self.covered_steps: int = self.manifest["steps"]
+        self.steps: int = self.covered_steps if steps is None else min(steps, self.covered_steps)
+        self._columns: Dict[str, np.ndarray] = {}
+
+    def shape_of(self, name: str) -> tuple:
+        if name == "time":
+            return (self.steps,)
+        if name in self.manifest["series"]:
+            return (self.steps, self.count) + tuple(self.manifest["series"][name]["shape"])
+        return (self.count,) + tuple(self.manifest["static"][name]["shape"])
+
+    def dtype_of(self, name: str) -> np.dtype:
+        if name == "time":
+            return np.dtype("datetime64[ns]")
+        spec = self.manifest["series"].get(name) or self.manifest["static"][name]
+        return np.dtype(spec["dtype"])
+
+    def column(self, name: str) -> np.ndarray:
+        """
+        整列数组：时间序列 (T, N, ...)，静态字段 (N, ...)，time (T,)。
+        """
+        if name not in self._columns:
+            shape, dtype = self.shape_of(name), self.dtype_of(name)
+            if int(np.prod(shape)) == 0:
+                self._columns[name] = np.empty(shape, dtype=dtype)
+            else:
+                self._columns[name] = np.memmap(_field_file(self.path, name), dtype=dtype, mode="r", shape=shape)
+        return self._columns[name]
+
+    def fields(self) -> List[str]:
+        return ["time"] + list(self.manifest["series"]) + list(self.manifest["static"])
+
+    def verify(self) -> bool:
+        """
+        检查每个字段文件是否存在且大小与 manifest 一致。
+        """
+        full = ColumnarStore(self.path) if self.steps != self.covered_steps else self
+        for name in self.fields():
+            expected = int(np.prod(full.shape_of(name))) * self.dtype_of(name).itemsize
+            file = _field_file(self.path, name)
+            if not os.path.exists(file) or os.path.getsize(file) != expected:
+                return False
+        return True
+
+    def records(self, labels: Optional[Sequence[Dict[str, Any]]] = None) -> List["RecordView"]:
+        """
+        :param labels: 每条记录覆盖的标量字段（id 等），缓存键不含这些字段时由调用方按当前项目重新标注
+        """
+        if labels is None:
+            return [RecordView(self, i) for i in range(self.count)]
+        if len(labels) != self.count:
+            raise ValueError(f"{len(labels)} labels for {self.count} records in {self.path}")
+        return [RecordView(self, i, label) for i, label in enumerate(labels)]
+
+    def step_bytes(self) -> int:
+        """
+        单个时刻所有时间序列字段（含 time）占用的字节数。
+        """
+        names = ["time"] + list(self.manifest["series"])
+        return sum(int(np.prod(self.shape_of(name)[1:])) * self.dtype_of(name).itemsize for name in names)
+
+    def advise_window(self, start: int, stop: int) -> None:
+        """
+        窗口化读取：预读 [start, stop) 时间步的页面，并释放 start 之前的页面。
+        时间优先布局下每个窗口是各字段文件中的一段连续字节，常驻内存只与窗口大小有关。
+        """
+        if not hasattr(mmap.mmap, "madvise"):
+            return
+        for name in ["time"] + list(self.manifest["series"]):
+            raw = getattr(self.column(name), "_mmap", None)
+            if raw is None:
+                continue
+            row = int(np.prod(self.shape_of(name)[1:])) * self.dtype_of(name).itemsize
+            lo = start * row // mmap.PAGESIZE * mmap.PAGESIZE
+            hi = min(stop * row, len(raw))
+            if lo > 0:
+                raw.madvise(mmap.MADV_DONTNEED, 0, lo)
+            if hi > lo:
+                raw.madvise(mmap.MADV_WILLNEED, lo, hi - lo)
+
+class RecordView(Mapping):
+    """
+    单条记录的 dict 风格视图，行为与原先 pickle 出来的 dict 相同，
+    但数组字段是 memmap 上的切片，访问时才读取。
+    """
+    def __init__(self, store: ColumnarStore, index: int, label: Optional[Dict[str, Any]] = None):
+        self._store = store
+        self._index = index
+        self._scalars: Dict[str, Any] = {**store.manifest["records"][index], **(label or {})}
+        self._views: Dict[str, np.ndarray] = {}
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._scalars:
+            return self._scalars[key]
+        if key not in self._views:
+            manifest = self._store.manifest
+            if key == "time":
+                view = self._store.column("time")
+            elif key in manifest["series"]:
+                view = self._store.column(key)[:, self._index]
+            elif key in manifest["static"]:
+                view = self._store.column(key)[self._index]
+            else:
+                raise KeyError(key)
+            self._views[key] = view
+        return self._views[key]
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self._scalars
+        yield from self._store.fields()
+
+    def __len__(self) -> int:
+        return len(self._scalars) + len(self._store.fields())
+
+    @property
+    def store(self) -> ColumnarStore:
+        return self._store
+
+    @property
+    def index(self) -> int:
+        return self._index
+
+def full_store(records: Sequence[Any]) -> Optional[ColumnarStore]:
+    """
+    records 恰好是同一个列式缓存按顺序的全部记录时返回该缓存，否则 None。
+    此时某一时刻所有记录的字段就是时间优先布局中的一行：store.column(key)[step]。
+    """
+    if not records or not all(isinstance(r, RecordView) for r in records):
+        return None
+    store = records[0].store
+    if len(records) != store.count:
+        return None
+    if any(r.store is not store or r.index != i for i, r in enumerate(records)):
+        return None
+    return store
+
+def series_at(records: Sequence[Any], key: str, step: int, store: Optional[ColumnarStore] = None) -> np.ndarray:
+    """
+    所有记录在 step 时刻的 key 字段，(N, ...)。
+    :param store: full_store(records) 的结果，可由调用方缓存
+    """
+    if store is not None:
+        return np.asarray(store.column(key)[step])
+    return np.stack([np.asarray(r[key][step]) for r in records])
+
+class WindowCursor:
+    """
+    按时间窗口消费一组列式缓存（卫星 / 地面站 / ROI / ...）。
+    仿真推进到窗口之外时切换到该步所在的窗口：预读新窗口、释放之前的页面，
+    多日长时长也只需常驻一个窗口的数据；seek / reset 到任意步同样适用。
+    """
+    def __init__(self, records: Iterable[Any], memory_limit: int):
+        stores: Dict[int, ColumnarStore] = {}
+        for r in records:
+            if isinstance(r, RecordView):
+                stores.setdefault(id(r.store), r.store)
+        self.stores: List[ColumnarStore] = list(stores.values())
+        step_bytes = sum(store.step_bytes() for store in self.stores)
+        self.window: int = max(memory_limit // max(step_bytes, 1), 1)
+        self.start = self.stop = 0
+
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        """
+        依次遍历所有窗口，返回 (start, stop)。
+        """
+        steps = max((store.steps for store in self.stores), default=0)
+        for start in range(0, steps, self.window):
+            self.advance_to(start)
+            yield self.start, self.stop
+
+    def advance_to(self, step: int) -> None:
+        if self.start <= step < self.stop:
+            return
+        self.start = step // self.window * self.window
+        self.stop = self.start + self.window
+        for store in self.stores:
+            store.advise_window(self.start, min(self.stop, store.steps))
+
+def load_columns(path: str, steps: Optional[int] = None, labels: Optional[Sequence[Dict[str, Any]]] = None) -> List[RecordView]:
+    return ColumnarStore(path, steps).records(labels)
+
+def save_arrays(path: str, arrays: Dict[str, np.ndarray], meta: Optional[Dict[str, Any]] = None, replace: bool = False) -> None:
+    """
+    非时间序列的数组产物（链路拓扑、接触窗口等）：每个数组一个 .bin，写入临时目录后整体发布（见 _publish）。
+    :param replace: 替换已有的过期产物，默认保留已有产物
+    """
+    tmp = _make_tmp(path)
+    fields = {}
+    for name, arr in arrays.items():
+        arr = np.ascontiguousarray(arr)
+        arr.tofile(_field_file(tmp, name))
+        fields[name] = {"dtype": arr.dtype.str, "shape": list(arr.shape)}
+    with open(os.path.join(tmp, MANIFEST), "w") as f:
+        json.dump({**(meta or {}), "fields": fields}, f)
+    _publish(tmp, path, replace)
+
+def load_arrays(path: str) -> Tuple[Dict[str, np.ndarray], Dict[str, Any]]:
+    """
+    读取 save_arrays 的产物：(数组 memmap, manifest)。
+    """
+    with open(os.path.join(path, MANIFEST)) as f:
+        manifest = json.load(f)
+    arrays = {}
+    for name, spec in manifest["fields"].items():
+        dtype, shape = np.dtype(spec["dtype"]), tuple(spec["shape"])
+        if int(np.prod(shape)) == 0:
+            arrays[name] = np.empty(shape, dtype=dtype)
+        else:
+            arrays[name] = np.memmap(_field_file(path, name), dtype=dtype, mode="r", shape=shape)
+    return arrays, manifest
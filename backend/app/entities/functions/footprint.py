@@ -0,0 +1,114 @@
+from typing import Union
+import numpy as np
+from pyproj import Geod
+from skyfield.api import Time, wgs84
+from skyfield.framelib import itrs
+
+GEOD = Geod(ellps="WGS84")
+
+# 角点顺序与 (dy, dx) 符号：NE, NW, SW, SE
+CORNER_SIGNS = np.array([
+    [1.0, 1.0],     # NE
+    [1.0, -1.0],    # NW
+    [-1.0, -1.0],   # SW
+    [-1.0, 1.0],    # SE
+])
+
+def itrs_to_gcrs_rotation(times: Time) -> np.ndarray:
+    """
+    ITRS -> GCRS 旋转矩阵，形状 (T, 3, 3)。
+    同一时间网格只需计算一次，可在所有卫星 / ROI 之间共享。
+    """
+    R = itrs.rotation_at(times)  # GCRS -> ITRS, (3, 3, T)
+    if R.ndim == 2:
+        R = R[:, :, None]
+    return np.transpose(R, (2, 1, 0))
+
+def ground_points_xyz(latlon: np.ndarray, rotation: np.ndarray) -> np.ndarray:
+    """
+    地表点（高程 0）在各时刻的 GCRS 坐标，与 wgs84.latlon(lat, lon).at(times[i]) 一致。
+    :param latlon: (..., T, K, 2) 纬度/经度（度），倒数第三维为时间
+    :param rotation: (T, 3, 3) itrs_to_gcrs_rotation 的结果
+    :return: (..., T, K, 3) 坐标（米）
+    """
+    latlon = np.asarray(latlon, dtype=float)
+    lats = latlon[..., 0].ravel()
+    lons = latlon[..., 1].ravel()
+    itrs_xyz = wgs84.latlon(lats, lons).itrs_xyz.m.T.reshape(latlon.shape[:-1] + (3,))
+    return np.einsum("tij,...tkj->...tki", rotation, itrs_xyz)
+
+def ground_track_azimuth(lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """
+    批量计算地面轨迹方向角（度，[0, 360)）：相邻两个星下点之间一次 GEOD.inv 调用。
+    最后一个时刻沿用前一时刻的方向角。
+    :param lats, lons: (..., T) 星下点纬度/经度（度），最后一维为时间，T >= 2
+    :return: (..., T)
+    """
+    lats = np.asarray(lats, dtype=float)
+    lons = np.asarray(lons, dtype=float)
+    az12, _, _ = GEOD.inv(
+        np.ascontiguousarray(lons[..., :-1]).ravel(),
+        np.ascontiguousarray(lats[..., :-1]).ravel(),
+        np.ascontiguousarray(lons[..., 1:]).ravel(),
+        np.ascontiguousarray(lats[..., 1:]).ravel(),
+    )
+    azimuth = np.empty(lats.shape)
+    azimuth[..., :-1] = np.asarray(az12).reshape(lats[..., :-1].shape) % 360
+    azimuth[..., -1] = azimuth[..., -2]
+    return azimuth
+
+def velocity_azimuth(lats: np.ndarray, lons: np.ndarray, itrs_velocity: np.ndarray) -> np.ndarray:
+    """
+    由地固系（ITRS）速度在当地 ENU 坐标系中的方向得到地面轨迹方向角（度，[0, 360)）。
+    不需要下一时刻的位置，适合单个时刻或任意时刻的求值。
+    :param lats, lons: (...) 星下点纬度/经度（度）
+    :param itrs_velocity: (..., 3) ITRS 速度
+    """
+    lat = np.radians(np.asarray(lats, dtype=float))
+    lon = np.radians(np.asarray(lons, dtype=float))
+    v = np.asarray(itrs_velocity, dtype=float)
+    east = -np.sin(lon) * v[..., 0] + np.cos(lon) * v[..., 1]
+    north = (
+        -np.sin(lat) * np.cos(lon) * v[..., 0]
+        - np.sin(lat) * np.sin(lon) * v[..., 1]
+        + np.cos(lat) * v[..., 2]
+    )
+    return np.degrees(np.arctan2(east, north)) % 360
+
+def footprint_corners_latlon(
+    lats: np.ndarray,
+    lons: np.ndarray,
+    azimuth: np.ndarray,
+    half_l: Union[float, np.ndarray],
+    half_w: Union[float, np.ndarray],
+) -> np.ndarray:
+    """
+    批量计算成像足迹四角经纬度（一次 GEOD.fwd 调用）。
+    :param lats, lons, azimuth: 形状相同的 (...) 数组，星下点纬度/经度与地面轨迹方向角（度）
+    :param half_l, half_w: 半扫掠长度/宽度（米），需可与 (...) 广播，例如每颗卫星 (N, 1)
+    :return: (..., 4, 2) 角点 [lat, lon]，顺序 NE, NW, SW, SE
+    """
+    lats, lons, azimuth = np.broadcast_arrays(
+        np.asarray(lats, dtype=float),
+        np.asarray(lons, dtype=float),
+        np.asarray(azimuth, dtype=float),
+    )
+    dy = CORNER_SIGNS[:, 0] * np.asarray(half_l, dtype=float)[..., None]
+    dx = CORNER_SIGNS[:, 1] * np.asarray(half_w, dtype=float)[..., None]
+
+    azs = (np.degrees(np.arctan2(dx, dy)) + azimuth[..., None]) % 360
+    shape = azs.shape
+    dists = np.broadcast_to(np.sqrt(dx**2 + dy**2), shape)
+
+    lons_out, lats_out, _ = GEOD.fwd(
+        np.broadcast_to(lons[..., None], shape).ravel(),
+        np.broadcast_to(lats[..., None], shape).ravel(),
+        azs.ravel(),
+        np.ascontiguousarray(dists).ravel(),
+    )
+    lons_out = ((np.asarray(lons_out) + 180) % 360) - 180
+
+    corners = np.empty(shape + (2,))
+    corners[..., 0] = np.asarray(lats_out).reshape(shape)
+    corners[..., 1] = lons_out.reshape(shape)
+    return corners
@@ -1,7 +1,11 @@
+import hashlib
+import json
+import multiprocessing
 import os
 from datetime import timedelta
 import datetime
-from typing import Any, List, Tuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Callable, List, Optional, Tuple
 import numpy as np
 from app.models.api_dict.pj import ProjectDict
 from app.models.camera_model import CameraModel
@@ -12,140 +16,223 @@ from pyproj import Geod
 from app.entities.earth_entity import EarthEntity
 from app.entities.roi_entity import ROIEntity
 from app.entities.sun_entity import SunEntity
-from skyfield.api import wgs84, load, Time
-from config import EPHEMERIS
+from app.entities.functions.footprint import footprint_corners_latlon, ground_points_xyz, ground_track_azimuth, itrs_to_gcrs_rotation
+from app.entities.functions.chebyshev import ChebyshevEphemeris, fit_segments
+from app.entities.functions.columnar import ColumnarStore, RecordView, append_columns, exists_columns, load_columns, save_columns
+from app.entities.functions.propagation import geodetic_latlon, propagate_constellation, sunlit_mask
+from app.entities.functions.solar import analytic_sun_position, sun_positions
+from skyfield.api import wgs84, Time
+from app.config import ANALYTIC_SUN, CHEBYSHEV_DEGREE, CHEBYSHEV_SEGMENT_SECONDS, PRECOMPUTE_MEMORY_LIMIT, PRECOMPUTE_MIN_SHARD, WALKER_FAST_PATH, get_body, get_timescale
 from entities.satellite_entity import SatelliteEntity
 from entities.station_entity import StationEntity
-import pickle
-from typing import List
 
-TS = load.timescale()
 GEOD = Geod(ellps="WGS84")
 
+CACHE_DIR = "cache"
+
+# 不随时间变化的数组字段（其余数组字段均为 (T, ...) 时间序列）
+GS_STATIC_FIELDS = ("latlon",)
+ROI_STATIC_FIELDS = ("center_latlon", "target_corners_latlon")
+
+# 预计算时每条记录每个时间步的峰值内存估计（字节，含中间数组），用于确定窗口大小
+SAT_STEP_BYTES = 2048
+GS_STEP_BYTES = 128
+ROI_STEP_BYTES = 1024
+
 BASE_AZI = np.array([45, 135, 225, 315])
-SUN = EPHEMERIS['sun']
-EARTH = EPHEMERIS['earth']
-MOON = EPHEMERIS['moon']
 
 def to_times(datetimes: List[datetime.datetime]):
-    return TS.utc(datetimes)
+    return get_timescale().utc(datetimes)
 
 def preparation_of_satellite(
     input: ProjectDict, 
     steps: int, 
     times: Time, 
-    datetimes: List[datetime.datetime]
+    datetimes: List[datetime.datetime],
+    workers: int = 1,
+    progress: Optional[Callable[[dict], None]] = None,
     ) -> Tuple[List[SatelliteEntity], List[dict[str, np.ndarray]]]:
-    sats: List[SatelliteModel] = get_sat_from_project(input=input)
-    project_id = input.id
-    constellation_id = input.constellation.id
-    cache_path = f"cache/{project_id}/sat_datas/{constellation_id}.pkl"
-    if os.path.exists(cache_path):
-        sat_datas = load_pickle(cache_path)
+    """
+    卫星时间序列（列式缓存，缺失部分按内存窗口计算）。
+    进度事件（串行 / 并行相同）：stage="satellites"、cached、shard / shards、
+    done / total（已完成的 卫星 x 时间步，整个请求内单调递增）、steps_done / steps。
+    """
+    cache_path = satellite_cache_path(input, datetimes)
+    labels = satellite_labels(input)
+    total = len(input.satellites or [])
+    if covered_steps(cache_path) >= len(datetimes):
+        sat_datas = load_columns(cache_path, len(datetimes), labels)
         sat_module_list = [SatelliteEntity(time_series=sat_data) for sat_data in sat_datas]
+        report_progress(progress, stage="satellites", cached=True, shard=0, shards=1,
+                        done=total * len(datetimes), total=total * len(datetimes), steps_done=len(datetimes), steps=len(datetimes))
         return sat_module_list, sat_datas
+
+    shards = min(workers, total // PRECOMPUTE_MIN_SHARD)
+    steps_done = covered_steps(cache_path)
+
+    def report(shard: int, sats_done: int, window_start: int, window_stop: int) -> None:
+        report_progress(
+            progress, stage="satellites", cached=False, shard=shard, shards=max(shards, 1),
+            done=total * window_start + sats_done * (window_stop - window_start), total=total * len(datetimes),
+            steps_done=window_stop if sats_done == total else window_start, steps=len(datetimes),
+        )
+
+    def compute(start: int, stop: int) -> List[dict[str, np.ndarray]]:
+        nonlocal steps_done
+        tail = datetimes[start:stop]
+        window_start = steps_done
+        if pool is not None:
+            sat_datas = compute_sat_datas_parallel(input, tail, shards, pool, lambda i, n: report(i, n, window_start, stop))
+        else:
+            sats: List[SatelliteModel] = get_sat_from_project(input=input)
+            sat_datas = compute_sat_datas(sats, len(tail), times[start:stop], tail)
+            report(0, total, window_start, stop)
+        steps_done = stop
+        return sat_datas
+
+    # 整个请求共用一个进程池（spawn：从 FastAPI 线程池中 fork 易死锁），各窗口不再重复启动进程
+    pool = ProcessPoolExecutor(max_workers=shards, mp_context=multiprocessing.get_context("spawn")) if shards > 1 else None
+    try:
+        # 方向角与速度是对下一时刻的差分，延长 / 分窗口时需回退一步重算上一段的最后一个时刻
+        window = precompute_window(total, SAT_STEP_BYTES)
+        sat_datas = load_or_extend_columns(cache_path, datetimes, compute, overlap=1, window=window, labels=labels)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    sat_module_list = [SatelliteEntity(time_series=sat_data) for sat_data in sat_datas]
+    return sat_module_list, sat_datas
+
+def compute_sat_datas_parallel(
+    input: ProjectDict,
+    datetimes: List[datetime.datetime],
+    shards: int,
+    pool: ProcessPoolExecutor,
+    on_shard: Optional[Callable[[int, int], None]] = None,
+    ) -> List[dict[str, np.ndarray]]:
+    """
+    按卫星分片，在进程池中并行计算时间序列，按原顺序合并。
+    每个分片完成时回调 on_shard(分片下标, 本窗口已完成的卫星数)。
+    """
+    all_sats = input.satellites or []
+    bounds = np.linspace(0, len(all_sats), shards + 1).astype(int)
+    results: List[List[dict]] = [[] for _ in range(shards)]
+    done = 0
+    futures = {
+        pool.submit(
+            _sat_shard_worker,
+            input.model_copy(update={"satellites": all_sats[bounds[i]:bounds[i + 1]]}),
+            datetimes,
+        ): i
+        for i in range(shards)
+    }
+    for future in as_completed(futures):
+        i = futures[future]
+        results[i] = future.result()
+        done += len(results[i])
+        if on_shard is not None:
+            on_shard(i, done)
+    return [sat_data for shard in results for sat_data in shard]
+
+def _sat_shard_worker(input: ProjectDict, datetimes: List[datetime.datetime]) -> List[dict[str, np.ndarray]]:
+    sats = get_sat_from_project(input=input)
+    return compute_sat_datas(sats, len(datetimes), to_times(datetimes), datetimes)
+
+def compute_sat_datas(
+    sats: List[SatelliteModel],
+    steps: int,
+    times: Time,
+    datetimes: List[datetime.datetime],
+    ) -> List[dict[str, np.ndarray]]:
+    sun_xyz, sun_geometric = sun_positions(times)
     
-    ast_sun = EARTH.at(times).observe(SUN)
-    # sun_xyz = SUN.at(times).position.m.T
-    sun_xyz = ast_sun.apparent().position.m.T
+    rotation = itrs_to_gcrs_rotation(times)
+
+    # 整个星座一次性传播：(N, T, 3)
+    sat_xyz = propagate_constellation(sats, times)
     
-    sat_datas = []
-    sat_module_list = []
-    for s in sats:
-        geos = s.motion.at(times)
-        sat_xyz = geos.position.m.T
-        
-        sun_vec = sun_xyz - sat_xyz
-        norm = np.linalg.norm(sun_vec, axis=1, keepdims=True)
-        unit_solar_vector = sun_vec / norm
-        
-        is_sunlit = geos.is_sunlit(EPHEMERIS)
-        
-        sp = geos.subpoint()
-        lats = sp.latitude.degrees
-        lons = sp.longitude.degrees
-        
-        topos = wgs84.latlon(lats, lons)
-        sub_geos = topos.at(times)
-        sub_xyz = sub_geos.position.m.T
-
-        az12 = np.zeros(steps)
-        azimuths = np.array([
-            GEOD.inv(lons[i], lats[i], lons[i + 1], lats[i + 1])[0]
-            for i in range(steps - 1)
-        ])
-        az12[:-1] = azimuths % 360
-        az12[-1] = az12[-2]
-        
-        # rotated_azimuths = (az12[:, None] + BASE_AZI[None, :]) % 360
+    sun_vec = sun_xyz[None, :, :] - sat_xyz
+    norm = np.linalg.norm(sun_vec, axis=-1, keepdims=True)
+    unit_solar_vector = sun_vec / norm
+    
+    is_sunlit = sunlit_mask(sat_xyz, sun_geometric)
+    
+    lats, lons = geodetic_latlon(sat_xyz, rotation)
 
-        cor_latlon = np.zeros((steps, 4, 2))
-        
-        swath_w, swath_l = s.camera.calc_swath_width(s.altitude), s.camera.calc_swath_length(s.altitude)
-        half_w = swath_w / 2
-        half_l = swath_l / 2
-
-        for i in range(steps):
-            lon0, lat0 = lons[i], lats[i]
-            az_center = az12[i]
-            # offsets: (dy, dx) 顺序为 NE, NW, SW, SE
-            offsets = [
-                (half_l, half_w),    # NE
-                (half_l, -half_w),   # NW
-                (-half_l, -half_w),  # SW
-                (-half_l, half_w),   # SE
-            ]
-            azs = []
-            dists = []
-            for dy, dx in offsets:
-                az = (np.degrees(np.arctan2(dx, dy)) + az_center) % 360
-                dist = np.sqrt(dx**2 + dy**2)
-                azs.append(az)
-                dists.append(dist)
-            lons_out, lats_out, _ = GEOD.fwd(
-                np.full(4, lon0), np.full(4, lat0), azs, dists
-            )
-            lons_out = ((lons_out + 180) % 360) - 180
-            cor_latlon[i, :, 0], cor_latlon[i, :, 1] = lats_out, lons_out
-
-        corners_xyz = np.zeros((steps, 4, 3))
-        for i in range(steps):
-            for j in range(4):
-                lat, lon = cor_latlon[i][j]
-                corners_xyz[i, j, :] = wgs84.latlon(lat, lon).at(times[i]).position.m
-
-        # Compute velocity vector
-        velocity = np.zeros((steps, 3))
-        velocity[:-1] = sat_xyz[1:] - sat_xyz[:-1]
-        velocity[-1] = velocity[-2]
-        norm_vel = np.linalg.norm(velocity, axis=1, keepdims=True)
-        unit_velocity_vector = velocity / norm_vel
+    az12 = ground_track_azimuth(lats, lons)
+    
+    # rotated_azimuths = (az12[:, None] + BASE_AZI[None, :]) % 360
+    
+    swath_w = np.array([s.camera.calc_swath_width(s.altitude) for s in sats])
+    swath_l = np.array([s.camera.calc_swath_length(s.altitude) for s in sats])
 
+    # 所有卫星、所有时刻的星下点与足迹角点一次性批量计算
+    subpoint_latlon = np.stack([lats, lons], axis=-1)
+    if sats:
+        sub_xyz = ground_points_xyz(subpoint_latlon[:, :, None, :], rotation)[:, :, 0, :]
+        cor_latlon = footprint_corners_latlon(lats, lons, az12, swath_l[:, None] / 2, swath_w[:, None] / 2)
+        corners_xyz = ground_points_xyz(cor_latlon, rotation)
+
+    # Compute velocity vector
+    velocity = np.zeros_like(sat_xyz)
+    velocity[:, :-1] = sat_xyz[:, 1:] - sat_xyz[:, :-1]
+    velocity[:, -1] = velocity[:, -2]
+    norm_vel = np.linalg.norm(velocity, axis=-1, keepdims=True)
+    unit_velocity_vector = velocity / norm_vel
+
+    sat_datas = []
+    for i, s in enumerate(sats):
         sat_data = {
             "id": s.id,
             "order": s.order,
             "plane": s.plane,
             "altitude": s.altitude,
             "time": np.array(datetimes, dtype="datetime64[ns]"),
-            "is_sunlit": is_sunlit,
-            "space_xyz": sat_xyz,
-            "subpoint_xyz": sub_xyz,
-            "subpoint_latlon": np.stack([lats, lons], axis=-1),
-            "azimuth": az12,
-            "swath_length": swath_l,
-            "swath_width": swath_w,
-            "footprint_corners_latlon": cor_latlon,
-            "footprint_corners_xyz": corners_xyz,
-            "solar_vector": unit_solar_vector,
-            "velocity_vector": unit_velocity_vector,
+            "is_sunlit": is_sunlit[i],
+            "space_xyz": sat_xyz[i],
+            "subpoint_xyz": sub_xyz[i],
+            "subpoint_latlon": subpoint_latlon[i],
+            "azimuth": az12[i],
+            "swath_length": swath_l[i],
+            "swath_width": swath_w[i],
+            "footprint_corners_latlon": cor_latlon[i],
+            "footprint_corners_xyz": corners_xyz[i],
+            "solar_vector": unit_solar_vector[i],
+            "velocity_vector": unit_velocity_vector[i],
         }
         
         sat_datas.append(sat_data)
-        sat_module = SatelliteEntity(time_series=sat_data)
-        sat_module_list.append(sat_module)
-        
-    save_pickle(sat_datas, cache_path)
-    return sat_module_list, sat_datas
+    return sat_datas
+
+def preparation_of_ephemeris(
+    input: ProjectDict,
+    datetimes: List[datetime.datetime],
+    segment_seconds: float = CHEBYSHEV_SEGMENT_SECONDS,
+    degree: int = CHEBYSHEV_DEGREE,
+    ) -> Optional[ChebyshevEphemeris]:
+    """
+    分段 Chebyshev 星历，覆盖 [datetimes[0], datetimes[-1] + 一个步长]，供 slot 级别插值。
+    没有卫星时返回 None。
+    """
+    if not input.satellites or not datetimes:
+        return None
+    step = (datetimes[1] - datetimes[0]) if len(datetimes) > 1 else timedelta(0)
+    duration = (datetimes[-1] + step - datetimes[0]).total_seconds()
+    segments = max(int(np.ceil(duration / segment_seconds)), 1)
+    segment_starts = [datetimes[0] + timedelta(seconds=k * segment_seconds) for k in range(segments)]
+    cache_path = ephemeris_cache_path(input, segment_starts, segment_seconds, degree)
+
+    def compute(start: int, stop: int) -> List[dict]:
+        sats: List[SatelliteModel] = get_sat_from_project(input=input)
+        coefficients = fit_segments(sats, segment_starts[start:stop], segment_seconds, degree)
+        return [{
+            "id": s.id,
+            "segment_seconds": float(segment_seconds),
+            "time": np.array(segment_starts[start:stop], dtype="datetime64[ns]"),
+            "position_coefficients": coefficients[:, i],
+        } for i, s in enumerate(sats)]
+
+    records = load_or_extend_columns(cache_path, segment_starts, compute, labels=[{"id": s.id} for s in input.satellites])
+    return ChebyshevEphemeris.from_records(records)
 
 def preparation_of_station(
     input: ProjectDict, 
@@ -153,29 +240,27 @@ def preparation_of_station(
     datetimes: List[datetime.datetime]
     ):
     gs: List[StationModel] = get_gs_from_project(input=input)
-    project_id = input.id
-    cache_path = f"cache/{project_id}/gs_datas.pkl"
-    if os.path.exists(cache_path):
-        gs_datas = load_pickle(cache_path)
-        gs_module_list = [StationEntity(time_series=gs_data) for gs_data in gs_datas]
-        return gs_module_list, gs_datas
-
-    gs_datas = []
-    gs_module_list: List[StationEntity] = []
-    for g in gs:
-        topos = wgs84.latlon(g.loc.lat, g.loc.lon)
-        geos = topos.at(times)
-        gs_xyz = geos.position.m.T
-        gs_data = {
-            "id": g.id,
-            "time": np.array(datetimes, dtype="datetime64[ns]"),
-            "latlon": np.array([g.loc.lat, g.loc.lon]),
-            "xyz": gs_xyz,
-        }
-        gs_datas.append(gs_data)
-        gs_module = StationEntity(time_series=gs_data)
-        gs_module_list.append(gs_module)
-    save_pickle(gs_datas, cache_path)
+    cache_path = station_cache_path(input, datetimes)
+
+    def compute(start: int, stop: int) -> List[dict]:
+        gs_datas = []
+        for g in gs:
+            topos = wgs84.latlon(g.loc.lat, g.loc.lon)
+            geos = topos.at(times[start:stop])
+            gs_xyz = geos.position.m.T
+            gs_data = {
+                "id": g.id,
+                "time": np.array(datetimes[start:stop], dtype="datetime64[ns]"),
+                "latlon": np.array([g.loc.lat, g.loc.lon]),
+                "xyz": gs_xyz,
+            }
+            gs_datas.append(gs_data)
+        return gs_datas
+
+    window = precompute_window(len(gs), GS_STEP_BYTES)
+    gs_datas = load_or_extend_columns(cache_path, datetimes, compute, static_fields=GS_STATIC_FIELDS, window=window,
+                                      labels=[{"id": g.id} for g in gs])
+    gs_module_list = [StationEntity(time_series=gs_data) for gs_data in gs_datas]
     return gs_module_list, gs_datas
 
 def preparation_of_roi(
@@ -185,108 +270,102 @@ def preparation_of_roi(
     datetimes: List[datetime.datetime]
     ):
     roi_models: List[ROIModel] = get_roi_from_project(input=input) 
-    project_id = input.id
-    cache_path = f"cache/{project_id}/roi_datas.pkl"
-    if os.path.exists(cache_path):
-        roi_datas = load_pickle(cache_path)
-        roi_module_list = [ROIEntity(time_series=roi_data) for roi_data in roi_datas]
-        return roi_module_list, roi_datas
-
-    roi_datas = []
-    roi_module_list: List[ROIEntity] = []
-    for roi in roi_models:
-        topos = wgs84.latlon(roi.loc.lat, roi.loc.lon)
-        geos = topos.at(times)
-        roi_center_xyz = geos.position.m.T
-        az = np.array(BASE_AZI)
-        # half_diag_roi = roi.side_length / np.sqrt(2)
-        half_w = roi.width / 2
-        half_l = roi.length / 2
-        distances = np.array([half_w, half_l, half_w, half_l])
-        lon_out, lat_out, _ = GEOD.fwd(np.full(4, roi.loc.lon), np.full(4, roi.loc.lat), az, distances)
-        lon_out = ((lon_out + 180) % 360) - 180
-        cor_latlon = np.zeros((4, 2))
-        cor_latlon[:, 0], cor_latlon[:, 1] = lat_out, lon_out
-        corners_xyz = np.zeros((steps, 4, 3))
-        for i in range(steps):
-            for j in range(4):
-                lat, lon = cor_latlon[j]
-                corners_xyz[i, j, :] = wgs84.latlon(lat, lon).at(times[i]).position.m
-        roi_data = {
-            "id": roi.id,
-            "time": np.array(datetimes, dtype="datetime64[ns]"),
-            "roi_length": roi.length,
-            "roi_width": roi.width,
-            "center_latlon": np.array([roi.loc.lat, roi.loc.lon]),
-            "center_xyz": roi_center_xyz,
-            "target_corners_latlon": cor_latlon,
-            "target_corners_xyz": corners_xyz,
-        }
-        roi_datas.append(roi_data)
-        roi_module = ROIEntity(time_series=roi_data)
-        roi_module_list.append(roi_module)
-    save_pickle(roi_datas, cache_path)
+    cache_path = roi_cache_path(input, datetimes)
+
+    def compute(start: int, stop: int) -> List[dict]:
+        rotation = itrs_to_gcrs_rotation(times[start:stop])
+        roi_datas = []
+        for roi in roi_models:
+            topos = wgs84.latlon(roi.loc.lat, roi.loc.lon)
+            geos = topos.at(times[start:stop])
+            roi_center_xyz = geos.position.m.T
+            az = np.array(BASE_AZI)
+            # half_diag_roi = roi.side_length / np.sqrt(2)
+            half_w = roi.width / 2
+            half_l = roi.length / 2
+            distances = np.array([half_w, half_l, half_w, half_l])
+            lon_out, lat_out, _ = GEOD.fwd(np.full(4, roi.loc.lon), np.full(4, roi.loc.lat), az, distances)
+            lon_out = ((lon_out + 180) % 360) - 180
+            cor_latlon = np.zeros((4, 2))
+            cor_latlon[:, 0], cor_latlon[:, 1] = lat_out, lon_out
+            corners_xyz = ground_points_xyz(np.broadcast_to(cor_latlon, (stop - start, 4, 2)), rotation)
+            roi_data = {
+                "id": roi.id,
+                "time": np.array(datetimes[start:stop], dtype="datetime64[ns]"),
+                "roi_length": roi.length,
+                "roi_width": roi.width,
+                "center_latlon": np.array([roi.loc.lat, roi.loc.lon]),
+                "center_xyz": roi_center_xyz,
+                "target_corners_latlon": cor_latlon,
+                "target_corners_xyz": corners_xyz,
+            }
+            roi_datas.append(roi_data)
+        return roi_datas
+
+    window = precompute_window(len(roi_models), ROI_STEP_BYTES)
+    roi_datas = load_or_extend_columns(cache_path, datetimes, compute, static_fields=ROI_STATIC_FIELDS, window=window,
+                                       labels=[{"id": r.id} for r in roi_models])
+    roi_module_list = [ROIEntity(time_series=roi_data) for roi_data in roi_datas]
     return roi_module_list, roi_datas
 
 def preparation_of_sun(
     times: Time,
     datetimes: List[datetime.datetime]):
-    cache_path = f"cache/sun_datas.pkl"
-    if os.path.exists(cache_path):
-        sun_datas = load_pickle(cache_path)
-        sun_module = SunEntity(time_series=sun_datas)
-        return sun_module, sun_datas
-    ast_sun = EARTH.at(times).observe(SUN)
-    sun_ecef = ast_sun.apparent().position.m.T
-    sun_datas = {
+    cache_path = sun_cache_path(datetimes)
+
+    def compute(start: int, stop: int) -> List[dict]:
+        sun_ecef = sun_positions(times[start:stop])[0]
+        return [{
             "id": "sun",
-            "time": np.array(datetimes, dtype="datetime64[ns]"),
+            "time": np.array(datetimes[start:stop], dtype="datetime64[ns]"),
             "xyz": sun_ecef,
-        }
+        }]
+
+    sun_datas = load_or_extend_columns(cache_path, datetimes, compute)[0]
     sun_module = SunEntity(time_series=sun_datas)
-    save_pickle(sun_datas, cache_path)
     return sun_module, sun_datas
     
 def preparation_of_moon(
     times: Time,
     datetimes: List[datetime.datetime]):
-    cache_path = "cache/moon_datas.pkl"
-    if os.path.exists(cache_path):
-        moon_datas = load_pickle(cache_path)
-        return moon_datas
-    ast_moon = EARTH.at(times).observe(MOON)
-    moon_ecef = ast_moon.apparent().position.m
-    moon_datas = {
+    cache_path = artifact_cache_path("moon", time_grid_signature(datetimes))
+
+    def compute(start: int, stop: int) -> List[dict]:
+        ast_moon = get_body('earth').at(times[start:stop]).observe(get_body('moon'))
+        moon_ecef = ast_moon.apparent().position.m.T
+        return [{
             "id": "moon",
-            "time": np.array(datetimes, dtype="datetime64[ns]"),
+            "time": np.array(datetimes[start:stop], dtype="datetime64[ns]"),
             "xyz": moon_ecef,
-        }
-    save_pickle(moon_datas, cache_path)
-    return moon_datas
+        }]
+
+    return load_or_extend_columns(cache_path, datetimes, compute)[0]
     
 def preparation_of_earth(
     dt: timedelta,
     times: Time,
     datetimes: List[datetime.datetime]):
-    cache_path = "cache/earth_datas.pkl"
-    if os.path.exists(cache_path):
-        earth_datas = load_pickle(cache_path)
-        eth_module = EarthEntity(time_series=earth_datas)
-        return eth_module, earth_datas
+    cache_path = earth_cache_path(datetimes)
     if len(datetimes) < 2:
         raise ValueError("At least two datetimes are required to calculate Earth rotation.")
     ts_duration = dt.total_seconds()
-    ast_earth = EARTH.at(times)
-    ecef_earth = ast_earth.position.m.T
-    rotate = [(2 * np.pi / 86400) * ts_duration * i for i in range(len(datetimes))]
-    earth_datas = {
+
+    def compute(start: int, stop: int) -> List[dict]:
+        if ANALYTIC_SUN:
+            # 解析模式下以日心坐标近似（与太阳系质心差约 0.005 AU 内）
+            ecef_earth = -analytic_sun_position(times[start:stop])
+        else:
+            ecef_earth = get_body('earth').at(times[start:stop]).position.m.T
+        rotate = [(2 * np.pi / 86400) * ts_duration * i for i in range(start, stop)]
+        return [{
             "id": "earth",
-            "time": np.array(datetimes, dtype="datetime64[ns]"),
+            "time": np.array(datetimes[start:stop], dtype="datetime64[ns]"),
             "xyz": ecef_earth,
             "rotation": np.array(rotate, dtype=float)
-        }
+        }]
+
+    earth_datas = load_or_extend_columns(cache_path, datetimes, compute)[0]
     eth_module = EarthEntity(time_series=earth_datas)
-    save_pickle(earth_datas, cache_path)
     return eth_module, earth_datas
 
 
@@ -337,11 +416,150 @@ def get_roi_from_project(input: ProjectDict) -> List[ROIModel]:
     ]
     return rois
     
-def save_pickle(obj: Any, path: str) -> None:
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    with open(path, "wb") as f:
-        pickle.dump(obj, f)
-
-def load_pickle(path: str) -> Any:
-    with open(path, "rb") as f:
-        return pickle.load(f)
\ No newline at end of file
+def time_grid_signature(datetimes: List[datetime.datetime]) -> dict:
+    """
+    时间网格的缓存签名：只含起点与步长。
+    步数不进入缓存键，由 manifest 中的 steps 记录已覆盖的范围，
+    同一起点 / 步长的不同时长共用一份缓存（见 load_or_extend_columns）。
+    """
+    step = (datetimes[1] - datetimes[0]).total_seconds() if len(datetimes) > 1 else 0.0
+    return {
+        "start": datetimes[0].isoformat() if datetimes else None,
+        "step": step,
+    }
+
+def covered_steps(cache_path: str) -> int:
+    """
+    缓存目录已覆盖的时间步数，不存在时为 0。
+    """
+    return ColumnarStore(cache_path).covered_steps if exists_columns(cache_path) else 0
+
+def load_or_extend_columns(
+    cache_path: str,
+    datetimes: List[datetime.datetime],
+    compute: Callable[[int, int], List[dict]],
+    static_fields: Tuple[str, ...] = (),
+    overlap: int = 0,
+    window: Optional[int] = None,
+    labels: Optional[List[dict]] = None,
+    ) -> List[RecordView]:
+    """
+    按时间覆盖范围复用列式缓存：
+    - 已覆盖 >= 请求步数：直接返回前 len(datetimes) 步的零拷贝视图
+    - 已覆盖较短：只计算缺失的尾部，原地追加到各字段文件末尾
+    - 不存在：从头计算
+    缺失部分按 window 步一个窗口计算，每个窗口写盘后即释放，峰值内存只与窗口大小有关。
+    :param compute: compute(start, stop) 返回 datetimes[start:stop] 上的记录
+    :param overlap: 每个窗口需要回退的步数（末端依赖下一时刻的差分量）
+    :param window: 每个窗口的步数，默认一次算完
+    :param labels: 按当前项目重新标注的记录标量（id 等不进入缓存键，见 artifact_cache_path）
+    """
+    steps = len(datetimes)
+    window = max(window or steps, overlap + 1, 2)
+    covered = covered_steps(cache_path)
+    while covered < steps or not exists_columns(cache_path):
+        start = max(covered - overlap, 0)
+        stop = min(covered + window, steps)
+        time = np.array(datetimes[start:stop], dtype="datetime64[ns]")
+        if not exists_columns(cache_path):
+            save_columns(cache_path, compute(start, stop), static_fields, time=time)
+        else:
+            append_columns(cache_path, time, compute(start, stop), overlap=covered - start)
+        covered = stop
+    return load_columns(cache_path, steps, labels)
+
+def precompute_window(count: int, step_bytes: int, limit: int = PRECOMPUTE_MEMORY_LIMIT) -> int:
+    """
+    在内存上限 limit 内，count 条记录一个窗口最多能算多少个时间步。
+    """
+    return max(limit // max(count * step_bytes, 1), 2)
+
+def artifact_cache_path(kind: str, *inputs: Any) -> str:
+    """
+    内容寻址的缓存路径：cache/{kind}/{hash(inputs)}/（列式目录，见 columnar.py）。
+    inputs 应包含该产物的全部物理输入（TLE、经纬度、尺寸、时间网格、相机等），输入不变即可跨项目复用；
+    id / 编号等每个项目各不相同的标签不进入缓存键，读取后由 labels 重新标注。
+    """
+    digest = hashlib.sha256(json.dumps(inputs, sort_keys=True, default=str).encode()).hexdigest()[:24]
+    return os.path.join(CACHE_DIR, kind, digest)
+
+def satellite_cache_path(input: ProjectDict, datetimes: List[datetime.datetime]) -> str:
+    cam = CameraModel.from_dict(input.hardware)
+    return artifact_cache_path(
+        "satellites",
+        time_grid_signature(datetimes),
+        input.constellation.altitude,
+        [cam.fov_w, cam.fov_l],
+        sun_model(),
+        propagator_model(),
+        [[s.tle1, s.tle2] for s in input.satellites or []],
+    )
+
+def satellite_labels(input: ProjectDict) -> List[dict]:
+    return [{"id": s.id, "order": s.order, "plane": s.plane} for s in input.satellites or []]
+
+def ephemeris_cache_path(input: ProjectDict, segment_starts: List[datetime.datetime], segment_seconds: float, degree: int) -> str:
+    return artifact_cache_path(
+        "ephemeris",
+        time_grid_signature(segment_starts),
+        [segment_seconds, degree],
+        propagator_model(),
+        [[s.tle1, s.tle2] for s in input.satellites or []],
+    )
+
+def links_cache_path(input: ProjectDict, datetimes: List[datetime.datetime], elev_threshold_deg: float) -> str:
+    """
+    整段链路拓扑（LinkTensor）的缓存路径，由卫星 / 地面站缓存与网络参数共同决定。
+    """
+    return artifact_cache_path(
+        "links",
+        satellite_cache_path(input, datetimes),
+        station_cache_path(input, datetimes),
+        input.constellation.number_of_planes,
+        # ISL 由轨道面 / 面内编号决定，它们不在卫星缓存键中
+        [[s.plane, s.order] for s in input.satellites or []],
+        elev_threshold_deg,
+    )
+
+def access_cache_path(input: ProjectDict, datetimes: List[datetime.datetime], elev_threshold_deg: float) -> str:
+    """
+    接触窗口的缓存路径。窗口会被时间范围截断，因此步数也进入缓存键；
+    末项为窗口格式版本（2：ROI 窗口速率记为 NaN）。
+    """
+    return artifact_cache_path(
+        "access",
+        links_cache_path(input, datetimes, elev_threshold_deg),
+        roi_cache_path(input, datetimes),
+        len(datetimes),
+        2,
+    )
+
+def station_cache_path(input: ProjectDict, datetimes: List[datetime.datetime]) -> str:
+    return artifact_cache_path(
+        "stations",
+        time_grid_signature(datetimes),
+        [[g.location.lat, g.location.lon] for g in input.ground_stations or []],
+    )
+
+def roi_cache_path(input: ProjectDict, datetimes: List[datetime.datetime]) -> str:
+    return artifact_cache_path(
+        "rois",
+        time_grid_signature(datetimes),
+        [[r.location.lat, r.location.lon, r.length, r.width] for r in input.rois or []],
+    )
+
+def sun_cache_path(datetimes: List[datetime.datetime]) -> str:
+    return artifact_cache_path("sun", time_grid_signature(datetimes), sun_model())
+
+def sun_model() -> str:
+    return "analytic" if ANALYTIC_SUN else "de421"
+
+def propagator_model() -> str:
+    return "walker" if WALKER_FAST_PATH else "sgp4"
+
+def earth_cache_path(datetimes: List[datetime.datetime]) -> str:
+    return artifact_cache_path("earth", time_grid_signature(datetimes), sun_model())
+
+def report_progress(progress: Optional[Callable[[dict], None]], **event: Any) -> None:
+    if progress is not None:
+        progress(event)
@@ -0,0 +1,73 @@
+from typing import List, Tuple
+import numpy as np
+from sgp4.api import SatrecArray, jday
+from skyfield.api import Time
+from skyfield.constants import ERAD
+from skyfield.geometry import intersect_line_and_sphere
+from skyfield.sgp4lib import TEME
+from app.config import WALKER_FAST_PATH
+from app.entities.functions.walker import is_generated_walker, propagate_walker
+from app.models.satellite_model import SatelliteModel
+
+# skyfield 的 Geocentric.subpoint() 使用 IERS2010 椭球
+IERS2010_A = 6378136.6
+IERS2010_F = 1 / 298.25642
+IERS2010_E2 = IERS2010_F * (2 - IERS2010_F)
+
+def teme_to_gcrs_rotation(times: Time) -> np.ndarray:
+    """
+    TEME -> GCRS 旋转矩阵，形状 (T, 3, 3)，整个星座共享一次计算。
+    """
+    R = TEME.rotation_at(times)  # GCRS -> TEME, (3, 3, T)
+    if R.ndim == 2:
+        R = R[:, :, None]
+    return np.transpose(R, (2, 1, 0))
+
+def propagate_constellation(sats: List[SatelliteModel], times: Time) -> np.ndarray:
+    """
+    用 SatrecArray 对所有 TLE 在同一时间网格上一次性做 SGP4 传播。
+    结果与逐颗调用 s.motion.at(times).position.m 一致。
+    WALKER_FAST_PATH 打开且识别为生成式 Walker 星座时改用解析传播（见 walker.py）。
+    :return: (N_sat, T, 3) GCRS 坐标（米）
+    """
+    if not sats:
+        return np.zeros((0, len(times), 3))
+    satrecs = [s.motion.model for s in sats]
+    if WALKER_FAST_PATH and is_generated_walker(satrecs):
+        r_teme_km = propagate_walker(satrecs, times)
+    else:
+        jd, fr = jday(*times.utc)
+        jd = np.atleast_1d(np.asarray(jd, dtype=float))
+        fr = np.atleast_1d(np.asarray(fr, dtype=float))
+        _, r_teme_km, _ = SatrecArray(satrecs).sgp4(jd, fr)  # (N, T, 3)
+    rotation = teme_to_gcrs_rotation(times)
+    return np.einsum("tij,ntj->nti", rotation, r_teme_km * 1000.0)
+
+def geodetic_latlon(xyz: np.ndarray, rotation: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    GCRS 坐标 -> 星下点地理纬度/经度（度），与 geos.subpoint() 相同的 IERS2010 迭代。
+    :param xyz: (..., T, 3) GCRS 坐标（米）
+    :param rotation: (T, 3, 3) ITRS -> GCRS 旋转矩阵
+    """
+    x, y, z = np.moveaxis(np.einsum("tji,...tj->...ti", rotation, xyz), -1, 0)
+    R = np.sqrt(x * x + y * y)
+    lat = np.arctan2(z, R)
+    for _ in range(3):
+        sin_lat = np.sin(lat)
+        e2_sin_lat = IERS2010_E2 * sin_lat
+        aC = IERS2010_A / np.sqrt(1.0 - e2_sin_lat * sin_lat)
+        lat = np.arctan2(z + aC * e2_sin_lat, R)
+    lon = (np.arctan2(y, x) - np.pi) % (2 * np.pi) - np.pi
+    return np.degrees(lat), np.degrees(lon)
+
+def sunlit_mask(xyz: np.ndarray, sun_m: np.ndarray) -> np.ndarray:
+    """
+    批量计算是否处于阳照区，与 geos.is_sunlit(EPHEMERIS) 一致。
+    :param xyz: (N, T, 3) 卫星 GCRS 坐标（米）
+    :param sun_m: (T, 3) 地心指向太阳的几何位置（米）
+    :return: (N, T) bool
+    """
+    earth_m = -np.moveaxis(xyz, -1, 0)  # (3, N, T)
+    sun = sun_m.T[:, None, :]
+    _, far = intersect_line_and_sphere(sun + earth_m, earth_m, ERAD)
+    return np.nan_to_num(far) <= 0
@@ -0,0 +1,35 @@
+import json
+from typing import Any, Callable, Dict, Optional
+
+"""
+实体快照的序列化缓存：
+- 实体的空间状态只在 period 更新（_at）或 slot 插值（move_to）时变化，指示状态 / 电量在两次更新之间也可能被修改
+- 缓存以 "状态键" 复用：键不变且未 invalidate() 时直接返回上次的 dict 与 JSON 片段，不再构建 pydantic 快照
+- JSON 片段与 json.dumps(dict) 完全相同，Simulation.to_payload 直接拼接，不再重复编码未变化的实体
+"""
+
+class SnapshotCache:
+    def __init__(self):
+        self.key: Any = None
+        self.data: Optional[Dict[str, Any]] = None
+        self.json: Optional[str] = None
+
+    def invalidate(self) -> None:
+        self.data = self.json = None
+
+    def get(self, build: Callable[[], Dict[str, Any]], key: Any = None) -> Dict[str, Any]:
+        if self.data is None or self.key != key:
+            self.data, self.key, self.json = build(), key, None
+        return self.data
+
+    def get_json(self, build: Callable[[], Dict[str, Any]], key: Any = None) -> str:
+        data = self.get(build, key)
+        if self.json is None:
+            self.json = json.dumps(data)
+        return self.json
+
+def join_json(fragments: Any) -> str:
+    """
+    把若干 JSON 对象片段合并为一个对象（与 json.dumps 合并后的 dict 逐字节相同）。
+    """
+    return "{" + ", ".join(f[1:-1] for f in fragments if f != "{}") + "}"
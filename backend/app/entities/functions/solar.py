@@ -0,0 +1,124 @@
+from typing import List, Tuple
+import numpy as np
+from skyfield.api import Time
+from skyfield.constants import AU_M, ERAD
+from app.config import ANALYTIC_SUN, ECLIPSE_SAMPLE_SECONDS, get_body
+from app.entities.functions.chebyshev import ChebyshevEphemeris
+
+"""
+太阳位置与地影：
+- 解析太阳模型（天文年历低精度公式，加岁差修正到 J2000 赤道系），误差约 0.01°，
+  ANALYTIC_SUN 打开时替代 DE421 的 observe().apparent() 流程
+- 地影求解：在粗网格上对所有卫星求阴影函数，变号区间内二分求出进 / 出本影时刻，
+  之后任意时刻的光照状态是一次二分查找
+"""
+
+# 黄经岁差（度 / 日），用于把当日平春分点换算到 J2000
+PRECESSION_DEG_PER_DAY = 50.29 / 3600 / 365.25
+OBLIQUITY_J2000_DEG = 23.439291
+
+def analytic_sun_position(times: Time) -> np.ndarray:
+    """
+    解析太阳地心位置（J2000 / GCRS 赤道坐标，米）。
+    :return: (T, 3)
+    """
+    n = np.atleast_1d(times.tt) - 2451545.0
+    L = np.radians(280.460 + 0.9856474 * n)
+    g = np.radians(357.528 + 0.9856003 * n)
+    lam = L + np.radians(1.915) * np.sin(g) + np.radians(0.020) * np.sin(2 * g) - np.radians(PRECESSION_DEG_PER_DAY * n)
+    eps = np.radians(OBLIQUITY_J2000_DEG)
+    R = (1.00014 - 0.01671 * np.cos(g) - 0.00014 * np.cos(2 * g)) * AU_M
+    return np.stack([
+        R * np.cos(lam),
+        R * np.cos(eps) * np.sin(lam),
+        R * np.sin(eps) * np.sin(lam),
+    ], axis=-1)
+
+def sun_positions(times: Time) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    地心太阳位置 (视位置, 几何位置)，各为 (T, 3) 米。
+    解析模式下二者相同（差别为光行差，约 20"）。
+    """
+    if ANALYTIC_SUN:
+        sun = analytic_sun_position(times)
+        return sun, sun
+    SUN, EARTH = get_body('sun'), get_body('earth')
+    apparent = EARTH.at(times).observe(SUN).apparent().position.m.T
+    geometric = (SUN - EARTH).at(times).position.m.T
+    return apparent, geometric
+
+def shadow_function(xyz: np.ndarray, sun_m: np.ndarray) -> np.ndarray:
+    """
+    卫星指向太阳的射线与地球球面的最近距离减去地球半径：> 0 阳照，<= 0 本影。
+    与 sunlit_mask / is_sunlit 的判定一致，且随时间连续，便于求根。
+    :param xyz: (..., 3) 卫星 GCRS 坐标（米）
+    :param sun_m: 可与 xyz 广播的地心太阳位置（米）
+    """
+    d = sun_m - xyz
+    d = d / np.linalg.norm(d, axis=-1, keepdims=True)
+    along = np.maximum(-np.sum(xyz * d, axis=-1), 0.0)
+    closest = xyz + along[..., None] * d
+    return np.linalg.norm(closest, axis=-1) - ERAD
+
+class EclipseIntervals:
+    """
+    每颗卫星的进 / 出本影时刻（距星历 t0 的秒数，升序）。
+    光照状态 = 起始状态 XOR（t 之前经过的边界数为奇数）。
+    """
+    def __init__(self, edges: List[np.ndarray], sunlit_at_start: np.ndarray):
+        self.edges = edges
+        self.sunlit_at_start = np.asarray(sunlit_at_start, dtype=bool)
+
+    def is_sunlit(self, index: int, seconds: float) -> bool:
+        crossed = np.searchsorted(self.edges[index], seconds, side="right")
+        return bool(self.sunlit_at_start[index] ^ (crossed % 2 == 1))
+
+    def sunlit_at(self, seconds: float) -> np.ndarray:
+        """
+        所有卫星在该时刻的光照状态，(N,) bool。
+        """
+        crossed = np.array([np.searchsorted(e, seconds, side="right") for e in self.edges], dtype=int)
+        return self.sunlit_at_start ^ (crossed % 2 == 1)
+
+    def intervals(self, index: int) -> List[Tuple[float, float]]:
+        """
+        第 index 颗卫星的本影区间 [(entry, exit), ...]；首尾可能以星历边界截断。
+        """
+        edges = [float(e) for e in self.edges[index]]
+        if not self.sunlit_at_start[index]:
+            edges.insert(0, 0.0)
+        if len(edges) % 2 == 1:
+            edges.append(float(np.inf))
+        return [(edges[i], edges[i + 1]) for i in range(0, len(edges), 2)]
+
+def solve_eclipses(
+    ephemeris: ChebyshevEphemeris,
+    step: float = ECLIPSE_SAMPLE_SECONDS,
+    iterations: int = 30,
+    ) -> EclipseIntervals:
+    """
+    在 [0, ephemeris.duration] 上求所有卫星的地影边界。
+    先以 step 秒采样阴影函数，再对每个变号区间二分 iterations 次（step=60 时精度约 0.1 ms）。
+    短于 step 的掠射地影可能被漏掉。
+    """
+    t = np.append(np.arange(0.0, ephemeris.duration, step), ephemeris.duration)
+    sun = sun_positions(ephemeris.times_at(t))[1]  # (T, 3)
+    f = shadow_function(ephemeris.position(t), sun[None, :, :])  # (N, T)
+    lit = f > 0
+
+    sat_idx, k = np.nonzero(lit[:, :-1] != lit[:, 1:])
+    lo, hi = t[k], t[k + 1]
+    lo_lit = lit[sat_idx, k]
+    for _ in range(iterations):
+        mid = (lo + hi) / 2
+        # 区间内太阳位置线性插值（太阳每分钟只移动约 0.04°）
+        w = ((mid - t[k]) / (t[k + 1] - t[k]))[:, None]
+        sun_mid = sun[k] * (1 - w) + sun[k + 1] * w
+        mid_lit = shadow_function(ephemeris.position_of(sat_idx, mid), sun_mid) > 0
+        same = mid_lit == lo_lit
+        lo = np.where(same, mid, lo)
+        hi = np.where(same, hi, mid)
+
+    crossings = (lo + hi) / 2
+    edges = [np.sort(crossings[sat_idx == n]) for n in range(lit.shape[0])]
+    return EclipseIntervals(edges, lit[:, 0])
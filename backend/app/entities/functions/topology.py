@@ -0,0 +1,337 @@
+from typing import Callable, Dict, NamedTuple, Optional, Sequence, Tuple
+import numpy as np
+from scipy.spatial import cKDTree
+from app.config import R_EARTH
+from app.entities.functions.columnar import exists_columns, load_arrays, save_arrays
+
+"""
+向量化的链路拓扑计算：
+- 候选邻居表（同轨前后 + 相邻轨道同序号）只与星座构型有关，构建一次
+- 每个 period 只需一个 (N, 3) 位置矩阵，距离 / 视距判定 / 链路预算都是数组运算
+- 结果是并列的索引与数值数组（LinkTable），序列化与 RL 状态都直接读数组，LinkSnapshot 只在按 id 查询时构建
+- 拓扑只随 period 变化，可以对整个时间范围预计算一次（LinkTensor），之后每个 period 只是切片
+"""
+
+# 可见锥剪枝的保守量：地面站取极半径；星下点 / 站点用大地纬度近似方向（与地心方向相差 < 0.2°）
+EARTH_POLAR_RADIUS = 6356752.3
+CONE_MARGIN_RAD = np.radians(1.0)
+
+class LinkArrays(NamedTuple):
+    """
+    一组链路的并列数组：src / dst 为卫星下标，distance 米，snr dB，rate bit/s。
+    """
+    src: np.ndarray
+    dst: np.ndarray
+    distance: np.ndarray
+    snr: np.ndarray
+    rate: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.src)
+
+class SglArrays(NamedTuple):
+    """
+    一组星地链路的并列数组：每个可见的 (卫星, 地面站) 对同时对应 DL 与 UL 两条链路。
+    """
+    sat: np.ndarray
+    gs: np.ndarray
+    distance: np.ndarray
+    dl_snr: np.ndarray
+    dl_rate: np.ndarray
+    ul_snr: np.ndarray
+    ul_rate: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.sat)
+
+LINK_TYPES = ("ISL", "DL", "UL")
+ISL, DL, UL = range(len(LINK_TYPES))
+
+class LinkTable(NamedTuple):
+    """
+    一个时刻全部链路的并列数组（struct-of-arrays）：
+    src / dst 为节点下标（卫星 0..N-1，地面站 N..N+G-1），type 为 LINK_TYPES 中的编码。
+    行的顺序与 Network._allLinks 一致：ISL 在前，随后每个星地对依次为 DL、UL。
+    """
+    type: np.ndarray
+    src: np.ndarray
+    dst: np.ndarray
+    distance: np.ndarray
+    snr: np.ndarray
+    rate: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.src)
+
+    def isl(self) -> "LinkTable":
+        """
+        只保留星间链路的行。
+        """
+        keep = self.type == ISL
+        return LinkTable(*(a[keep] for a in self))
+
+def link_table(isl: LinkArrays, sgl: SglArrays, num_sats: int) -> LinkTable:
+    """
+    把 ISL 与星地链路数组拼成一张 LinkTable（星地对交错展开为 DL、UL 两行）。
+    """
+    sat = np.asarray(sgl.sat, dtype=np.int64)
+    gs = np.asarray(sgl.gs, dtype=np.int64) + num_sats
+    pair = lambda a, b: np.stack([a, b], axis=1).reshape(-1)
+    return LinkTable(
+        type=np.concatenate([np.full(len(isl), ISL), np.tile([DL, UL], len(sgl))]).astype(np.uint8),
+        src=np.concatenate([np.asarray(isl.src, dtype=np.int64), pair(sat, gs)]),
+        dst=np.concatenate([np.asarray(isl.dst, dtype=np.int64), pair(gs, sat)]),
+        distance=np.concatenate([isl.distance, np.repeat(sgl.distance, 2)]).astype(float),
+        snr=np.concatenate([isl.snr, pair(np.asarray(sgl.dl_snr), np.asarray(sgl.ul_snr))]).astype(float),
+        rate=np.concatenate([isl.rate, pair(np.asarray(sgl.dl_rate), np.asarray(sgl.ul_rate))]).astype(float),
+    )
+
+def isl_candidate_pairs(planes: Sequence[int], orders: Sequence[int], num_planes: int, sats_per_plane: int) -> np.ndarray:
+    """
+    ISL 候选邻居对 (M, 2)，每对 u <= v、去重并按字典序排列。
+    规则与逐颗卫星的循环一致：
+    - 同轨：v = (u ± 1) % sats_per_plane + plane_u * sats_per_plane
+    - 异轨：v = plane_v * sats_per_plane + order_u，plane_v = plane_u ± 1（不跨首尾轨道）
+    """
+    n = len(planes)
+    if n == 0 or sats_per_plane == 0:
+        return np.zeros((0, 2), dtype=np.int64)
+    u = np.arange(n)
+    plane = np.asarray(planes, dtype=np.int64)
+    order = np.asarray(orders, dtype=np.int64)
+
+    candidates = []
+    for offset in (-1, 1):
+        candidates.append((u, (u + offset) % sats_per_plane + plane * sats_per_plane))
+    for dp in (-1, 1):
+        plane_v = (plane + dp) % num_planes
+        gap = np.abs(plane - plane_v)
+        keep = (gap != 0) & (gap != num_planes - 1)
+        candidates.append((u[keep], plane_v[keep] * sats_per_plane + order[keep]))
+
+    src = np.concatenate([c[0] for c in candidates])
+    dst = np.concatenate([c[1] for c in candidates])
+    valid = dst < n
+    pairs = np.stack([np.minimum(src, dst), np.maximum(src, dst)], axis=1)[valid]
+    return np.unique(pairs, axis=0)
+
+def los_distance(h1: np.ndarray, h2: np.ndarray) -> np.ndarray:
+    """
+    视距极限距离（Line of Sight），米。
+    """
+    return np.sqrt(h1 * (h1 + 2 * R_EARTH)) + np.sqrt(h2 * (h2 + 2 * R_EARTH))
+
+def link_budget(
+    distance: np.ndarray,
+    P_t: float,
+    G_t: float,
+    G_r: float,
+    f: float,
+    B: float,
+    T_sys: float = 300.0,
+    k_dB: float = -228.6,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Network.calculate_snr + calculate_trans_rate 的数组版本。
+    :return: (SNR_dB, 传输速率 bits/s)
+    """
+    c = 3e8
+    with np.errstate(divide="ignore", over="ignore"):
+        L = 20 * np.log10(4 * np.pi * distance * f / c)
+        EIRP = 10 * np.log10(P_t) + G_t
+        G_T = G_r - 10 * np.log10(T_sys)
+        C_N_dB = EIRP + G_T - L - k_dB - 10 * np.log10(B)
+        snr_linear = np.where(C_N_dB > 0, 10 ** (C_N_dB / 10), 0.0)
+        rate = np.where(snr_linear > 0, B * np.log2(1 + snr_linear), 0.0)
+    return C_N_dB, rate
+
+def isl_links(xyz: np.ndarray, altitude: np.ndarray, pairs: np.ndarray, budget: Tuple[float, float, float, float, float]) -> LinkArrays:
+    """
+    一个时刻的全部 ISL。
+    :param xyz: (N, 3) 卫星位置（米）
+    :param altitude: (N,) 卫星高度（米）
+    :param pairs: isl_candidate_pairs 的结果
+    :param budget: (P_t, G_t, G_r, f, B)
+    """
+    u, v = pairs[:, 0], pairs[:, 1]
+    distance = np.linalg.norm(xyz[u] - xyz[v], axis=1)
+    visible = distance <= los_distance(altitude[u], altitude[v])
+    u, v, distance = u[visible], v[visible], distance[visible]
+    snr, rate = link_budget(distance, *budget)
+    return LinkArrays(u, v, distance, snr, rate)
+
+def sgl_links(
+    sat_xyz: np.ndarray,
+    gs_xyz: np.ndarray,
+    elev_threshold_deg: float,
+    dl_budget: Tuple[float, float, float, float, float],
+    ul_budget: Tuple[float, float, float, float, float],
+    gs_valid: Optional[np.ndarray] = None,
+    candidates: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+    ) -> SglArrays:
+    """
+    一个时刻的全部星地链路：(N_sat, N_gs) 矩阵上一次算出仰角与距离，只输出可见的对。
+    输出顺序与逐对循环相同（卫星优先，其次地面站）。
+    :param sat_xyz: (N, 3) 卫星位置（米）
+    :param gs_xyz: (G, 3) 地面站位置（米，与卫星同一坐标系）
+    :param gs_valid: (G,) bool，参与计算的地面站
+    :param candidates: (sat, gs) 候选对（例如 StationIndex 剪枝的结果），给定时只在这些对上判定
+    """
+    sin_threshold = np.sin(np.radians(elev_threshold_deg))
+    gs_unit = gs_xyz / np.linalg.norm(gs_xyz, axis=-1, keepdims=True)
+    if candidates is None:
+        vec = sat_xyz[:, None, :] - gs_xyz[None, :, :]  # 地面站指向卫星，(N, G, 3)
+        distance = np.linalg.norm(vec, axis=-1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sin_elev = np.einsum("ngc,gc->ng", vec, gs_unit) / distance
+        visible = (distance > 0) & (sin_elev > sin_threshold)
+        if gs_valid is not None:
+            visible &= gs_valid[None, :]
+        sat, gs = np.nonzero(visible)
+        distance = distance[sat, gs]
+    else:
+        sat, gs = candidates
+        order = np.lexsort((gs, sat))
+        sat, gs = sat[order], gs[order]
+        if gs_valid is not None:
+            keep = gs_valid[gs]
+            sat, gs = sat[keep], gs[keep]
+        vec = sat_xyz[sat] - gs_xyz[gs]
+        distance = np.linalg.norm(vec, axis=-1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sin_elev = np.einsum("kc,kc->k", vec, gs_unit[gs]) / distance
+        visible = (distance > 0) & (sin_elev > sin_threshold)
+        sat, gs, distance = sat[visible], gs[visible], distance[visible]
+    dl_snr, dl_rate = link_budget(distance, *dl_budget)
+    ul_snr, ul_rate = link_budget(distance, *ul_budget)
+    return SglArrays(sat, gs, distance, dl_snr, dl_rate, ul_snr, ul_rate)
+
+def latlon_to_unit(latlon: np.ndarray) -> np.ndarray:
+    """
+    [lat, lon]（度）-> 地固系单位向量，(..., 3)。
+    """
+    lat, lon = np.radians(latlon[..., 0]), np.radians(latlon[..., 1])
+    return np.stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)], axis=-1)
+
+def visibility_half_angle(sat_radius: float, elev_threshold_deg: float) -> float:
+    """
+    仰角不低于阈值时卫星与地面站的最大地心张角（弧度），已含保守余量。
+    """
+    eps = np.radians(elev_threshold_deg)
+    ratio = min(EARTH_POLAR_RADIUS * np.cos(eps) / max(sat_radius, EARTH_POLAR_RADIUS), 1.0)
+    return float(np.arccos(ratio) - eps + CONE_MARGIN_RAD)
+
+class StationIndex:
+    """
+    地面站的空间索引：地固系单位向量上的 KD 树。
+    地面站随地球转动、在地固系中不动，因此每个项目只需构建一次；
+    每个 period 用卫星星下点方向一次性查出可见锥内的候选对。
+    """
+    def __init__(self, latlon: np.ndarray, ids: Optional[np.ndarray] = None):
+        """
+        :param latlon: (G, 2) 地面站经纬度（度）
+        :param ids: (G,) 地面站在 gs_datas 中的下标，默认 0..G-1
+        """
+        latlon = np.asarray(latlon, dtype=float).reshape(-1, 2)
+        self.ids = np.arange(len(latlon)) if ids is None else np.asarray(ids, dtype=np.int64)
+        self.tree = cKDTree(latlon_to_unit(latlon))
+
+    def candidates(self, sat_latlon: np.ndarray, half_angle: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        地心张角不超过 half_angle 的 (卫星下标, 地面站下标)。
+        """
+        chord = 2.0 * np.sin(min(half_angle, np.pi) / 2.0)
+        sats = cKDTree(latlon_to_unit(np.asarray(sat_latlon, dtype=float)))
+        pairs = sats.sparse_distance_matrix(self.tree, chord, output_type="ndarray")
+        return pairs["i"].astype(np.int64), self.ids[pairs["j"]]
+
+class LinkTensor:
+    """
+    整个时间范围的链路拓扑，按 period 存放：
+    - ISL：第 t 个 period 的链路是 isl_* 数组的 [isl_ptr[t], isl_ptr[t+1]) 段（u < v）
+      另存双向 CSR 邻接：卫星 u 的邻居为 isl_neighbours[isl_indptr[t, u]:isl_indptr[t, u+1]]，
+      isl_edge 为对应链路在 isl_* 数组中的下标
+    - SGL：第 t 个 period 的可见星地对是 sgl_* 数组的 [sgl_ptr[t], sgl_ptr[t+1]) 段
+    save / load 使用与列式缓存相同的 manifest + 裸 .bin 布局，加载时 memmap。
+    """
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        self.arrays = arrays
+        self.steps: int = len(arrays["isl_ptr"]) - 1
+
+    def isl_at(self, t: int) -> LinkArrays:
+        a = self.arrays
+        lo, hi = a["isl_ptr"][t], a["isl_ptr"][t + 1]
+        return LinkArrays(a["isl_src"][lo:hi], a["isl_dst"][lo:hi], a["isl_distance"][lo:hi], a["isl_snr"][lo:hi], a["isl_rate"][lo:hi])
+
+    def sgl_at(self, t: int) -> SglArrays:
+        a = self.arrays
+        lo, hi = a["sgl_ptr"][t], a["sgl_ptr"][t + 1]
+        return SglArrays(*(a[k][lo:hi] for k in ("sgl_sat", "sgl_gs", "sgl_distance", "dl_snr", "dl_rate", "ul_snr", "ul_rate")))
+
+    def neighbours(self, t: int, u: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        第 t 个 period 卫星 u 的 ISL 邻居下标与对应链路下标（相对 isl_at(t)）。
+        """
+        a = self.arrays
+        lo, hi = a["isl_indptr"][t, u], a["isl_indptr"][t, u + 1]
+        return a["isl_neighbours"][lo:hi], a["isl_edge"][lo:hi] - a["isl_ptr"][t]
+
+    def save(self, path: str, replace: bool = False) -> None:
+        save_arrays(path, self.arrays, {"steps": self.steps}, replace)
+
+    @classmethod
+    def load(cls, path: str) -> "LinkTensor":
+        return cls(load_arrays(path)[0])
+
+    @staticmethod
+    def exists(path: str) -> bool:
+        return exists_columns(path)
+
+def build_link_tensor(
+    steps: int,
+    num_sats: int,
+    isl_at: Callable[[int], LinkArrays],
+    sgl_at: Callable[[int], SglArrays],
+    ) -> LinkTensor:
+    """
+    逐 period 调用 isl_at / sgl_at，拼接成 LinkTensor。
+    """
+    isl = [isl_at(t) for t in range(steps)]
+    sgl = [sgl_at(t) for t in range(steps)]
+
+    isl_ptr = np.concatenate([[0], np.cumsum([len(l) for l in isl])]).astype(np.int64)
+    sgl_ptr = np.concatenate([[0], np.cumsum([len(l) for l in sgl])]).astype(np.int64)
+
+    indptr = np.zeros((steps, num_sats + 1), dtype=np.int64)
+    neighbours, edges = [], []
+    for t, links in enumerate(isl):
+        edge = isl_ptr[t] + np.arange(len(links))
+        row = np.concatenate([links.src, links.dst])
+        col = np.concatenate([links.dst, links.src])
+        order = np.lexsort((col, row))
+        neighbours.append(col[order])
+        edges.append(np.concatenate([edge, edge])[order])
+        indptr[t] = 2 * isl_ptr[t] + np.concatenate([[0], np.cumsum(np.bincount(row, minlength=num_sats))])
+
+    def cat(parts, dtype):
+        return np.concatenate(parts).astype(dtype) if parts else np.zeros(0, dtype=dtype)
+
+    return LinkTensor({
+        "isl_ptr": isl_ptr,
+        "isl_src": cat([l.src for l in isl], np.int32),
+        "isl_dst": cat([l.dst for l in isl], np.int32),
+        "isl_distance": cat([l.distance for l in isl], np.float64),
+        "isl_snr": cat([l.snr for l in isl], np.float64),
+        "isl_rate": cat([l.rate for l in isl], np.float64),
+        "isl_indptr": indptr,
+        "isl_neighbours": cat(neighbours, np.int32),
+        "isl_edge": cat(edges, np.int64),
+        "sgl_ptr": sgl_ptr,
+        "sgl_sat": cat([l.sat for l in sgl], np.int32),
+        "sgl_gs": cat([l.gs for l in sgl], np.int32),
+        "sgl_distance": cat([l.distance for l in sgl], np.float64),
+        "dl_snr": cat([l.dl_snr for l in sgl], np.float64),
+        "dl_rate": cat([l.dl_rate for l in sgl], np.float64),
+        "ul_snr": cat([l.ul_snr for l in sgl], np.float64),
+        "ul_rate": cat([l.ul_rate for l in sgl], np.float64),
+    })
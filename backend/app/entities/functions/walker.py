@@ -0,0 +1,128 @@
+from typing import List, Tuple
+import numpy as np
+from sgp4.api import Satrec, jday
+from skyfield.api import Time
+from app.config import MU
+
+"""
+生成式 Walker 星座的解析传播：
+utils.generator 生成的 TLE 均为圆轨道（e = 0、近地点幅角 0、无阻力项、同一历元），
+同一壳层共享倾角与平运动，只有 RAAN 与平近点角不同。
+这类星座可以跳过 SGP4，用圆轨道闭式解在 (卫星 = 轨道面 × 槽位, 时间) 上整体求值：
+卫星相关的初相位与时间相关的转角分别只求一次三角函数，再用和角公式外积展开，
+剩下的小量修正（J2 短周期项、J3 冻结偏心率）全部用小角度展开，N×T 网格上不再调用三角函数。
+- j2=True（默认）：SGP4 的长期项（mdot / nodedot / argpdot）+ J3 长周期项 + J2 短周期项，
+  相当于 SGP4 近地分支在 e = 0、B* = 0 时的闭式形式（SGP4 内部把偏心率下限钳到 1e-6，此处忽略）。
+  实测（20 × 20 = 400 颗、24 h、30 s 步长，对照 SatrecArray）：位置差最大 13.8 m、平均 10.6 m，
+  第一小时内即达到最大值、不随时间增长；传播本身（不含坐标系旋转）约 4.6 倍速
+- j2=False：二体圆轨道，RAAN 固定；距 TLE 历元 10 分钟约 13 km、2 小时约 40 km、1 天约 450 km。
+  注意 generator 生成的 TLE 历元解析为 1999-12-31，实验时刻离历元很远，只能用 j2=True
+"""
+
+BLOCK_ELEMENTS = 1 << 15  # 每个时间块的 (卫星 × 时刻) 元素数
+KEPLER_ITERATIONS = 3  # 冻结偏心率约 1e-3，3 次 Newton 迭代后残差远小于 1e-12 rad
+
+def is_generated_walker(satrecs: List[Satrec]) -> bool:
+    """
+    是否为 generator 生成的 Walker 壳层：全部为无摄动项的近地圆轨道，且历元、倾角与平运动一致。
+    """
+    if not satrecs:
+        return False
+    first = satrecs[0]
+    for s in satrecs:
+        if s.error or s.method != "n" or s.ecco != 0.0 or s.argpo != 0.0:
+            return False
+        if s.bstar != 0.0 or s.ndot != 0.0 or s.nddot != 0.0:
+            return False
+        if (s.jdsatepoch, s.jdsatepochF, s.inclo, s.no_kozai) != (first.jdsatepoch, first.jdsatepochF, first.inclo, first.no_kozai):
+            return False
+    return True
+
+def propagate_walker(satrecs: List[Satrec], times: Time, j2: bool = True) -> np.ndarray:
+    """
+    圆轨道闭式传播，调用方需先用 is_generated_walker 判定。
+    :return: (N_sat, T, 3) TEME 坐标（千米），与 SatrecArray.sgp4 的输出同形
+    """
+    first = satrecs[0]
+    jd, fr = jday(*times.utc)
+    jd = np.atleast_1d(np.asarray(jd, dtype=float))
+    fr = np.atleast_1d(np.asarray(fr, dtype=float))
+    minutes = ((jd - first.jdsatepoch) + (fr - first.jdsatepochF)) * 1440.0  # (T,)
+
+    raan0 = np.array([s.nodeo for s in satrecs])
+    m0 = np.array([s.mo for s in satrecs])
+
+    # 按时间分块，使每块的 N×T 临时数组留在缓存里（整块求值会被内存带宽拖慢一倍以上）
+    out = np.empty((len(satrecs), len(minutes), 3))
+    block = max(BLOCK_ELEMENTS // len(satrecs), 1)
+    for i in range(0, len(minutes), block):
+        out[:, i:i + block] = _propagate_block(first, raan0, m0, minutes[i:i + block], j2)
+    return out
+
+def _propagate_block(first: Satrec, raan0: np.ndarray, m0: np.ndarray, minutes: np.ndarray, j2: bool) -> np.ndarray:
+    inc = first.inclo
+    cosi, sini = np.cos(inc), np.sin(inc)
+
+    if not j2:
+        n = first.no_kozai  # 弧度 / 分钟
+        a_km = (MU / 1e9 / (n / 60.0) ** 2) ** (1.0 / 3.0)
+        sinu, cosu = _outer_angles(m0, n * minutes)
+        sinO, cosO = np.sin(raan0)[:, None], np.cos(raan0)[:, None]
+        return a_km * _orbit_to_teme(sinu, cosu, sinO, cosO, sini, cosi)
+
+    # 长期项（ecco = 0 时近地点幅角速率直接叠加到纬度幅角上）
+    sin_xl, cos_xl = _outer_angles(m0, (first.mdot + first.argpdot) * minutes)
+    sinO, cosO = _outer_angles(raan0, first.nodedot * minutes)
+    a = first.a  # 地球半径单位
+
+    # J3 长周期项：圆轨道被"冻结"出偏心率矢量 (0, aynl)，解开普勒方程 E = xl + aynl * cos(E)，
+    # 迭代量 d = E - xl 只有 1e-3 量级
+    aynl = -0.5 * first.j3oj2 * sini / a
+    d = np.zeros_like(sin_xl)
+    for _ in range(KEPLER_ITERATIONS):
+        sinE, cosE = _shift(sin_xl, cos_xl, d)
+        d = d + (-aynl * cosE - d) / (1.0 - aynl * sinE)
+    sinE, cosE = _shift(sin_xl, cos_xl, d)
+    el2 = aynl * aynl
+    betal = np.sqrt(1.0 - el2)
+    rl = a * (1.0 - aynl * sinE)
+    sinu = a / rl * (sinE - aynl)
+    cosu = a / rl * cosE * (1.0 - el2 / (1.0 + betal))
+
+    # J2 短周期项（半径、纬度幅角、RAAN、倾角的 2u 项）
+    pl = a * (1.0 - el2)
+    temp1 = 0.5 * first.j2 / pl
+    temp2 = temp1 / pl
+    sin2u, cos2u = 2.0 * sinu * cosu, cosu * cosu - sinu * sinu
+    radius = rl * (1.0 - 1.5 * temp2 * betal * (3.0 * cosi * cosi - 1.0)) + 0.5 * temp1 * (1.0 - cosi * cosi) * cos2u
+    sinu, cosu = _shift(sinu, cosu, -0.25 * temp2 * (7.0 * cosi * cosi - 1.0) * sin2u)
+    sinO, cosO = _shift(sinO, cosO, 1.5 * temp2 * cosi * sin2u)
+    sini, cosi = _shift(sini, cosi, 1.5 * temp2 * cosi * sini * cos2u)
+    return (radius * first.radiusearthkm)[..., None] * _orbit_to_teme(sinu, cosu, sinO, cosO, sini, cosi)
+
+def _outer_angles(per_sat: np.ndarray, per_time: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    sin / cos(per_sat[:, None] + per_time[None, :])，只对两个一维数组求三角函数。
+    """
+    sa, ca = np.sin(per_sat)[:, None], np.cos(per_sat)[:, None]
+    sb, cb = np.sin(per_time)[None, :], np.cos(per_time)[None, :]
+    return sa * cb + ca * sb, ca * cb - sa * sb
+
+def _shift(sin_a: np.ndarray, cos_a: np.ndarray, delta: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    sin / cos(a + delta)，delta 为小量（|delta| < 1e-3 时截断误差 < 1e-14）。
+    """
+    d2 = delta * delta
+    sin_d = delta * (1.0 - d2 / 6.0)
+    cos_d = 1.0 - d2 / 2.0 + d2 * d2 / 24.0
+    return sin_a * cos_d + cos_a * sin_d, cos_a * cos_d - sin_a * sin_d
+
+def _orbit_to_teme(sinu, cosu, sinO, cosO, sini, cosi) -> np.ndarray:
+    """
+    纬度幅角 u / 升交点赤经 Ω / 倾角 i 的正余弦 -> TEME 单位位置向量，(..., 3)。
+    """
+    return np.stack([
+        cosO * cosu - sinO * cosi * sinu,
+        sinO * cosu + cosO * cosi * sinu,
+        sini * sinu,
+    ], axis=-1)
@@ -4,6 +4,7 @@ import numpy as np
 from pydantic import BaseModel
 from traitlets import Any
 from app.models.api_dict.basic import XYZ, LatLon
+from app.entities.functions.snapshot import SnapshotCache
 
 class ROISnapshot(BaseModel):
     id: str
@@ -16,6 +17,7 @@ class ROIEntity:
     def __init__(self, time_series: dict[str, Any], ):
         self.time_series: dict[str, Any] = time_series
         self.id: str = time_series['id']
+        self._snapshot_cache = SnapshotCache()  # 序列化缓存，_at 时失效
         self.length: float = time_series['roi_length']
         self.centre_pos: XYZ = XYZ(x=0.0, y=0.0, z=0.0)  # ECEF坐标
         self.centre_loc: LatLon = LatLon(lat=0.0, lon=0.0)  # 地理坐标（纬度，经度）
@@ -32,6 +34,7 @@ class ROIEntity:
         
         self.corners_pos = [XYZ(x=corner[0], y=corner[1], z=corner[2]) for corner in self.time_series["target_corners_xyz"][period_counter]]
         self.corners_loc = [LatLon(lat=corner[0], lon=corner[1]) for corner in self.time_series["target_corners_latlon"]]
+        self._snapshot_cache.invalidate()
         
     def tick(self, period_counter: int, slot_counter: int):
         """
@@ -54,6 +57,9 @@ class ROIEntity:
         )
         
     def serialize(self) -> dict:
-        return self.snapshot().model_dump()
+        return self._snapshot_cache.get(lambda: self.snapshot().model_dump())
+
+    def to_json(self) -> str:
+        return self._snapshot_cache.get_json(lambda: self.snapshot().model_dump())
         
     
\ No newline at end of file
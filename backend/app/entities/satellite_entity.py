@@ -3,6 +3,7 @@ from typing import Any, List
 import numpy as np
 from pydantic import BaseModel
 from app.models.api_dict.basic import XYZ, LatLon
+from app.entities.functions.snapshot import SnapshotCache, join_json
 from app.entities.functions.timeslot import date_to_timeslot
 from app.services.network_service import LinkSnapshot
 from app.config import BATTERY_MAX, COMPUTE_ENERGY_COST, STATIC_ENERGY_COST, TRANSMIT_ENERGY_COST
@@ -53,14 +54,10 @@ class SatelliteEntity():
         self.dimensions: tuple[float, float, float] = (0.3, 0.3, 0.3)
         
         # === 空间与姿态 ===
-        # 1. ECEF坐标
-        self.pos: XYZ = XYZ(x=0.0, y=0.0, z=0.0)
-        # 2. 地理坐标（纬度，经度）
-        self.loc: LatLon = LatLon(lat=0.0, lon=0.0) 
-        # 3. 图像角点 ECEF 坐标 
-        self.img_corners_pos: List[XYZ] = []
-        # 4. 图像角点 地理坐标
-        self.img_corners_loc: List[LatLon] = []
+        # 1~4. ECEF坐标、地理坐标（纬度，经度）、图像角点 ECEF 坐标 / 地理坐标：
+        #      以原始数组保存，pos / loc / img_corners_pos / img_corners_loc 属性按需构建模型
+        self._spatial: tuple = (np.zeros(3), np.zeros(2), np.zeros((0, 3)), np.zeros((0, 2)))
+        self._models: dict[str, Any] = {}
         # 5. 地面速度（单位：度/秒）
         self.v: float = 0.0
         self.velocity_vector: np.ndarray = np.array([0.0, 0.0, -1.0])
@@ -80,9 +77,25 @@ class SatelliteEntity():
         # === 通信模块 ===
         self.connections: dict[str, LinkSnapshot] = {}  # 当前连接的链路信息
 
+        # === 序列化缓存 ===
+        # 基本信息不变；空间部分在 _at / move_to 时失效；电量与指示状态按取值复用
+        self._head_cache = SnapshotCache()
+        self._spatial_cache = SnapshotCache()
+        self._state_cache = SnapshotCache()
+
     def tick(self, period_counter: int, slot_counter: int) -> None:
         self._at(period_counter, slot_counter)
 
+    def checkpoint(self) -> tuple:
+        """
+        不能由时间序列重新推出的状态（电量与任务指示），供 Simulation.seek 恢复。
+        """
+        return (self.battery, self.is_processing, self.is_observing, self.is_communicating_isl)
+
+    def restore(self, state: tuple) -> None:
+        self.battery, self.is_processing, self.is_observing, self.is_communicating_isl = state
+        self.battery_percent = (self.battery / BATTERY_MAX) * 100.0
+
     def energy_step(self, dt: float) -> None:
         self.charge(dt)
         self.discharge_static(dt)
@@ -119,13 +132,13 @@ class SatelliteEntity():
         self.battery_percent = (self.battery / BATTERY_MAX) * 100.0
 
     def _at(self, period_counter: int, slot_counter: int) -> None:
-        # 更新位置
-        pos = self.time_series["space_xyz"][period_counter]
-        self.pos = XYZ(x=pos[0], y=pos[1], z=pos[2])
-        
-        # 更新地理坐标
-        lat, lon = self.time_series["subpoint_latlon"][period_counter]
-        self.loc = LatLon(lat=lat, lon=lon)
+        # 更新位置、地理坐标、图像角点位置和地理坐标
+        self._place(
+            self.time_series["space_xyz"][period_counter],
+            self.time_series["subpoint_latlon"][period_counter],
+            self.time_series["footprint_corners_xyz"][period_counter],
+            self.time_series["footprint_corners_latlon"][period_counter],
+        )
         
         # 更新地面速度
         self.v = self.time_series["azimuth"][period_counter]
@@ -133,23 +146,59 @@ class SatelliteEntity():
         # 更新充电状态
         self.is_charging = self.time_series["is_sunlit"][period_counter]
         
-        # 更新图像角点位置和地理坐标
-        self.img_corners_pos = [
-            XYZ(x=corner[0], y=corner[1], z=corner[2]) 
-            for corner in self.time_series["footprint_corners_xyz"][period_counter]
-        ]
-        self.img_corners_loc = [
-            LatLon(lat=corner[0], lon=corner[1]) 
-            for corner in self.time_series["footprint_corners_latlon"][period_counter]
-        ]
-        
         self.is_communicating_sgl = any(link.type in ('UL', 'DL') for link in self.connections.values())
         
         self.solar_vector = self.time_series["solar_vector"][period_counter]
         
         # 获取单位化速度向量（-z方向，用于论文坐标系）
         self.velocity_vector = self.time_series["velocity_vector"][period_counter]
-        
+
+    def move_to(
+        self,
+        pos: np.ndarray,
+        loc: np.ndarray,
+        velocity_vector: np.ndarray,
+        corners_xyz: np.ndarray,
+        corners_latlon: np.ndarray,
+    ) -> None:
+        """
+        slot 级别的空间状态更新（由 Chebyshev 星历插值得到），不改变指示状态。
+        只保存数组，不构建 pydantic 模型。
+        """
+        self._place(pos, loc, corners_xyz, corners_latlon)
+        self.velocity_vector = velocity_vector
+
+    def _place(self, pos: np.ndarray, loc: np.ndarray, corners_xyz: np.ndarray, corners_latlon: np.ndarray) -> None:
+        self._spatial = (pos, loc, corners_xyz, corners_latlon)
+        self._models = {}
+        self._spatial_cache.invalidate()
+
+    @property
+    def pos(self) -> XYZ:
+        if "pos" not in self._models:
+            pos = self._spatial[0]
+            self._models["pos"] = XYZ(x=pos[0], y=pos[1], z=pos[2])
+        return self._models["pos"]
+
+    @property
+    def loc(self) -> LatLon:
+        if "loc" not in self._models:
+            lat, lon = self._spatial[1]
+            self._models["loc"] = LatLon(lat=lat, lon=lon)
+        return self._models["loc"]
+
+    @property
+    def img_corners_pos(self) -> List[XYZ]:
+        if "img_corners_pos" not in self._models:
+            self._models["img_corners_pos"] = [XYZ(x=corner[0], y=corner[1], z=corner[2]) for corner in self._spatial[2]]
+        return self._models["img_corners_pos"]
+
+    @property
+    def img_corners_loc(self) -> List[LatLon]:
+        if "img_corners_loc" not in self._models:
+            self._models["img_corners_loc"] = [LatLon(lat=corner[0], lon=corner[1]) for corner in self._spatial[3]]
+        return self._models["img_corners_loc"]
+
     def snapshot(self) -> SatelliteSnapshot:
         return SatelliteSnapshot(
             # spatial
@@ -178,5 +227,54 @@ class SatelliteEntity():
             onSun=self.is_charging,
         )
         
+    def _head_dict(self) -> dict:
+        return {"id": self.id, "plane": self.plane, "order": self.order, "dimensions": list(self.dimensions)}
+
+    def _spatial_dict(self) -> dict:
+        """
+        与 SatelliteSnapshot.model_dump() 的空间字段相同，直接由数组生成。
+        """
+        pos, loc, corners_xyz, corners_latlon = (np.asarray(a, dtype=float).tolist() for a in self._spatial)
+        velocity = np.asarray(self.velocity_vector, dtype=float).tolist()
+        solar = np.asarray(self.solar_vector, dtype=float).tolist()
+        return {
+            "pos": {"x": pos[0], "y": pos[1], "z": pos[2]},
+            "loc": {"lat": loc[0], "lon": loc[1]},
+            "velocityVector": {"x": velocity[0], "y": velocity[1], "z": velocity[2]},
+            "solarVector": {"x": solar[0], "y": solar[1], "z": solar[2]},
+            "imgCornersPos": [{"x": c[0], "y": c[1], "z": c[2]} for c in corners_xyz],
+            "imgCornersLon": [{"lat": c[0], "lon": c[1]} for c in corners_latlon],
+        }
+
+    def _state_key(self) -> tuple:
+        return (
+            self.battery_percent, self.is_observing, self.is_communicating_sgl,
+            self.is_processing, self.is_communicating_isl, self.is_charging,
+        )
+
+    def _state_dict(self) -> dict:
+        return {
+            "batteryPercent": float(self.battery_percent),
+            "onROI": bool(self.is_observing),
+            "onSGL": bool(self.is_communicating_sgl),
+            "onProc": bool(self.is_processing),
+            "onISL": bool(self.is_communicating_isl),
+            "onSun": bool(self.is_charging),
+        }
+
     def serialize(self) -> dict:
-        return self.snapshot().model_dump()
\ No newline at end of file
+        """
+        与 snapshot().model_dump() 相同，三部分分别缓存：slot 之间只重建空间部分。
+        """
+        return {
+            **self._head_cache.get(self._head_dict),
+            **self._spatial_cache.get(self._spatial_dict),
+            **self._state_cache.get(self._state_dict, self._state_key()),
+        }
+
+    def to_json(self) -> str:
+        return join_json([
+            self._head_cache.get_json(self._head_dict),
+            self._spatial_cache.get_json(self._spatial_dict),
+            self._state_cache.get_json(self._state_dict, self._state_key()),
+        ])
\ No newline at end of file
@@ -4,6 +4,7 @@ from typing import Any, List
 from pydantic import BaseModel
 import numpy as np
 from app.models.api_dict.basic import XYZ, LatLon
+from app.entities.functions.snapshot import SnapshotCache
 from app.services.network_service import LinkSnapshot
 
 class StationSnapshot(BaseModel):
@@ -32,6 +33,9 @@ class StationEntity:
         # === Indicator 状态 ===
         self.on_download: bool = False
         self.on_upload: bool = False
+
+        # === 序列化缓存（period 内复用，指示状态变化时重建）===
+        self._snapshot_cache = SnapshotCache()
         
         # === 存储区与活动 ===
         # self.uploading_list: List[Message] = []  # 待上传任务列表
@@ -49,6 +53,7 @@ class StationEntity:
         self.pos = XYZ(x=pos[0], y=pos[1], z=pos[2])
         lat, lon = self.time_series["latlon"]
         self.loc = LatLon(lat=lat, lon=lon)
+        self._snapshot_cache.invalidate()
         
     def snapshot(self) -> StationSnapshot:
         return StationSnapshot(
@@ -60,4 +65,7 @@ class StationEntity:
         )
         
     def serialize(self) -> dict:
-        return self.snapshot().model_dump()
\ No newline at end of file
+        return self._snapshot_cache.get(lambda: self.snapshot().model_dump(), (self.on_upload, self.on_download))
+
+    def to_json(self) -> str:
+        return self._snapshot_cache.get_json(lambda: self.snapshot().model_dump(), (self.on_upload, self.on_download))
\ No newline at end of file
@@ -3,6 +3,7 @@ import numpy as np
 from pydantic import BaseModel
 from traitlets import Any
 from app.models.api_dict.basic import XYZ
+from app.entities.functions.snapshot import SnapshotCache
 
 class SunSnapshot(BaseModel):
     id: str
@@ -12,6 +13,7 @@ class SunEntity:
     def __init__(self, time_series: dict[str, Any], ):
         self.time_series: dict[str, Any] = time_series  # 卫星
         self.id: str = time_series['id']
+        self._snapshot_cache = SnapshotCache()  # 序列化缓存，_at 时失效
         self.pos: XYZ = XYZ(x=0.0, y=0.0, z=0.0)
         self.rotation: float = 0.0  # 地球自转角度
 
@@ -19,6 +21,7 @@ class SunEntity:
     def _at(self, period_counter: int, slot_counter: int):
         pos = self.time_series["xyz"][period_counter]
         self.pos = XYZ(x=pos[0], y=pos[1], z=pos[2])
+        self._snapshot_cache.invalidate()
 
     def tick(self, period_counter: int, slot_counter: int):
         self._at(period_counter, slot_counter)
@@ -31,6 +34,9 @@ class SunEntity:
         )
         
     def serialize(self) -> dict:
-        return self.snapshot().model_dump()
+        return self._snapshot_cache.get(lambda: self.snapshot().model_dump())
+
+    def to_json(self) -> str:
+        return self._snapshot_cache.get_json(lambda: self.snapshot().model_dump())
         
     
\ No newline at end of file
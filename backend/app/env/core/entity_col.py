@@ -1,65 +1,65 @@
 
 import json
 from pathlib import Path
-from typing import Dict, Tuple, List
+from typing import Dict, Optional, Tuple, List
 
 import numpy as np
 from app.env.vars.edge import Edge
 from app.env.vars.node import Node
-from app.services.network_service import LinkSnapshot
+from app.entities.functions.topology import LinkTable
 from app.entities.satellite_entity import SatelliteEntity
 from app.models.api_dict.pj import ProjectDict
 
 class EntityCol:
     def __init__(self, input: ProjectDict):
         self.nodes = []
-        self.edges = []
+        self.edges: Optional[LinkTable] = None
         self.nodes_dict: Dict[Tuple[int, int], SatelliteEntity] = {}
-        self.edges_dict: Dict[Tuple[Tuple[int, int], Tuple[int, int]], LinkSnapshot] = {}
         self.N_SAT = input.constellation.number_of_sat_per_planes
         self.N_PLANE = input.constellation.number_of_planes
+        # 卫星下标 -> (plane, order)，与 LinkTable 的节点下标对应
+        self.po = np.zeros((0, 2), dtype=np.int64)
+        # (plane, order, plane, order) 的 ISL 连通矩阵，双向登记
+        self.adjacency = np.zeros((0, 0, 0, 0), dtype=bool)
         
-    def reset(self, sats: List[SatelliteEntity], edges: List[LinkSnapshot]):
+    def reset(self, sats: List[SatelliteEntity], edges: LinkTable):
         self.nodes_dict.clear()
-        self.edges_dict.clear()
         self.N_SAT = 0
         self.N_PLANE = 0
         self.load(sats, edges)
 
-    def load(self, sats: List[SatelliteEntity], edges: List[LinkSnapshot]):
+    def load(self, sats: List[SatelliteEntity], edges: LinkTable):
         self.nodes = sats
         self.edges = edges
         self._convert()
 
     def _convert(self):
-        index_map = {}
         for n in self.nodes:
-            p = n.plane
-            o = n.order
-            self.nodes_dict[(p, o)] = n
-            index_map[n.id] = (p, o)
-
-        for e in self.edges:
-            uid = e.src
-            vid = e.dst
-            if e.src not in index_map or e.dst not in index_map:
-                continue
-            self.edges_dict[(index_map[uid], index_map[vid])] = e
-            self.edges_dict[(index_map[vid], index_map[uid])] = e
+            self.nodes_dict[(n.plane, n.order)] = n
         self.N_SAT = max(o for (p, o) in self.nodes_dict.keys()) + 1 if self.nodes_dict else 0
         self.N_PLANE = max(p for (p, o) in self.nodes_dict.keys()) + 1 if self.nodes_dict else 0
+
+        # 只保留两端都是卫星的链路（地面站下标 >= 卫星数）
+        n = len(self.nodes)
+        self.po = np.array([(s.plane, s.order) for s in self.nodes], dtype=np.int64).reshape(-1, 2)
+        keep = (self.edges.src < n) & (self.edges.dst < n)
+        self.edges = LinkTable(*(a[keep] for a in self.edges))
+        u, v = self.po[self.edges.src], self.po[self.edges.dst]
+        self.adjacency = np.zeros((self.N_PLANE, self.N_SAT, self.N_PLANE, self.N_SAT), dtype=bool)
+        self.adjacency[u[:, 0], u[:, 1], v[:, 0], v[:, 1]] = True
+        self.adjacency[v[:, 0], v[:, 1], u[:, 0], u[:, 1]] = True
         
     def get_nodes(self) -> List[SatelliteEntity]:
         return list(self.nodes_dict.values())
     
-    def get_edges(self) -> List[LinkSnapshot]:
-        return list(self.edges_dict.values())
+    def get_edges(self) -> LinkTable:
+        return self.edges
     
     def get_node_keys(self) -> List[Tuple[int, int]]:
         return list(self.nodes_dict.keys())
     
     def get_edge_keys(self) -> List[Tuple[Tuple[int, int], Tuple[int, int]]]:
-        return list(self.edges_dict.keys())
+        return [((p, o), (q, r)) for p, o, q, r in np.argwhere(self.adjacency).tolist()]
 
     def connected(self, u, v):
-        return (u, v) in self.edges_dict
+        return bool(self.adjacency[u[0], u[1], v[0], v[1]])
@@ -1,6 +1,6 @@
 import numpy as np
 from app.models.api_dict.pj import ProjectDict
-from app.core.initialisation import build_static_objects, init_network, load_input_metadata
+from app.core.initialisation import build_static_objects, build_window_cursor, init_network, load_input_metadata, slot_update_satellites
 import gymnasium as gym
 from gymnasium import spaces
 from typing import List
@@ -20,6 +20,9 @@ from datetime import datetime, timedelta, timezone
 from app.entities.earth_entity import EarthEntity
 from app.entities.roi_entity import ROIEntity
 from app.entities.sun_entity import SunEntity
+from app.entities.functions.chebyshev import ChebyshevEphemeris
+from app.entities.functions.columnar import WindowCursor
+from app.entities.functions.solar import EclipseIntervals
 from app.services.network_service import Network
 from app.entities.functions.prepare import preparation_of_earth, preparation_of_roi, preparation_of_satellite, preparation_of_station, preparation_of_sun, to_times
 from app.entities.satellite_entity import SatelliteEntity
@@ -59,6 +62,9 @@ class LEOEnv(gym.Env):
         self.roi: List[ROIEntity] = []
         self.eth: EarthEntity = None
         self.sun: SunEntity = None
+        self.ephemeris: ChebyshevEphemeris = None
+        self.eclipses: EclipseIntervals = None
+        self.windows: WindowCursor = None
         
         # Data storages
         # self._roi_datas: List[dict] = []
@@ -147,12 +153,15 @@ class LEOEnv(gym.Env):
         self.roi = objs['roi']
         self.eth = objs['eth']
         self.sun = objs['sun']
+        self.ephemeris = objs['ephemeris']
+        self.eclipses = objs['eclipses']
+        self.windows = build_window_cursor(objs['sat_datas'], objs['gs_datas'], objs['roi_datas'], objs['eth_data'], objs['sun_data'])
         self._sat_datas = objs['sat_datas']
         self._gs_datas = objs['gs_datas']
         # self._roi_datas = objs['roi_datas']
         # self._eth_datas = objs['eth_data']
         # self._sun_datas = objs['sun_data']
-        self.net = init_network(input, self._sat_datas, self._gs_datas)
+        self.net = init_network(input, self._sat_datas, self._gs_datas, self.datetime_list)
         self.period_update()
         
         
@@ -160,6 +169,9 @@ class LEOEnv(gym.Env):
         """
         Update all entities to the specified period time.
         """
+        if self.windows:
+            self.windows.advance_to(self.period_counter)
+            
         for s in self.sat:
             s.tick(self.period_counter, self.slot_counter)
             
@@ -176,6 +188,13 @@ class LEOEnv(gym.Env):
             self.sun.tick(self.period_counter, self.slot_counter)
             
 
+    def slot_update(self):
+        """
+        slot 级别更新：卫星在 period 之间沿 Chebyshev 星历平滑运动。
+        """
+        seconds = (self.period_counter * self.period + self.slot_counter * self.slot).total_seconds()
+        slot_update_satellites(self.sat, self.ephemeris, seconds, self.eclipses)
+
     def reset(self, seed=None, options=None):
         # Accept the `options` kwarg used by Gymnasium wrappers (Monitor, VecEnv).
         super().reset(seed=seed)
@@ -189,7 +208,7 @@ class LEOEnv(gym.Env):
         self.slot_counter = 0
         self.frame_counter = 0
         
-        edges = self.net._allLinks
+        edges = self.net.link_table()
         self.EG.reset(self.sat, edges)
 
         all_nodes, all_edges, all_tasks = self.EG.get_nodes(), self.EG.get_edges(), self.TM.get_tasks()
@@ -221,7 +240,7 @@ class LEOEnv(gym.Env):
         # 获取当前任务和节点状态
         # nodes, edges = self.EG.get_nodes(), self.EG.get_edges()
         nodes = self.sat
-        edges = self.net.compute_isl_links_at(self.period_counter, self.slot_counter)
+        edges = self.net.compute_isl_arrays(self.period_counter, self.slot_counter)
 
         all_tasks = self.TM.get_tasks()
         tasks = self.TM.get_tasks_at(step=self.frame_counter)
@@ -282,7 +301,7 @@ class LEOEnv(gym.Env):
 
                 self.DM.write_rho(u=(p, o), v=dst, n=task.layer_id, m=task.id, value=True)
 
-                if ((p, o), dst) in self.EG.edges_dict:
+                if self.EG.connected((p, o), dst):
                     data_bits = LAYER_OUTPUT_DATA_SIZE[task.layer_id]
                     node.is_communicating_isl = True
                     trans_reqs.append(
@@ -368,6 +387,7 @@ class LEOEnv(gym.Env):
         if self.slot_counter < self.max_slot_number - 1:
             self.time_recorder = self.time_recorder + self.slot
             self.slot_counter += 1
+            self.slot_update()
         else:
             self.slot_counter = 0
             next_period = self.period_counter + 1
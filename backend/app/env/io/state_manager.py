@@ -5,7 +5,7 @@ import logging
 from app.config import DEBUG, MAX_NUM_LAYERS, MAX_NUM_TASKS
 from app.env.vars.task import Task
 from app.entities.satellite_entity import SatelliteEntity
-from app.services.network_service import LinkSnapshot
+from app.entities.functions.topology import LinkTable
 
 
 class StateManager:
@@ -33,43 +33,24 @@ class StateManager:
         self.workload = np.zeros((self.M_MAX, self.N_MAX), dtype=np.int32)
 
 
-    def setup(self, all_nodes: List[SatelliteEntity], all_edges: List[LinkSnapshot], all_tasks: List[Task]):
+    def setup(self, all_nodes: List[SatelliteEntity], all_edges: LinkTable, all_tasks: List[Task]):
+        """
+        all_edges 的节点下标即 all_nodes 中的位置；端点不是卫星的链路（例如连到地面站）跳过。
+        """
         for n in all_nodes:
             pp, oo = n.plane, n.order
             self.energy[pp, oo] = n.battery_percent
             self.sunlight[pp, oo] = n.is_charging
 
-        for e in all_edges:
-            # defensive: map ids -> nodes (may be None if link is to GS etc)
-            u = next((n for n in all_nodes if n.id == e.src), None)
-            v = next((n for n in all_nodes if n.id == e.dst), None)
-            if u is None or v is None:
-                if DEBUG:
-                    print("StateManager.setup: skipping edge for unknown node src=%s dst=%s", e.src, e.dst)
-                continue
-
-            src_p, src_o = int(u.plane), int(u.order)
-            dst_p, dst_o = int(v.plane), int(v.order)
-
-            # avoid duplicate initialization — if already set and similar rate, skip or keep max
-            existing = float(self.comm[src_p, src_o, dst_p, dst_o])
-            new_rate = float(e.rate)
-            if existing != 0.0:
-                # keep the maximum rate to be safe and avoid duplicate prints
-                if new_rate > existing:
-                    self.comm[src_p, src_o, dst_p, dst_o] = new_rate
-                    self.comm[dst_p, dst_o, src_p, src_o] = new_rate
-                    if DEBUG:
-                        print("StateManager.setup: updated comm link U(%d,%d)<->V(%d,%d) to higher rate %f", src_p, src_o, dst_p, dst_o, new_rate)
-                else:
-                    if DEBUG:
-                        print("StateManager.setup: skipping duplicate comm link U(%d,%d)<->V(%d,%d) (existing=%f new=%f)", src_p, src_o, dst_p, dst_o, existing, new_rate)
-                continue
-
-            self.comm[src_p, src_o, dst_p, dst_o] = new_rate
-            self.comm[dst_p, dst_o, src_p, src_o] = new_rate
-            if DEBUG:
-                print("StateManager.setup: initialized comm link U(%d,%d) <-> V(%d,%d) with rate %f", src_p, src_o, dst_p, dst_o, new_rate)
+        po = np.array([(n.plane, n.order) for n in all_nodes], dtype=np.int64).reshape(-1, 2)
+        known = (all_edges.src < len(all_nodes)) & (all_edges.dst < len(all_nodes))
+        if DEBUG and not known.all():
+            print("StateManager.setup: skipping %d edges to unknown nodes" % int((~known).sum()))
+        u, v = po[all_edges.src[known]], po[all_edges.dst[known]]
+        rate = np.asarray(all_edges.rate[known], dtype=self.comm.dtype)
+        # 重复的链路保留最大速率，两个方向同时登记
+        np.maximum.at(self.comm, (u[:, 0], u[:, 1], v[:, 0], v[:, 1]), rate)
+        np.maximum.at(self.comm, (v[:, 0], v[:, 1], u[:, 0], u[:, 1]), rate)
 
         for t in all_tasks:
             self.location[t.id, 0] = t.plane_at
@@ -1,7 +1,7 @@
 import os
 import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__))))
-from app.routers import cache, project, simulation, rl_ws
+from app.routers import access, cache, project, simulation, rl_ws
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -20,4 +20,5 @@ app.include_router(project.router)
 app.include_router(simulation.router)
 app.include_router(cache.router)
 app.include_router(rl_ws.router)
+app.include_router(access.router)
 
@@ -1,14 +1,14 @@
 import math
 import numpy as np
-from skyfield.api import EarthSatellite, Time, wgs84, load
+from skyfield.api import EarthSatellite, Time
+from skyfield.framelib import itrs
 
 from app.config import R_EARTH
-from app.config import EPHEMERIS
+from app.config import get_ephemeris, get_timescale
 from app.models.camera_model import CameraModel
+from app.entities.functions.footprint import velocity_azimuth
 from app.models.api_dict.basic import XYZ, LatLon
 
-TS = load.timescale()
-
 class SatelliteModel():
     def __init__(self,
         altitude: float = 500e3,
@@ -19,7 +19,7 @@ class SatelliteModel():
         tle2text: str = "",
     ):
         self.id = id
-        self.motion = EarthSatellite(line1=tle1text, line2=tle2text, name=id, ts=TS)
+        self.motion = EarthSatellite(line1=tle1text, line2=tle2text, name=id, ts=get_timescale())
         self.altitude = altitude
         self.inc = self.motion.model.inclo
         self.op = self._op()  # 轨道周期（秒）
@@ -42,17 +42,14 @@ class SatelliteModel():
         self.sub_loc = LatLon(lat=lat, lon=lon)
         xyz = g1.position.m
         self.pos = XYZ(x=xyz[0], y=xyz[1], z=xyz[2])
-        self._gva(t)
-        self.is_sunlit = g1.is_sunlit(EPHEMERIS)
+        self._gva(t, g1)
+        self.is_sunlit = g1.is_sunlit(get_ephemeris())
     
-    def _gva(self, t: Time) -> float:
-        t2 = t + self._ts() / 86400.0
-        g2 = self.motion.at(t2)
-        subpoint2 = g2.subpoint()
-        lat2 = subpoint2.latitude.degrees
-        lon2 = subpoint2.longitude.degrees
-        az12, az21, dist = wgs84.inv(self.sub_loc.lon, self.sub_loc.lat, lon2, lat2)
-        self.gva = az12 % 360
+    def _gva(self, t: Time, g1=None) -> float:
+        # 地固系速度在当地 ENU 中的方向即地面轨迹方向，无需再传播一次
+        g1 = g1 if g1 is not None else self.motion.at(t)
+        _, v_itrs = g1.frame_xyz_and_velocity(itrs)
+        self.gva = float(velocity_azimuth(self.sub_loc.lat, self.sub_loc.lon, v_itrs.m_per_s))
     
     def capture(self):
         angle = self.gva if self.gva is not None else 0.0
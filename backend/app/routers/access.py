@@ -0,0 +1,19 @@
+from routers.prefix import ACCESS_PREFIX
+from fastapi import APIRouter, HTTPException
+from starlette.concurrency import run_in_threadpool
+from app.models.api_dict.pj import ProjectDict
+from app.models.api_dict.basic import ApiResponse
+from services.cache_service import load_access_windows
+
+router = APIRouter(prefix=ACCESS_PREFIX, tags=["access"])
+
+@router.post("/windows", response_model=ApiResponse[dict])
+async def get_access_windows(input: ProjectDict):
+    """
+    卫星-地面站 / 卫星-ROI 接触窗口，按卫星与起始时刻排序。
+    """
+    try:
+        windows = await run_in_threadpool(load_access_windows, input)
+        return ApiResponse(status="success", data=windows)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
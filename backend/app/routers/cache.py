@@ -1,8 +1,11 @@
+import asyncio
+import json
 import multiprocessing
 from app.core.simulation import Simulation
-from app.env.train_and_run import train_model
 from routers.prefix import CACHE_PREFIX
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from app.models.api_dict.pj import ProjectDict
 from app.models.api_dict.basic import ApiResponse
 from services.cache_service import (
@@ -27,19 +30,53 @@ async def clear_cache():
 @router.post("/check_integrity", response_model=ApiResponse[dict])
 async def check_cache_integrity(input: ProjectDict):
     try:
-        result = check_all_cache_integrity(input.id, input.constellation.id)
+        result = check_all_cache_integrity(input)
         return ApiResponse(status="success", data=result)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.post("/initial", response_model=ApiResponse[str])
 async def initial_cache(input: ProjectDict):
-    initial_cache_setup(input)
+    await run_in_threadpool(initial_cache_setup, input)
     return ApiResponse(status="success", data="cache initialized")
 
+@router.post("/initial/stream")
+async def initial_cache_stream(input: ProjectDict):
+    """
+    与 /initial 相同，但以 NDJSON 流的形式逐条返回预计算进度事件。
+    """
+    loop = asyncio.get_running_loop()
+    events: asyncio.Queue = asyncio.Queue()
+
+    def report(event: dict):
+        loop.call_soon_threadsafe(events.put_nowait, event)
+
+    async def run():
+        try:
+            await run_in_threadpool(initial_cache_setup, input, report)
+            report({"stage": "done"})
+        except Exception as e:
+            report({"stage": "error", "detail": str(e)})
+        finally:
+            report(None)
+
+    task = asyncio.create_task(run())
+
+    async def stream():
+        while True:
+            event = await events.get()
+            if event is None:
+                break
+            yield json.dumps(event) + "\n"
+        await task
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
 @router.post("/train", response_model=ApiResponse[str])
 async def train_model_route(input: ProjectDict):
     try:
+        # 训练依赖 torch / sb3，只在真正启动训练时才导入
+        from app.env.train_and_run import train_model
         p = multiprocessing.Process(target=train_model, args=(input,))
         p.daemon = False
         p.start()
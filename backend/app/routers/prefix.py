@@ -2,4 +2,5 @@ PROJECT_PREFIX = "/api/project"
 PREDICT_PREFIX = "/api/predict"
 SIMULATION_PREFIX = "/api/simulation"
 REALTIME_PREFIX = "/api/realtime"
-CACHE_PREFIX = "/api/cache"
\ No newline at end of file
+CACHE_PREFIX = "/api/cache"
+ACCESS_PREFIX = "/api/access"
\ No newline at end of file
@@ -4,16 +4,20 @@ from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 import asyncio
 import json
 import os
-from sb3_contrib import MaskablePPO
-from stable_baselines3.common.vec_env import VecNormalize
-from app.env.env import LEOEnv
+from typing import TYPE_CHECKING
 from app.models.api_dict.pj import ProjectDict
 
+# torch / sb3 / gymnasium 导入很慢，只在建立 RL 会话时才导入
+if TYPE_CHECKING:
+    from app.env.env import LEOEnv
+
 router = APIRouter(prefix=SIMULATION_PREFIX, tags=["rl-run"])
 
 MODEL_PATH = "ai_model/ppo_leoenv"  # adjust if needed
 
 def load_model_and_normalizer(model_path: str):
+    from sb3_contrib import MaskablePPO
+    from stable_baselines3.common.vec_env import VecNormalize
     model = MaskablePPO.load(model_path)
     vecnorm = None
     vec_path = model_path + ".vecnormalize"
@@ -27,7 +31,7 @@ def load_model_and_normalizer(model_path: str):
             vecnorm = None
     return model, vecnorm
 
-def env_to_payload(env: LEOEnv, info: dict) -> dict:
+def env_to_payload(env: "LEOEnv", info: dict) -> dict:
     """Build a payload analogous to Simulation.serialize()"""
     return {
         "time": env.time_recorder.isoformat(),
@@ -63,6 +67,7 @@ async def ws_rl_run(ws: WebSocket):
 
     # 2) Build env (you must provide a ProjectDict to initialize the env)
     #    For demo: expecting the client to send an "init" message with project config.
+    from app.env.env import LEOEnv
     env: LEOEnv = None
     try:
         # wait for init message containing project JSON
@@ -0,0 +1,151 @@
+import os
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+import numpy as np
+from pydantic import BaseModel
+from app.entities.functions.access import AccessWindows, roi_coverage, station_elevation
+from app.entities.functions.columnar import full_store, series_at
+from app.services.network_service import Network
+
+"""
+接触窗口服务：在整个时间范围上预计算卫星-地面站、卫星-ROI 的接触窗口，
+按 id / datetime 提供查询，并序列化给前端时间轴。
+- 地面站窗口直接取自链路拓扑（可见即存在 DL / UL），峰值为仰角（度），速率为下行速率
+- ROI 窗口为足迹与 ROI 重叠（覆盖率 > 0）的连续时刻，峰值为覆盖率（0~1）；观测不涉及下行链路，
+  速率记为 NaN，序列化为 None
+"""
+
+class AccessWindowSnapshot(BaseModel):
+    type: str           # "GS" 或 "ROI"
+    sat: str            # 卫星 id
+    target: str         # 地面站 / ROI id
+    start: datetime
+    end: datetime
+    peak: float         # 峰值仰角（度）或峰值覆盖率
+    rate: Optional[float]   # 窗口内平均下行速率（bits/s）；ROI 窗口为 None
+
+def compute_station_windows(net: Network, steps: int, step_seconds: float) -> AccessWindows:
+    sat, gs, step, elev, rate = [], [], [], [], []
+    for t in range(steps):
+        sgl = net.compute_sgl_arrays(t, 0)
+        if len(sgl) == 0:
+            continue
+        sat_xyz = net.sat_series_at('space_xyz', t)
+        gs_xyz = series_at(net.gs_datas, 'xyz', t, net._gs_store)
+        sat.append(np.asarray(sgl.sat))
+        gs.append(np.asarray(sgl.gs))
+        step.append(np.full(len(sgl), t))
+        elev.append(station_elevation(sat_xyz[sat[-1]], gs_xyz[gs[-1]]))
+        rate.append(np.asarray(sgl.dl_rate))
+    return AccessWindows.from_observations(*_concat(sat, gs, step, elev, rate), step_seconds, net.N, len(net.gs_datas))
+
+def compute_roi_windows(sat_datas: List[Any], roi_datas: List[Any], steps: int, step_seconds: float) -> AccessWindows:
+    sat, roi, step, coverage = [], [], [], []
+    if sat_datas and roi_datas:
+        store = full_store(sat_datas)
+        footprint_radius = np.array([np.hypot(s['swath_length'], s['swath_width']) / 2 for s in sat_datas], dtype=float)
+        roi_center = np.stack([np.asarray(r['center_latlon'], dtype=float) for r in roi_datas])
+        roi_corners = np.stack([np.asarray(r['target_corners_latlon'], dtype=float) for r in roi_datas])
+        roi_radius = np.array([max(r['roi_length'], r['roi_width']) / 2 for r in roi_datas], dtype=float)
+        for t in range(steps):
+            s, r, c = roi_coverage(
+                series_at(sat_datas, 'subpoint_latlon', t, store),
+                series_at(sat_datas, 'footprint_corners_latlon', t, store),
+                footprint_radius,
+                roi_center,
+                roi_corners,
+                roi_radius,
+            )
+            sat.append(s)
+            roi.append(r)
+            step.append(np.full(len(s), t))
+            coverage.append(c)
+    sat, roi, step, coverage = _concat(sat, roi, step, coverage)
+    return AccessWindows.from_observations(sat, roi, step, coverage, np.full(len(sat), np.nan), step_seconds, len(sat_datas), len(roi_datas))
+
+def _concat(*columns: List[np.ndarray]) -> List[np.ndarray]:
+    return [np.concatenate(c) if c else np.zeros(0) for c in columns]
+
+class AccessIndex:
+    """
+    一个项目时间范围内的全部接触窗口，按 id / datetime 查询。
+    """
+    def __init__(self, stations: AccessWindows, rois: AccessWindows, t0: datetime, sat_ids: List[str], gs_ids: List[str], roi_ids: List[str]):
+        self.stations = stations
+        self.rois = rois
+        self.t0 = t0
+        self.sat_ids = sat_ids
+        self.gs_ids = gs_ids
+        self.roi_ids = roi_ids
+        self._sat_index = {sid: i for i, sid in enumerate(sat_ids)}
+        self._gs_index = {gid: i for i, gid in enumerate(gs_ids)}
+        self._roi_index = {rid: i for i, rid in enumerate(roi_ids)}
+
+    @classmethod
+    def build(
+        cls,
+        net: Network,
+        roi_datas: List[Any],
+        datetimes: List[datetime],
+        path: Optional[str] = None,
+        ) -> "AccessIndex":
+        """
+        path 给定时优先读取缓存（path/stations 与 path/rois），否则计算后写入。
+        """
+        stations_path = os.path.join(path, "stations") if path else None
+        rois_path = os.path.join(path, "rois") if path else None
+        if path and AccessWindows.exists(stations_path) and AccessWindows.exists(rois_path):
+            stations, rois = AccessWindows.load(stations_path), AccessWindows.load(rois_path)
+        else:
+            step_seconds = (datetimes[1] - datetimes[0]).total_seconds() if len(datetimes) > 1 else 0.0
+            stations = compute_station_windows(net, len(datetimes), step_seconds)
+            rois = compute_roi_windows(net.sat_datas, roi_datas, len(datetimes), step_seconds)
+            if path:
+                stations.save(stations_path)
+                rois.save(rois_path)
+        return cls(stations, rois, datetimes[0], net._sat_ids, net._gs_ids, [r['id'] for r in roi_datas])
+
+    def _seconds(self, when: datetime) -> float:
+        return (when - self.t0).total_seconds()
+
+    def _snapshot(self, kind: str, windows: AccessWindows, i: int) -> AccessWindowSnapshot:
+        w = windows.window(i)
+        targets = self.gs_ids if kind == "GS" else self.roi_ids
+        return AccessWindowSnapshot(
+            type=kind,
+            sat=self.sat_ids[w["sat"]],
+            target=targets[w["target"]],
+            start=self.t0 + timedelta(seconds=w["start"]),
+            end=self.t0 + timedelta(seconds=w["end"]),
+            peak=w["peak"],
+            rate=None if np.isnan(w["rate"]) else w["rate"],
+        )
+
+    def next_station_contact(self, sat_id: str, when: datetime) -> Optional[AccessWindowSnapshot]:
+        """
+        卫星在 when 时正在进行或之后最早开始的地面站接触。
+        """
+        i = self.stations.next_contact(self._sat_index[sat_id], self._seconds(when))
+        return None if i is None else self._snapshot("GS", self.stations, i)
+
+    def next_roi_contact(self, sat_id: str, when: datetime) -> Optional[AccessWindowSnapshot]:
+        i = self.rois.next_contact(self._sat_index[sat_id], self._seconds(when))
+        return None if i is None else self._snapshot("ROI", self.rois, i)
+
+    def covering_roi(self, roi_id: str, when: datetime) -> List[AccessWindowSnapshot]:
+        """
+        when 时覆盖该 ROI 的卫星窗口。
+        """
+        return [self._snapshot("ROI", self.rois, i) for i in self.rois.covering(self._roi_index[roi_id], self._seconds(when))]
+
+    def visible_from_station(self, gs_id: str, when: datetime) -> List[AccessWindowSnapshot]:
+        return [self._snapshot("GS", self.stations, i) for i in self.stations.covering(self._gs_index[gs_id], self._seconds(when))]
+
+    def serialize(self) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        全部窗口，按卫星与起始时刻排序，供前端时间轴使用。
+        """
+        return {
+            "stations": [self._snapshot("GS", self.stations, i).model_dump() for i in self.stations.by_sat.order.tolist()],
+            "rois": [self._snapshot("ROI", self.rois, i).model_dump() for i in self.rois.by_sat.order.tolist()],
+        }
@@ -1,9 +1,28 @@
 from datetime import datetime, timedelta, timezone
 import os
 import shutil
-from typing import List
-from app.entities.functions.prepare import TS, preparation_of_earth, preparation_of_roi, preparation_of_satellite, preparation_of_station, preparation_of_sun
+from typing import Callable, List, Optional, Tuple
+from app.config import PRECOMPUTE_LINKS, PRECOMPUTE_WORKERS, get_timescale
+from app.entities.functions.columnar import ColumnarStore, exists_columns
+from app.entities.functions.prepare import (
+    access_cache_path,
+    earth_cache_path,
+    links_cache_path,
+    preparation_of_earth,
+    preparation_of_ephemeris,
+    preparation_of_roi,
+    preparation_of_satellite,
+    preparation_of_station,
+    preparation_of_sun,
+    report_progress,
+    roi_cache_path,
+    satellite_cache_path,
+    station_cache_path,
+    sun_cache_path,
+)
 from app.models.api_dict.pj import ProjectDict
+from app.services.access_service import AccessIndex
+from app.services.network_service import Network
 
 
 def clear_cache_folder(cache_dir: str = "cache") -> None:
@@ -29,36 +48,36 @@ def get_cache_folder_size(cache_dir: str = "cache") -> int:
                 total_size += os.path.getsize(file_path)
     return total_size
 
-def check_all_cache_integrity(project_id: str, constellation_id: str) -> dict:
+def check_all_cache_integrity(input: ProjectDict) -> dict:
     """
-    检查所有相关 cache 路径的完整性（能否正常读取 pickle 文件）。
+    检查该项目当前输入对应的所有 cache 产物的完整性（manifest 可读、各字段文件大小一致，
+    且已覆盖当前实验的时间范围）。
     返回 dict: {业务名: True/False}
     """
-    import pickle
-
+    datetime_list, _ = build_time_grid(input)
     cache_map = {
-        "sat_datas": f"cache/{project_id}/sat_datas/{constellation_id}.pkl",
-        "gs_datas": f"cache/{project_id}/gs_datas.pkl",
-        "roi_datas": f"cache/{project_id}/roi_datas.pkl",
-        "sun_datas": "cache/sun_datas.pkl",
-        # "moon_datas": "cache/moon_datas.pkl",
-        "earth_datas": "cache/earth_datas.pkl",
+        "sat_datas": satellite_cache_path(input, datetime_list),
+        "gs_datas": station_cache_path(input, datetime_list),
+        "roi_datas": roi_cache_path(input, datetime_list),
+        "sun_datas": sun_cache_path(datetime_list),
+        "earth_datas": earth_cache_path(datetime_list),
     }
     result = {}
     for key, path in cache_map.items():
-        if not os.path.exists(path):
+        if not exists_columns(path):
             result[key] = False
             continue
         try:
-            with open(path, "rb") as f:
-                pickle.load(f)
-            result[key] = True
+            store = ColumnarStore(path)
+            result[key] = store.verify() and store.covered_steps >= len(datetime_list)
         except Exception:
             result[key] = False
     return result
 
-def initial_cache_setup(input: ProjectDict) -> ProjectDict:
-    print("Initial cache setup", input.experiment.end_time)
+def build_time_grid(input: ProjectDict) -> Tuple[List[datetime], timedelta]:
+    """
+    根据实验起止时间与 time_slot 生成缓存所用的时间网格。
+    """
     t_start = normalize_time(input.experiment.start_time)
     if input.experiment.end_time is None or input.experiment.end_time < input.experiment.start_time:
         t_end = t_start + timedelta(hours=2)
@@ -77,18 +96,29 @@ def initial_cache_setup(input: ProjectDict) -> ProjectDict:
     datetime_list = [
         t_start + i * dt_slot for i in range(number_of_steps)
     ]
-    
+    return datetime_list, dt_slot
+
+def initial_cache_setup(
+    input: ProjectDict,
+    progress: Optional[Callable[[dict], None]] = None,
+    workers: int = PRECOMPUTE_WORKERS,
+) -> ProjectDict:
+    print("Initial cache setup", input.experiment.end_time)
+    datetime_list, dt_slot = build_time_grid(input)
+    number_of_steps = len(datetime_list)
     times = to_times(datetime_list)
     
-    print(f"  - Total simulation duration: {max_simulation_duration}, steps: {number_of_steps}")
-    print(f"  - Time slot: {dt_slot}, from {t_start} to {t_end}")
+    print(f"  - Steps: {number_of_steps}")
+    print(f"  - Time slot: {dt_slot}, from {datetime_list[0]} to {datetime_list[-1]}")
     print(f"  - Preparing cache data {times[0]} ~ {times[-1]} ...")
     
     sat, sat_datas = preparation_of_satellite(
         input=input,
         steps=number_of_steps,
         times=times,
-        datetimes=datetime_list
+        datetimes=datetime_list,
+        workers=workers,
+        progress=progress,
     )
     
     gs, gs_datas = preparation_of_station(
@@ -96,6 +126,7 @@ def initial_cache_setup(input: ProjectDict) -> ProjectDict:
         times=times,
         datetimes=datetime_list
     )
+    report_progress(progress, stage="stations", done=len(gs_datas), total=len(gs_datas))
     
     roi, roi_datas = preparation_of_roi(
         input=input,
@@ -103,18 +134,52 @@ def initial_cache_setup(input: ProjectDict) -> ProjectDict:
         times=times,
         datetimes=datetime_list
     )
+    report_progress(progress, stage="rois", done=len(roi_datas), total=len(roi_datas))
     
     eth, eth_data = preparation_of_earth(
         dt=dt_slot,
         times=times,
         datetimes=datetime_list
     )
+    report_progress(progress, stage="earth", done=1, total=1)
     
     sun, sun_data = preparation_of_sun(
         times=times,
         datetimes=datetime_list
     )
+    report_progress(progress, stage="sun", done=1, total=1)
     
+    preparation_of_ephemeris(
+        input=input,
+        datetimes=datetime_list
+    )
+    report_progress(progress, stage="ephemeris", done=1, total=1)
+    
+    if sat_datas:
+        net = Network(num_planes=input.constellation.number_of_planes, sat_datas=sat_datas, gs_datas=gs_datas)
+        if PRECOMPUTE_LINKS:
+            net.precompute_links(links_cache_path(input, datetime_list, net.elev_threshold_deg))
+            report_progress(progress, stage="links", done=1, total=1)
+        AccessIndex.build(net, roi_datas, datetime_list, access_cache_path(input, datetime_list, net.elev_threshold_deg))
+        report_progress(progress, stage="access", done=1, total=1)
+    
+def load_access_windows(input: ProjectDict) -> dict:
+    """
+    项目时间范围内的全部接触窗口（读取缓存，缺失的部分现算），供前端时间轴使用。
+    """
+    datetime_list, _ = build_time_grid(input)
+    times = to_times(datetime_list)
+    _, sat_datas = preparation_of_satellite(input=input, steps=len(datetime_list), times=times, datetimes=datetime_list)
+    _, gs_datas = preparation_of_station(input=input, times=times, datetimes=datetime_list)
+    _, roi_datas = preparation_of_roi(input=input, steps=len(datetime_list), times=times, datetimes=datetime_list)
+    if not sat_datas:
+        return {"stations": [], "rois": []}
+    net = Network(num_planes=input.constellation.number_of_planes, sat_datas=sat_datas, gs_datas=gs_datas)
+    if PRECOMPUTE_LINKS:
+        net.precompute_links(links_cache_path(input, datetime_list, net.elev_threshold_deg))
+    index = AccessIndex.build(net, roi_datas, datetime_list, access_cache_path(input, datetime_list, net.elev_threshold_deg))
+    return index.serialize()
+
 def normalize_time(t):
         """
         Normalize input time to timezone-aware UTC datetime.
@@ -128,4 +193,4 @@ def normalize_time(t):
     
     
 def to_times(datetimes: List[datetime]):
-    return TS.utc(datetimes)
\ No newline at end of file
+    return get_timescale().utc(datetimes)
\ No newline at end of file
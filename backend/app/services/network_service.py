@@ -1,10 +1,14 @@
 import numpy as np
+from collections import defaultdict
 from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from pydantic import BaseModel
-from app.config import R_EARTH
+from app.config import GS_INDEX_MIN_STATIONS
 from app.entities._satellite_modules.constants import ISL_BW_HZ, ISL_FREQ_HZ, ISL_G_R_DB, ISL_G_T_DB, ISL_POWER_W, UL_BW_HZ, UL_FREQ_HZ, UL_G_R_DB, UL_G_T_DB, UL_POWER_W
+from app.entities.functions.columnar import full_store, series_at
+from app.entities.functions.topology import LINK_TYPES, LinkArrays, LinkTable, LinkTensor, SglArrays, StationIndex, build_link_tensor, isl_candidate_pairs, isl_links, link_table, sgl_links, visibility_half_angle
 from app.models.api_dict.basic import XYZ, LatLon
+from app.services.routing_service import Routing
 
 class LinkSnapshot(BaseModel):
     type: str
@@ -29,20 +33,54 @@ class Network:
         # 建立 id->索引映射，便于快速查找
         self.sat_id_to_idx = {sat['id']: i for i, sat in enumerate(sat_datas)}
         self.gs_id_to_idx = {gs['id']: i for i, gs in enumerate(gs_datas)}
+        self._sat_ids: List[str] = [sat['id'] for sat in sat_datas]
+        self._gs_ids: List[str] = [gs['id'] for gs in gs_datas]
+        self.node_ids: List[str] = self._sat_ids + self._gs_ids  # LinkTable 的节点下标 -> id
         
         self.N = len(sat_datas)  # 卫星总数
         self.num_planes = num_planes  # 轨道平面数
         self.sats_per_plane = len(sat_datas) // num_planes  # 每个
-        self._allLinks = []  # 存储当前时刻所有链路，格式列表，后续compute_links_at更新
-        
-    @staticmethod
-    def _euclidean_distance(p1, p2) -> float:
-        return np.linalg.norm(np.array(p1) - np.array(p2))
-    
-    @staticmethod
-    def _los_distance(h1, h2) -> float:
-        # 视距极限距离（Line of Sight）
-        return np.sqrt(h1 * (h1 + 2 * R_EARTH)) + np.sqrt(h2 * (h2 + 2 * R_EARTH))
+        # 当前时刻的链路（数组形式），link_table 拼成 LinkTable，_allLinks 按需转成 LinkSnapshot 列表
+        self._isl: Optional[LinkArrays] = None
+        self._sgl: Optional[SglArrays] = None
+        self._links_period: int = 0
+        self._links: Optional[List[LinkSnapshot]] = None
+        self._table: Optional[LinkTable] = None
+        self._serialized: Optional[List[Dict[str, Any]]] = None
+        self._serialized_key: Any = None
+        self._snapshots: Dict[int, LinkSnapshot] = {}
+        self._incident: Optional[Dict[str, List[int]]] = None
+        self._pairs: Optional[Dict[Tuple[str, str], int]] = None
+        self._tensor: Optional[LinkTensor] = None  # precompute_links 之后的整段拓扑
+
+        # ISL 候选邻居表与卫星高度只与构型有关，构建一次
+        self._sat_store = full_store(sat_datas)
+        self._isl_pairs = isl_candidate_pairs(
+            [sat['plane'] for sat in sat_datas],
+            [sat['order'] for sat in sat_datas],
+            num_planes,
+            self.sats_per_plane,
+        )
+        self._altitude = np.array([sat['altitude'] for sat in sat_datas], dtype=float)
+
+        # 地面站固定在地表，经纬度有效性只检查一次；SGL默认参数, [1] Table II PAGE 23，上行交换收发增益
+        self._gs_store = full_store(gs_datas)
+        self._gs_valid = np.array([np.asarray(gs['latlon']).size >= 2 for gs in gs_datas], dtype=bool)
+        # 地面站较多时建立地固系空间索引，每颗卫星只检查可见锥内的站
+        self._gs_index: Optional[StationIndex] = None
+        if self._gs_valid.sum() >= GS_INDEX_MIN_STATIONS:
+            valid = np.nonzero(self._gs_valid)[0]
+            self._gs_index = StationIndex(np.stack([np.asarray(gs_datas[i]['latlon'])[:2] for i in valid]), valid)
+        self._dl_budget = (UL_POWER_W, UL_G_T_DB, UL_G_R_DB, UL_FREQ_HZ, UL_BW_HZ)
+        self._ul_budget = (UL_POWER_W, UL_G_R_DB, UL_G_T_DB, UL_FREQ_HZ, UL_BW_HZ)
+        # 快照路由（最短时延 / 最大瓶颈速率 / k 最短路径），结果按 period 缓存
+        self.routing = Routing(self)
+
+    def sat_series_at(self, key: str, period_counter: int) -> np.ndarray:
+        """
+        所有卫星在该 period 的某个时间序列字段，(N, ...)。
+        """
+        return series_at(self.sat_datas, key, period_counter, self._sat_store)
     
     @staticmethod
     def calculate_snr(P_t: float, d: float, G_t: float, G_r: float, f: float, B: float, T_sys: float = 300.0, k_dB: float = -228.6) -> tuple[float, float]:
@@ -77,199 +115,296 @@ class Network:
         rate = B * np.log2(1 + SNR) if SNR > 0 else 0  # bits/s, [1] equation (6)
         return rate
 
-    def compute_isl_links_at(self, period_counter: int, slot_counter: int) -> List[LinkSnapshot]:
-        links = set()
-
-        for u in range(self.N):
-            sat_u = self.sat_datas[u]
-            plane_u = sat_u['plane']
-            order_u = sat_u['order']
-            pos_u = sat_u['space_xyz'][period_counter]
-            h_u = sat_u['altitude']
-
-            # 同轨道相邻卫星
-            for offset in [-1, 1]:
-                v = (u + offset) % self.sats_per_plane + plane_u * self.sats_per_plane
-                if v < self.N:
-                    sat_v = self.sat_datas[v]
-                    pos_v = sat_v['space_xyz'][period_counter]
-                    h_v = sat_v['altitude']
-                    dist = self._euclidean_distance(pos_u, pos_v)
-                    if dist <= self._los_distance(h_u, h_v):
-                        links.add(tuple(sorted((u, v))))
+    def compute_isl_arrays(self, period_counter: int, slot_counter: int) -> LinkArrays:
+        """
+        计算时刻t所有ISL，返回并列数组（src / dst 为 sat_datas 下标）。
+        候选为同轨道相邻卫星与相邻轨道同序号卫星，距离不超过视距极限即存在链路。
+        """
+        if self._tensor is not None and period_counter < self._tensor.steps:
+            return self._tensor.isl_at(period_counter)
+        xyz = self.sat_series_at('space_xyz', period_counter)
+        # ISL默认参数, [1] Table II PAGE 23
+        budget = (ISL_POWER_W, ISL_G_T_DB, ISL_G_R_DB, ISL_FREQ_HZ, ISL_BW_HZ)
+        return isl_links(xyz, self._altitude, self._isl_pairs, budget)
 
-            # 不同轨道同序号卫星
-            for dp in [-1, 1]:
-                plane_v = (plane_u + dp) % self.num_planes
-                # 这里排除首尾相邻轨道的跨越，保持你的逻辑
-                plane_abs = abs(plane_u - plane_v)
-                if plane_abs == 0 or plane_abs == self.num_planes - 1:
-                    continue
-                v = plane_v * self.sats_per_plane + order_u
-                if v < self.N:
-                    sat_v = self.sat_datas[v]
-                    order_v = sat_v['order']
-                    pos_v = sat_v['space_xyz'][period_counter]
-                    h_v = sat_v['altitude']
-                    dist = self._euclidean_distance(pos_u, pos_v)
-                    los = self._los_distance(h_u, h_v)
-                    if dist <= los:
-                        links.add(tuple(sorted((u, v))))
+    def compute_isl_links_at(self, period_counter: int, slot_counter: int) -> List[LinkSnapshot]:
+        return self.isl_snapshots(self.compute_isl_arrays(period_counter, slot_counter), period_counter)
 
-        # 转成输出格式（包含卫星id和距离）
+    def isl_snapshots(self, isl: LinkArrays, period_counter: int) -> List[LinkSnapshot]:
+        """
+        把 ISL 数组转成 LinkSnapshot（仅在需要序列化时调用）。
+        """
+        xyz = self.sat_series_at('space_xyz', period_counter)
+        latlon = self.sat_series_at('subpoint_latlon', period_counter)
         result: List[LinkSnapshot] = []
-        for u, v in links:
-            sat_u = self.sat_datas[u]
-            sat_v = self.sat_datas[v]
-            pos_u = sat_u['space_xyz'][period_counter]
-            pos_v = sat_v['space_xyz'][period_counter]
-            loc_u = sat_u['subpoint_latlon'][period_counter]
-            loc_v = sat_v['subpoint_latlon'][period_counter]
-            dist = self._euclidean_distance(pos_u, pos_v)
-            
-            # 计算SNR和传输速率 (ISL默认参数, [1] Table II PAGE 23)
-            snr_linear, snr_dB = self.calculate_snr(ISL_POWER_W, dist, ISL_G_T_DB, ISL_G_R_DB, ISL_FREQ_HZ, ISL_BW_HZ)
-            rate = self.calculate_trans_rate(snr_linear, ISL_BW_HZ)
-
+        for u, v, dist, snr, rate in zip(isl.src.tolist(), isl.dst.tolist(), isl.distance.tolist(), isl.snr.tolist(), isl.rate.tolist()):
+            pos_u, pos_v = xyz[u].tolist(), xyz[v].tolist()
+            loc_u, loc_v = latlon[u].tolist(), latlon[v].tolist()
             result.append(
                 LinkSnapshot(
                     type='ISL',
-                    src=sat_u['id'],
-                    dst=sat_v['id'],
+                    src=self.sat_datas[u]['id'],
+                    dst=self.sat_datas[v]['id'],
                     distance=dist,
                     linkPos=[XYZ(x=pos_u[0], y=pos_u[1], z=pos_u[2]), 
                              XYZ(x=pos_v[0], y=pos_v[1], z=pos_v[2])],
                     linkLoc=[LatLon(lat=loc_u[0], lon=loc_u[1]),
                              LatLon(lat=loc_v[0], lon=loc_v[1])],
-                    snr=snr_dB,  # 新增SNR
-                    rate=rate,  # 新增传输速率 (bits/s)
+                    snr=snr,
+                    rate=rate,
                 )
             )
-
         return result
 
+    def compute_sgl_arrays(self, period_counter: int, slot_counter: int) -> SglArrays:
+        """
+        计算时刻t所有可见的 (卫星, 地面站) 对，每对对应一条DL和一条UL链路。
+        判断方法基于卫星相对于地面站的仰角，超过阈值即存在链路。
+        """
+        if self._tensor is not None and period_counter < self._tensor.steps:
+            return self._tensor.sgl_at(period_counter)
+
+        if self.N == 0 or not self.gs_datas:
+            return sgl_links(np.zeros((0, 3)), np.zeros((0, 3)), self.elev_threshold_deg, self._dl_budget, self._ul_budget)
+        sat_xyz = self.sat_series_at('space_xyz', period_counter)
+        gs_xyz = series_at(self.gs_datas, 'xyz', period_counter, self._gs_store)
+        candidates = None
+        if self._gs_index is not None:
+            sat_radius = float(np.max(np.linalg.norm(sat_xyz, axis=1)))
+            half_angle = visibility_half_angle(sat_radius, self.elev_threshold_deg)
+            candidates = self._gs_index.candidates(self.sat_series_at('subpoint_latlon', period_counter), half_angle)
+        return sgl_links(sat_xyz, gs_xyz, self.elev_threshold_deg, self._dl_budget, self._ul_budget, self._gs_valid, candidates)
+
     def compute_sgl_links_at(self, period_counter: int, slot_counter: int) -> List[LinkSnapshot]:
         """
         计算时刻t所有DL和UL链路（卫星<->地面站）。
-        判断方法基于卫星相对于地面站的仰角，超过阈值即存在链路。
+        """
+        return self.sgl_snapshots(self.compute_sgl_arrays(period_counter, slot_counter), period_counter)
+
+    def sgl_snapshots(self, sgl: SglArrays, period_counter: int) -> List[LinkSnapshot]:
+        """
+        把星地链路数组转成 LinkSnapshot，每个可见对依次输出 DL、UL（仅在需要序列化时调用）。
         """
         links: List[LinkSnapshot] = []
-        for i_sat, sat in enumerate(self.sat_datas):
-            # ensure numpy arrays for position and latlon
-            pos_sat = np.asarray(sat['space_xyz'][period_counter])
-            loc_sat = np.asarray(sat['subpoint_latlon'][period_counter])
-            id_sat = sat['id']
+        if len(sgl) == 0:
+            return links
+        sat_xyz = self.sat_series_at('space_xyz', period_counter)
+        sat_latlon = self.sat_series_at('subpoint_latlon', period_counter)
+        for i_sat, i_gs, dist, dl_snr, dl_rate, ul_snr, ul_rate in zip(*(a.tolist() for a in sgl)):
+            sat, gs = self.sat_datas[i_sat], self.gs_datas[i_gs]
+            pos_sat, loc_sat = sat_xyz[i_sat].tolist(), sat_latlon[i_sat].tolist()
+            pos_gs, loc_gs = np.asarray(gs['xyz'][period_counter]).tolist(), np.asarray(gs['latlon']).tolist()
+            xyz_sat = XYZ(x=pos_sat[0], y=pos_sat[1], z=pos_sat[2])
+            xyz_gs = XYZ(x=pos_gs[0], y=pos_gs[1], z=pos_gs[2])
+            ll_sat = LatLon(lat=loc_sat[0], lon=loc_sat[1])
+            ll_gs = LatLon(lat=loc_gs[0], lon=loc_gs[1])
 
-            for i_gs, gs in enumerate(self.gs_datas):
-                pos_gs = np.asarray(gs['xyz'][period_counter])
-                loc_gs = np.asarray(gs['latlon'])
-                id_gs = gs['id']
+            # 下行链路
+            links.append(LinkSnapshot(type='DL', src=sat['id'], dst=gs['id'], distance=dist,
+                                      linkPos=[xyz_sat, xyz_gs], linkLoc=[ll_sat, ll_gs], snr=dl_snr, rate=dl_rate))
+            # 上行链路 (假设参数类似, P_t低)
+            links.append(LinkSnapshot(type='UL', src=gs['id'], dst=sat['id'], distance=dist,
+                                      linkPos=[xyz_gs, xyz_sat], linkLoc=[ll_gs, ll_sat], snr=ul_snr, rate=ul_rate))
+        return links
 
-                # Validate lat/lon shapes: require at least two elements (lat, lon)
-                if loc_sat.size < 2 or loc_gs.size < 2:
-                    # skip malformed entries
-                    continue
+    def precompute_links(self, path: Optional[str] = None) -> LinkTensor:
+        """
+        对整个时间范围一次性计算 ISL / SGL 拓扑（LinkTensor），之后每个 period 只是切片。
+        path 给定时优先读取已覆盖该时间范围的缓存，否则计算后写入。
+        """
+        steps = len(self.times)
+        tensor = None
+        stale = False
+        if path and LinkTensor.exists(path):
+            tensor = LinkTensor.load(path)
+            if tensor.steps < steps:
+                tensor, stale = None, True
+        if tensor is None:
+            self._tensor = None
+            tensor = build_link_tensor(
+                steps,
+                self.N,
+                lambda t: self.compute_isl_arrays(t, 0),
+                lambda t: self.compute_sgl_arrays(t, 0),
+            )
+            if path:
+                tensor.save(path, replace=stale)
+        self._tensor = tensor
+        self.invalidate()
+        return tensor
+
+    def _at(self, period_counter: int, slot_counter: int):
+        """
+        切换到时刻 t 的链路（数组形式）。拓扑只随 period 变化，同一 period 内重复调用直接返回；
+        LinkSnapshot 与邻接索引都在首次使用时才构建。
+        """
+        if self._isl is not None and self._links_period == period_counter:
+            return
+        self._isl = self.compute_isl_arrays(period_counter, slot_counter)
+        self._sgl = self.compute_sgl_arrays(period_counter, slot_counter)
+        self._links_period = period_counter
+        self._links = None
+        self._table = None
+        self._serialized = None
+        self._snapshots = {}
+        self._incident = None
+        self._pairs = None
 
-                # 向量从地面站指向卫星
-                vec = pos_sat - pos_gs
-                # protect against zero-length vectors
-                norm_vec = np.linalg.norm(vec)
-                if norm_vec == 0:
-                    continue
-                gs_norm = pos_gs / np.linalg.norm(pos_gs)
-                elev_rad = np.arcsin(np.dot(vec, gs_norm) / norm_vec)
-                elev_deg = np.degrees(elev_rad)
+    def invalidate(self) -> None:
+        """
+        丢弃当前 period 的链路缓存（例如修改 elev_threshold_deg 之后）。
+        """
+        self._isl = None
+        self.routing.invalidate()
 
-                if elev_deg > self.elev_threshold_deg:
-                    dist = norm_vec
+    def link_table(self) -> LinkTable:
+        """
+        当前 period 的全部链路（LinkTable），行号与 _allLinks 一致。
+        """
+        if self._isl is None:
+            return link_table(LinkArrays(*(np.zeros(0),) * 5), SglArrays(*(np.zeros(0),) * 7), self.N)
+        if self._table is None:
+            self._table = link_table(self._isl, self._sgl, self.N)
+        return self._table
 
-                    # 计算SNR和传输速率 (SGL默认参数, [1] Table II PAGE 23)
-                    snr_down_linear, snr_down_dB = self.calculate_snr(UL_POWER_W, dist, UL_G_T_DB, UL_G_R_DB, UL_FREQ_HZ, UL_BW_HZ)
-                    rate_down = self.calculate_trans_rate(snr_down_linear, UL_BW_HZ)
+    def node_positions(self, period_counter: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        该 period 所有节点（卫星在前、地面站在后）的 (xyz, latlon)，按 LinkTable 的节点下标排列。
+        地面站经纬度无效时为 nan（这类站不会出现在链路中）。
+        """
+        xyz = [self.sat_series_at('space_xyz', period_counter).reshape(-1, 3)]
+        latlon = [self.sat_series_at('subpoint_latlon', period_counter).reshape(-1, 2)]
+        if self.gs_datas:
+            xyz.append(np.asarray(series_at(self.gs_datas, 'xyz', period_counter, self._gs_store)).reshape(-1, 3))
+            gs_latlon = np.full((len(self.gs_datas), 2), np.nan)
+            for i in np.nonzero(self._gs_valid)[0]:
+                gs_latlon[i] = np.asarray(self.gs_datas[i]['latlon'], dtype=float)[:2]
+            latlon.append(gs_latlon)
+        return np.concatenate(xyz), np.concatenate(latlon)
 
-                    # 下行链路
-                    links.append(
-                        LinkSnapshot(
-                            type='DL',
-                            src=id_sat,
-                            dst=id_gs,
-                            distance=dist,
-                            linkPos=[XYZ(x=float(pos_sat[0]), y=float(pos_sat[1]), z=float(pos_sat[2])), 
-                                     XYZ(x=float(pos_gs[0]), y=float(pos_gs[1]), z=float(pos_gs[2]))],
-                            linkLoc=[LatLon(lat=float(loc_sat[0]), lon=float(loc_sat[1])),
-                                     LatLon(lat=float(loc_gs[0]), lon=float(loc_gs[1]))],
-                            snr=snr_down_dB,
-                            rate=rate_down,
-                        )
-                    )
-                    
-                    # 上行链路 (假设参数类似, P_t低)
-                    snr_up_linear, snr_up_dB = self.calculate_snr(UL_POWER_W, dist, UL_G_R_DB, UL_G_T_DB, UL_FREQ_HZ, UL_BW_HZ)  # swap G_t/G_r for uplink
-                    rate_up = self.calculate_trans_rate(snr_up_linear, UL_BW_HZ)
+    @property
+    def _allLinks(self) -> List[LinkSnapshot]:
+        if self._links is None:
+            if self._isl is None:
+                self._links = []
+            else:
+                self._links = self.isl_snapshots(self._isl, self._links_period) + self.sgl_snapshots(self._sgl, self._links_period)
+                self._snapshots = dict(enumerate(self._links))
+        return self._links
 
-                    links.append(
-                        LinkSnapshot(
-                            type='UL',
-                            src=id_gs,
-                            dst=id_sat,
-                            distance=dist,
-                            linkPos=[XYZ(x=float(pos_gs[0]), y=float(pos_gs[1]), z=float(pos_gs[2])), 
-                                     XYZ(x=float(pos_sat[0]), y=float(pos_sat[1]), z=float(pos_sat[2]))],
-                            linkLoc=[LatLon(lat=float(loc_gs[0]), lon=float(loc_gs[1])),
-                                     LatLon(lat=float(loc_sat[0]), lon=float(loc_sat[1]))],
-                            snr=snr_up_dB,
-                            rate=rate_up,
-                        )
-                    )
+    def _link_meta(self, i: int) -> Tuple[str, str, str]:
+        """
+        当前 period 第 i 条链路的 (type, src, dst)。编号与 _allLinks 一致：
+        ISL 在前，随后每个星地对依次为 DL、UL。
+        """
+        n = len(self._isl)
+        if i < n:
+            return 'ISL', self._sat_ids[self._isl.src[i]], self._sat_ids[self._isl.dst[i]]
+        k, uplink = divmod(i - n, 2)
+        sat, gs = self._sat_ids[self._sgl.sat[k]], self._gs_ids[self._sgl.gs[k]]
+        return ('UL', gs, sat) if uplink else ('DL', sat, gs)
 
-        return links
+    def _link(self, i: int) -> LinkSnapshot:
+        """
+        当前 period 第 i 条链路的 LinkSnapshot，按需构建并缓存。
+        """
+        if i not in self._snapshots:
+            n = len(self._isl)
+            if i < n:
+                one = LinkArrays(*(a[i:i + 1] for a in self._isl))
+                self._snapshots[i] = self.isl_snapshots(one, self._links_period)[0]
+            else:
+                k, uplink = divmod(i - n, 2)
+                one = SglArrays(*(a[k:k + 1] for a in self._sgl))
+                self._snapshots[i] = self.sgl_snapshots(one, self._links_period)[uplink]
+        return self._snapshots[i]
 
-    def _at(self, period_counter: int, slot_counter: int):
+    def _link_index(self) -> Tuple[Dict[str, List[int]], Dict[Tuple[str, str], int]]:
         """
-        计算时刻 t 所有链路，更新 self.allLinks
+        当前 period 的邻接索引：节点 id -> 关联链路编号，(id1, id2) -> 第一条相连的链路编号（两个方向都登记）。
         """
-        isl_links = self.compute_isl_links_at(period_counter, slot_counter)
-        sgl_links = self.compute_sgl_links_at(period_counter, slot_counter)
-        self._allLinks = isl_links + sgl_links
-    
+        if self._incident is None:
+            incident: Dict[str, List[int]] = defaultdict(list)
+            pairs: Dict[Tuple[str, str], int] = {}
+
+            def add(i: int, a: str, b: str) -> None:
+                incident[a].append(i)
+                if b != a:
+                    incident[b].append(i)
+                pairs.setdefault((a, b), i)
+                pairs.setdefault((b, a), i)
+
+            n = len(self._isl)
+            for i, (u, v) in enumerate(zip(self._isl.src.tolist(), self._isl.dst.tolist())):
+                add(i, self._sat_ids[u], self._sat_ids[v])
+            for k, (u, g) in enumerate(zip(self._sgl.sat.tolist(), self._sgl.gs.tolist())):
+                sat, gs = self._sat_ids[u], self._gs_ids[g]
+                add(n + 2 * k, sat, gs)
+                add(n + 2 * k + 1, gs, sat)
+            self._incident, self._pairs = incident, pairs
+        return self._incident, self._pairs
+
     def is_link_exist_at(self, src: str, dst: str, period_counter: int, slot_counter: int) -> bool:
         """
         判断在时刻 t，id1 和 id2 是否存在链路（ISL 或 UL/DL）。
         """
         self._at(period_counter, slot_counter)
-        for l in self._allLinks:
-            if (l.src == src and l.dst == dst) or (l.src == dst and l.dst == src):
-                return True
-        return False
+        return (src, dst) in self._link_index()[1]
 
-    def get_link_data_at(self, id1: str, id2: str, period_counter: int, slot_counter: int) -> Optional[dict]:
+    def get_link_data_at(self, id1: str, id2: str, period_counter: int, slot_counter: int) -> Optional[LinkSnapshot]:
         self._at(period_counter, slot_counter)
-        for l in self._allLinks:
-            # if (link['src'] == id1 and link['dst'] == id2) or (link['src'] == id2 and link['dst'] == id1):
-            if (l.src == id1 and l.dst == id2) or (l.src == id2 and l.dst == id1):
-                return l
-        return None
+        i = self._link_index()[1].get((id1, id2))
+        return None if i is None else self._link(i)
     
     def get_links_of_node_at(self, node_id: str, node_type: str, period_counter: int, slot_counter: int) -> List[LinkSnapshot]:
         self._at(period_counter, slot_counter)
         result = []
 
-        for l in self._allLinks:
+        for i in self._link_index()[0].get(node_id, []):
+            link_type, src, dst = self._link_meta(i)
             if node_type.upper() == "SAT":
-                if l.src == node_id or l.dst == node_id and l.type == "ISL":
-                    result.append(l)
+                if src == node_id or dst == node_id and link_type == "ISL":
+                    result.append(self._link(i))
             elif node_type.upper() == "GS":
-                if (l.src == node_id or l.dst == node_id) and l.type in ("DL", "UL"):
-                    result.append(l)
+                if link_type in ("DL", "UL"):
+                    result.append(self._link(i))
             else:
-                if (l.src == node_id or l.dst == node_id):
-                    result.append(l)
+                result.append(self._link(i))
 
         return result
     
-    def serialize(self) -> List[LinkSnapshot]:
+    def serialize(self, sat_positions: Optional[Tuple[np.ndarray, np.ndarray]] = None, key: Any = None) -> List[Dict[str, Any]]:
         """
-        序列化当前网络状态为字典列表
+        序列化当前网络状态为字典列表（与 LinkSnapshot.model_dump() 同结构），
+        直接由 LinkTable 与节点位置数组生成，同一 period 内 key 不变时复用。
+        :param sat_positions: 当前 slot 插值后的卫星 (space_xyz, subpoint_latlon)，给定时链路端点跟随卫星移动；
+            默认取 period 起点的缓存位置（拓扑仍只随 period 变化）
+        :param key: sat_positions 对应的缓存键（如 slot 编号）
         """
-        links = [l.model_dump() for l in self._allLinks]
-        return links
+        if self._serialized is None or self._serialized_key != key:
+            self._serialized_key = key
+            table = self.link_table()
+            if len(table) == 0:
+                self._serialized = []
+            else:
+                xyz, latlon = self.node_positions(self._links_period)
+                if sat_positions is not None:
+                    xyz[:self.N] = np.asarray(sat_positions[0]).reshape(-1, 3)
+                    latlon[:self.N] = np.asarray(sat_positions[1]).reshape(-1, 2)
+                ids = self.node_ids
+                pos = xyz.tolist()
+                loc = latlon.tolist()
+                self._serialized = [
+                    {
+                        "type": LINK_TYPES[t],
+                        "src": ids[u],
+                        "dst": ids[v],
+                        "distance": dist,
+                        "linkPos": [dict(zip("xyz", pos[u])), dict(zip("xyz", pos[v]))],
+                        "linkLoc": [{"lat": loc[u][0], "lon": loc[u][1]}, {"lat": loc[v][0], "lon": loc[v][1]}],
+                        "snr": snr,
+                        "rate": rate,
+                    }
+                    for t, u, v, dist, snr, rate in zip(*(a.tolist() for a in table))
+                ]
+        return self._serialized
@@ -0,0 +1,281 @@
+import heapq
+from typing import TYPE_CHECKING, Dict, List, Optional, Set, Tuple
+import numpy as np
+from pydantic import BaseModel
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra
+from app.config import C_LIGHT
+from app.entities.functions.topology import ISL, link_table
+
+if TYPE_CHECKING:
+    from app.services.network_service import Network
+
+"""
+快照路由：在某个 period 的链路图上求路径。
+- 图的节点与 LinkTable 相同：卫星（0..N-1）与地面站（N..N+G-1）；ISL 双向，星地为 DL（卫星 -> 站）/ UL（站 -> 卫星）两条有向边
+- 边的时延 = 传播时延 distance / c，另加可选的数据传输时延 data_bits / rate
+- 拓扑在一个 period 内不变，图与所有查询结果都按 period 缓存，换 period 时整体失效
+"""
+
+class RouteSnapshot(BaseModel):
+    nodes: List[str]    # 途经节点 id（含起点与终点）
+    delay: float        # 端到端时延（秒）
+    rate: float         # 瓶颈速率（bits/s）
+
+class RoutingGraph:
+    """
+    一个 period 的有向链路图（CSR），边上带时延与速率。
+    """
+    def __init__(self, ids: List[str], src: np.ndarray, dst: np.ndarray, distance: np.ndarray, rate: np.ndarray):
+        self.ids = ids
+        self.index = {node_id: i for i, node_id in enumerate(ids)}
+        n = len(ids)
+        keep = src != dst
+        src, dst, distance, rate = src[keep], dst[keep], distance[keep], rate[keep]
+        order = np.lexsort((dst, src))
+        self.src, self.dst = src[order], dst[order]
+        self.propagation = distance[order] / C_LIGHT
+        self.rate = rate[order]
+        self.indptr = np.concatenate([[0], np.cumsum(np.bincount(self.src, minlength=n))])
+        self._edge_of = {(u, v): e for e, (u, v) in enumerate(zip(self.src.tolist(), self.dst.tolist()))}
+
+    def delays(self, data_bits: float = 0.0) -> np.ndarray:
+        """
+        每条边的时延；data_bits > 0 时速率为 0 的边不可用（inf）。
+        """
+        if data_bits <= 0:
+            return self.propagation
+        with np.errstate(divide="ignore"):
+            return self.propagation + np.where(self.rate > 0, data_bits / self.rate, np.inf)
+
+    def matrix(self, weights: np.ndarray) -> csr_matrix:
+        usable = np.isfinite(weights)
+        n = len(self.ids)
+        return csr_matrix((weights[usable], (self.src[usable], self.dst[usable])), shape=(n, n))
+
+    def edge(self, u: int, v: int) -> int:
+        return self._edge_of[(u, v)]
+
+    def route(self, path: List[int], data_bits: float = 0.0) -> RouteSnapshot:
+        edges = [self.edge(u, v) for u, v in zip(path[:-1], path[1:])]
+        delay = float(np.sum(self.delays(data_bits)[edges])) if edges else 0.0
+        rate = float(np.min(self.rate[edges])) if edges else float("inf")
+        return RouteSnapshot(nodes=[self.ids[i] for i in path], delay=delay, rate=rate)
+
+def _walk(predecessors: np.ndarray, source: int, target: int) -> Optional[List[int]]:
+    """
+    由前驱数组回溯 source -> target 的节点序列，不可达时返回 None。
+    """
+    if source == target:
+        return [source]
+    if predecessors[target] < 0:
+        return None
+    path = [target]
+    while path[-1] != source:
+        path.append(int(predecessors[path[-1]]))
+    return path[::-1]
+
+class Routing:
+    """
+    Network 上的路由服务：最短时延、最大瓶颈速率（max-min rate）、单源全部目的、k 条最短路径。
+    """
+    def __init__(self, net: "Network"):
+        self.net = net
+        self._period: Optional[int] = None
+        self._graph: Optional[RoutingGraph] = None
+        self._cache: Dict[tuple, object] = {}
+
+    def graph_at(self, period_counter: int) -> RoutingGraph:
+        if self._period != period_counter or self._graph is None:
+            self._period = period_counter
+            self._graph = self._build_graph(period_counter)
+            self._cache = {}
+        return self._graph
+
+    def invalidate(self) -> None:
+        self._graph = None
+
+    def _build_graph(self, period_counter: int) -> RoutingGraph:
+        net = self.net
+        table = link_table(net.compute_isl_arrays(period_counter, 0), net.compute_sgl_arrays(period_counter, 0), net.N)
+        isl = table.type == ISL
+        return RoutingGraph(
+            ids=net.node_ids,
+            src=np.concatenate([table.src, table.dst[isl]]),
+            dst=np.concatenate([table.dst, table.src[isl]]),
+            distance=np.concatenate([table.distance, table.distance[isl]]),
+            rate=np.concatenate([table.rate, table.rate[isl]]),
+        )
+
+    def _cached(self, key: tuple, period_counter: int, compute):
+        self.graph_at(period_counter)
+        if key not in self._cache:
+            self._cache[key] = compute()
+        return self._cache[key]
+
+    def _shortest_tree(self, source: str, period_counter: int, data_bits: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        单源最短时延树：(dist, predecessors)，一次 scipy Dijkstra。
+        """
+        def compute():
+            g = self.graph_at(period_counter)
+            dist, pred = dijkstra(g.matrix(g.delays(data_bits)), directed=True, indices=g.index[source], return_predecessors=True)
+            return dist, pred
+        return self._cached(("tree", source, data_bits), period_counter, compute)
+
+    def shortest_path(self, source: str, target: str, period_counter: int, data_bits: float = 0.0) -> Optional[RouteSnapshot]:
+        """
+        时延最短的路径；不可达时返回 None。
+        """
+        g = self.graph_at(period_counter)
+        if source not in g.index or target not in g.index:
+            return None
+        _, pred = self._shortest_tree(source, period_counter, data_bits)
+        path = _walk(pred, g.index[source], g.index[target])
+        return None if path is None else g.route(path, data_bits)
+
+    def shortest_paths_from(self, source: str, period_counter: int, data_bits: float = 0.0) -> Dict[str, RouteSnapshot]:
+        """
+        从 source 出发到所有可达节点的最短时延路径。
+        """
+        def compute():
+            g = self.graph_at(period_counter)
+            _, pred = self._shortest_tree(source, period_counter, data_bits)
+            s = g.index[source]
+            routes = {}
+            for t in range(len(g.ids)):
+                path = _walk(pred, s, t)
+                if path is not None and t != s:
+                    routes[g.ids[t]] = g.route(path, data_bits)
+            return routes
+        if source not in self.graph_at(period_counter).index:
+            return {}
+        return self._cached(("from", source, data_bits), period_counter, compute)
+
+    def nearest_ground_station(self, source: str, period_counter: int, data_bits: float = 0.0) -> Optional[RouteSnapshot]:
+        """
+        卫星到任一地面站的最短时延路径。
+        """
+        g = self.graph_at(period_counter)
+        if source not in g.index or not self.net.gs_datas:
+            return None
+        dist, pred = self._shortest_tree(source, period_counter, data_bits)
+        gs_nodes = np.arange(self.net.N, len(g.ids))
+        best = gs_nodes[np.argmin(dist[gs_nodes])]
+        if not np.isfinite(dist[best]):
+            return None
+        return g.route(_walk(pred, g.index[source], int(best)), data_bits)
+
+    def widest_path(self, source: str, target: str, period_counter: int) -> Optional[RouteSnapshot]:
+        """
+        瓶颈速率最大的路径（max-min rate），瓶颈相同时取传播时延最小者；不可达时返回 None。
+        先求各节点的最大瓶颈速率，再只在速率不低于目标瓶颈的边上求最短传播时延路径。
+        """
+        g = self.graph_at(period_counter)
+        if source not in g.index or target not in g.index:
+            return None
+        s, t = g.index[source], g.index[target]
+        width = self._cached(("widest", source), period_counter, lambda: self._widest_widths(g, s))
+        if width[t] == -np.inf:
+            return None
+
+        def compute():
+            weights = np.where(g.rate >= width[t], g.propagation, np.inf)
+            _, pred = dijkstra(g.matrix(weights), directed=True, indices=s, return_predecessors=True)
+            return pred
+        pred = self._cached(("widest_tree", source, float(width[t])), period_counter, compute)
+        path = _walk(pred, s, t)
+        return None if path is None else g.route(path)
+
+    @staticmethod
+    def _widest_widths(g: RoutingGraph, s: int) -> np.ndarray:
+        """
+        单源最大瓶颈速率（max-min Dijkstra）；不可达为 -inf，起点为 inf。
+        """
+        n = len(g.ids)
+        width = np.full(n, -np.inf)
+        width[s] = np.inf
+        indptr, dst, rate = g.indptr.tolist(), g.dst.tolist(), g.rate.tolist()
+        heap = [(-np.inf, s)]
+        done = np.zeros(n, dtype=bool)
+        while heap:
+            w, u = heapq.heappop(heap)
+            if done[u]:
+                continue
+            done[u] = True
+            for e in range(indptr[u], indptr[u + 1]):
+                v = dst[e]
+                if done[v] or rate[e] <= 0:
+                    continue
+                nw = min(-w, rate[e])
+                if nw > width[v]:
+                    width[v] = nw
+                    heapq.heappush(heap, (-nw, v))
+        return width
+
+    def k_shortest_paths(self, source: str, target: str, k: int, period_counter: int, data_bits: float = 0.0) -> List[RouteSnapshot]:
+        """
+        时延最短的 k 条无环路径（Yen 算法），按时延升序。
+        """
+        g = self.graph_at(period_counter)
+        if source not in g.index or target not in g.index or k <= 0:
+            return []
+
+        def compute():
+            weights = g.delays(data_bits).tolist()
+            s, t = g.index[source], g.index[target]
+            first = self._dijkstra(g, weights, s, t, set(), set())
+            if first is None:
+                return []
+            found = [first]
+            candidates: List[Tuple[float, List[int]]] = []
+            seen = {tuple(first[1])}
+            while len(found) < k:
+                prev_path = found[-1][1]
+                for i in range(len(prev_path) - 1):
+                    spur, root = prev_path[i], prev_path[:i + 1]
+                    banned_edges = {g.edge(p[i], p[i + 1]) for _, p in found if p[:i + 1] == root}
+                    banned_nodes = set(root[:-1])
+                    spur_path = self._dijkstra(g, weights, spur, t, banned_edges, banned_nodes)
+                    if spur_path is None:
+                        continue
+                    path = root[:-1] + spur_path[1]
+                    if tuple(path) in seen:
+                        continue
+                    seen.add(tuple(path))
+                    cost = sum(weights[g.edge(u, v)] for u, v in zip(path[:-1], path[1:]))
+                    heapq.heappush(candidates, (cost, path))
+                if not candidates:
+                    break
+                found.append(heapq.heappop(candidates))
+            return [g.route(path, data_bits) for _, path in found]
+
+        return self._cached(("k", source, target, k, data_bits), period_counter, compute)
+
+    @staticmethod
+    def _dijkstra(g: RoutingGraph, weights: List[float], s: int, t: int, banned_edges: Set[int], banned_nodes: Set[int]) -> Optional[Tuple[float, List[int]]]:
+        """
+        带禁用边 / 节点的单对 Dijkstra（Yen 算法的偏离路径）。
+        """
+        indptr, dst = g.indptr, g.dst
+        best = {s: 0.0}
+        pred: Dict[int, int] = {}
+        heap = [(0.0, s)]
+        while heap:
+            d, u = heapq.heappop(heap)
+            if u == t:
+                path = [t]
+                while path[-1] != s:
+                    path.append(pred[path[-1]])
+                return d, path[::-1]
+            if d > best.get(u, np.inf):
+                continue
+            for e in range(indptr[u], indptr[u + 1]):
+                v = int(dst[e])
+                if e in banned_edges or v in banned_nodes or not np.isfinite(weights[e]):
+                    continue
+                nd = d + weights[e]
+                if nd < best.get(v, np.inf):
+                    best[v], pred[v] = nd, u
+                    heapq.heappush(heap, (nd, v))
+        return None
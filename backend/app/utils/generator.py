@@ -1,11 +1,9 @@
 import itertools
 import random
 from typing import Callable, Dict, List, Optional, Tuple, TypeVar
-from skyfield.api import load
 
 from models.satellite_model import SatelliteModel
 # from old_models.satellite import Satellite
-TS = load.timescale()
 
 def generate_random_location(
     lat_range: Tuple[float, float] = (-90, 90), 
@@ -1,11 +1,11 @@
 from skyfield.api import wgs84, load, Topos
 from pyproj import Transformer
-from app.config import DATA_OTHERS, EPHEMERIS
+from app.config import DATA_OTHERS, get_body
 from utils.polygon import calculate_coverage, generate_square, latlon_to_xy
 
 def is_daytime(lat, lon, time):
-    earth = EPHEMERIS['earth']
-    sun = EPHEMERIS['sun']
+    earth = get_body('earth')
+    sun = get_body('sun')
     observer = earth + Topos(latitude_degrees=lat, longitude_degrees=lon)
     apparent = observer.at(time).observe(sun).apparent()
     alt, az, _ = apparent.altaz()
@@ -0,0 +1,44 @@
+import json
+import os
+import subprocess
+import sys
+
+"""
+启动导入时间回归测试：导入 app.main 不应加载星历（de421.bsp）与 RL 依赖（torch / gymnasium / stable_baselines3）。
+在不含 de421.bsp 的临时目录中用子进程导入，避免受当前进程已导入模块的影响。
+"""
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMPORT_BUDGET_SECONDS = 3.0
+
+PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+import app.main
+elapsed = time.perf_counter() - t0
+from app.config import get_ephemeris, get_timescale
+print(json.dumps({
+    "elapsed": elapsed,
+    "heavy": [m for m in ("torch", "gymnasium", "stable_baselines3") if m in sys.modules],
+    "ephemeris": get_ephemeris.cache_info().currsize,
+    "timescale": get_timescale.cache_info().currsize,
+}))
+"""
+
+def test_import_app_main_is_lazy(tmp_path):
+    assert not (tmp_path / "de421.bsp").exists()
+    env = dict(os.environ, PYTHONPATH=BACKEND_DIR + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=tmp_path,
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    assert result.returncode == 0, result.stderr
+    probe = json.loads(result.stdout.strip().splitlines()[-1])
+    assert probe["heavy"] == []
+    assert probe["ephemeris"] == 0
+    assert probe["timescale"] == 0
+    assert probe["elapsed"] < IMPORT_BUDGET_SECONDS, f"import app.main took {probe['elapsed']:.2f}s"